@@ -0,0 +1,122 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from Kappa_computation_COSMIN import score_levels
+from Kappa_computation_COSMIN_worst_score import (file_path, domains, kappa_weights,
+                                                  load_domain_scores)
+from Kappa_stats import AgreementAccumulator
+
+# --- CONFIGURATION ---
+# "Percentage above threshold" rule: an article is rated 1 if at least
+# pct_cutoff % of its scored items are >= pct_threshold, otherwise 0
+pct_threshold = 2
+pct_cutoff = 50
+
+RULES = ["worst", "best", "median", "mode", "pct_above"]
+
+
+def aggregate_all_rules(scores):
+    """
+    Applies every aggregation rule at once.
+
+    `scores` is a masked (raters x articles x items) float array, NaN where no
+    score was given. Returns {rule: (raters x articles) array}, NaN for an
+    article without any score.
+      - worst     : minimum score (COSMIN 'worst score counts')
+      - best      : maximum score
+      - median    : median score, rounded down to a scale category
+      - mode      : most frequent score (lowest score on ties)
+      - pct_above : 1 if >= pct_cutoff % of the items are >= pct_threshold, else 0
+    """
+    scored = ~np.isnan(scores)
+    n_scored = scored.sum(axis=-1)
+    empty = n_scored == 0
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        results = {
+            "worst": np.nanmin(scores, axis=-1),
+            "best": np.nanmax(scores, axis=-1),
+            "median": np.floor(np.nanmedian(scores, axis=-1)),
+        }
+
+    # Mode: counts per category in one pass, argmax keeps the lowest category on ties
+    levels = np.union1d(score_levels, scores[scored])
+    counts = (scores[..., None] == levels).sum(axis=-2)
+    results["mode"] = np.where(empty, np.nan, levels[counts.argmax(axis=-1)])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share_above = (scores >= pct_threshold).sum(axis=-1) / n_scored * 100
+    results["pct_above"] = np.where(empty, np.nan, (share_above >= pct_cutoff).astype(float))
+
+    return results
+
+
+def domain_score_array(xls, domain_name):
+    """(2 x articles x items) array of both raters' scores, aligned on the articles."""
+    df_mb, df_nh = load_domain_scores(xls, domain_name)
+    articles = df_mb.index.intersection(df_nh.index)
+    arrays = [df.loc[articles].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+              for df in (df_mb, df_nh)]
+    return np.stack(arrays)
+
+
+def sensitivity_table(xls):
+    """
+    Kappa and agreement for every rule and every domain, plus the pooled total.
+    Returns a DataFrame indexed by domain with (rule, statistic) columns.
+    """
+    rows = {}
+    totals = {rule: AgreementAccumulator(score_levels) for rule in RULES}
+    for domain in domains:
+        try:
+            scores = domain_score_array(xls, domain)
+        except Exception as e:
+            print(f"Skipping {domain} (Error or missing sheet): {e}")
+            continue
+        if scores.shape[-1] == 0:
+            continue
+
+        row = {}
+        for rule, final in aggregate_all_rules(scores).items():
+            valid = ~np.isnan(final).any(axis=0)
+            acc = AgreementAccumulator(score_levels).update(final[0, valid], final[1, valid])
+            totals[rule].merge(acc)
+            kappa, agreement = acc.metrics(kappa_weights)
+            row[(rule, "N")] = acc.n
+            row[(rule, "Kappa")] = kappa
+            row[(rule, "Agree %")] = agreement
+        rows[domain] = row
+
+    rows["POOLED"] = {}
+    for rule, acc in totals.items():
+        kappa, agreement = acc.metrics(kappa_weights)
+        rows["POOLED"].update({(rule, "N"): acc.n, (rule, "Kappa"): kappa, (rule, "Agree %"): agreement})
+
+    table = pd.DataFrame.from_dict(rows, orient="index")
+    table.columns = pd.MultiIndex.from_tuples(table.columns)
+    return table
+
+
+# --- MAIN ---
+if __name__ == "__main__":
+    if os.path.exists(file_path):
+        print("Loading Excel file...")
+        print("Applying every aggregation rule per article (worst, best, median, mode, % above threshold)...")
+        try:
+            xls = pd.ExcelFile(file_path)
+            table = sensitivity_table(xls)
+
+            pd.set_option("display.width", 200)
+            print("\n" + "=" * 80)
+            print(f"AGGREGATION RULE SENSITIVITY ({kappa_weights} weighted kappa)")
+            print("=" * 80)
+            print(table.to_string(float_format=lambda v: f"{v:.3f}"))
+            print(f"\npct_above: 1 if >= {pct_cutoff}% of the items are scored >= {pct_threshold}, else 0.")
+        except Exception as e:
+            print(f"Critical Error: {e}")
+    else:
+        print(f"File not found at: {file_path}")
@@ -0,0 +1,118 @@
+"""
+Kappa_batch_runner.py — Runs the agreement analyses over many workbooks in parallel.
+
+Each workbook (one review or one update round) is processed in its own worker
+process: COSMIN item level and worst score if it contains the COSMIN domain
+sheets, and QA if it contains the two QA rater sheets. Results go through
+Kappa_results_store (so unchanged workbooks are read from the cache) and are
+combined into one table with a 'workbook' column.
+
+Usage :
+    python Kappa_batch_runner.py "Reviews/*/COSMIN_kappa.xlsx" "Reviews/*/Quality_assessment_kappa.xlsx"
+    python Kappa_batch_runner.py a.xlsx b.xlsx --out combined_results --jobs 8
+"""
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import Kappa_computation_COSMIN as cosmin
+import Kappa_computation_QA as qa
+import Kappa_results_store as store
+
+
+def analyses_for(path):
+    """Analyses applicable to a workbook, detected from its sheet names."""
+    sheets = set(pd.ExcelFile(path).sheet_names)
+    found = []
+    if any(f"{d}{s}" in sheets for d in cosmin.domains for s in cosmin.suffixes):
+        found += ["cosmin_items", "cosmin_worst_score"]
+    if qa.sheet_rater1 in sheets and qa.sheet_rater2 in sheets:
+        found.append("qa")
+    return found
+
+
+def run_workbook(path, settings, store_dir):
+    """Worker: every applicable analysis of one workbook. Returns (path, DataFrame, seconds)."""
+    start = time.perf_counter()
+    tables = []
+    for analysis in analyses_for(path):
+        df = store.load_or_compute(analysis, path, settings, store_dir)
+        tables.append(df)
+    combined = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=store.COLUMNS)
+    combined.insert(0, "workbook", os.path.abspath(path))
+    return path, combined, time.perf_counter() - start
+
+
+def expand_inputs(patterns):
+    """Expands globs, keeps order, drops duplicates and Excel lock files (~$...)."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for p in matches:
+            if os.path.basename(p).startswith("~$") or p in paths:
+                continue
+            paths.append(p)
+    return paths
+
+
+def run_batch(paths, jobs=None, settings=None, store_dir=None):
+    """
+    Runs every workbook in a process pool and returns the combined tidy table.
+    Failing workbooks are reported and skipped.
+    """
+    settings = settings or store.default_settings()
+    store_dir = store_dir or store.cache_dir
+    jobs = jobs or min(len(paths), os.cpu_count() or 1)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        futures = {pool.submit(run_workbook, p, settings, store_dir): p for p in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                _, df, seconds = future.result()
+            except Exception as e:
+                print(f"   ⚠️ Failed on {path}: {e}")
+                continue
+            print(f"   {os.path.basename(path):<50} {len(df):>4} rows  {seconds:6.2f} s")
+            results[path] = df
+
+    # Keep the input order in the combined table
+    tables = [results[p] for p in paths if p in results]
+    if not tables:
+        return pd.DataFrame(columns=["workbook"] + store.COLUMNS)
+    return pd.concat(tables, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agreement analyses for many workbooks in parallel.")
+    parser.add_argument("workbooks", nargs="+", help="Workbook paths or glob patterns")
+    parser.add_argument("--out", default="agreement_results_batch",
+                        help="Output path without extension (.csv/.json/.parquet are written)")
+    parser.add_argument("--jobs", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--cache-dir", default=None, help="Results store directory")
+    args = parser.parse_args()
+
+    paths = [p for p in expand_inputs(args.workbooks) if os.path.exists(p)]
+    if not paths:
+        print("No workbook found.")
+        return
+
+    print(f">>> {len(paths)} workbook(s)")
+    start = time.perf_counter()
+    combined = run_batch(paths, jobs=args.jobs, store_dir=args.cache_dir)
+    out_dir = os.path.dirname(args.out)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    store.write_results(combined, args.out)
+    print(f"✅ {len(combined)} rows written to {args.out}.csv/.json "
+          f"({time.perf_counter() - start:.2f} s total)")
+
+
+if __name__ == "__main__":
+    main()
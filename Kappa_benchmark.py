@@ -0,0 +1,157 @@
+"""
+Kappa_benchmark.py — Timing of the agreement computations at increasing scales.
+
+For each scale (articles x items) synthetic COSMIN and QA workbooks are
+written to a temporary folder, then three stages are timed separately:
+  - load   : pd.read_excel of every rater sheet
+  - clean  : reshaping / numeric coercion / pairing (same code as the scripts)
+  - kappa  : confusion-matrix kappas (Kappa_stats) vs sklearn cohen_kappa_score
+for the COSMIN item-level analysis (analyze_domain_clean), the COSMIN worst
+score analysis (analyze_domain_worst_score) and the QA analysis
+(analyze_reliability). The largest |kappa difference| with sklearn is
+reported as a correctness check.
+
+Usage :
+    python Kappa_benchmark.py
+    python Kappa_benchmark.py --scales 100x6 1000x13 10000x50 --out benchmark.csv
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import cohen_kappa_score
+
+import Kappa_computation_COSMIN as cosmin
+import Kappa_computation_COSMIN_worst_score as worst
+import Kappa_computation_QA as qa
+from Kappa_stats import AgreementAccumulator
+from Kappa_synthetic_workbooks import write_cosmin_workbook, write_qa_workbook
+
+# --- CONFIGURATION ---
+default_scales = ["100x6", "1000x13", "10000x50"]
+repeats = 3
+
+
+def timed(fn, *args):
+    """Best wall time over `repeats` runs, and the result of the last run."""
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def sklearn_kappa(v1, v2, weights):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        k = cohen_kappa_score(v1, v2, weights=weights)
+    return 0.0 if np.isnan(k) else k
+
+
+def compare_kappas(pair_list, weights):
+    """
+    Times both kappa implementations on the same list of (v1, v2) pairs.
+    Returns (seconds_stats, seconds_sklearn, max_abs_difference).
+    """
+    t_stats, ours = timed(lambda: [AgreementAccumulator().update(v1, v2).metrics(weights)[0]
+                                   for v1, v2 in pair_list])
+    t_sklearn, ref = timed(lambda: [sklearn_kappa(v1, v2, weights) for v1, v2 in pair_list])
+    diff = float(np.max(np.abs(np.subtract(ours, ref)))) if pair_list else 0.0
+    return t_stats, t_sklearn, diff
+
+
+# ==========================================
+# STAGES PER ANALYSIS
+# ==========================================
+def load_cosmin(path, suffixes):
+    xls = pd.ExcelFile(path)
+    return {d: (pd.read_excel(xls, sheet_name=f"{d}{suffixes[0]}", header=0),
+                pd.read_excel(xls, sheet_name=f"{d}{suffixes[1]}", header=0))
+            for d in cosmin.domains}
+
+
+def clean_items(raw):
+    pairs = []
+    for df_mb, df_nh in raw.values():
+        df_mb, df_nh, question_cols = cosmin.prepare_domain_frames(df_mb, df_nh)
+        pairs += [cosmin.valid_pairs(df_mb, df_nh, col) for col in question_cols]
+    return [p for p in pairs if len(p[0]) > 0]
+
+
+def clean_worst(raw):
+    pairs = [worst.worst_score_pairs(*worst.prepare_domain_scores(df_mb, df_nh))
+             for df_mb, df_nh in raw.values()]
+    return [p for p in pairs if len(p[0]) > 0]
+
+
+def load_qa(path):
+    return (pd.read_excel(path, sheet_name=qa.sheet_rater1),
+            pd.read_excel(path, sheet_name=qa.sheet_rater2))
+
+
+def clean_qa(raw):
+    pairs, _ = qa.qa_pairs_from_frames(*raw)
+    return [p for p in pairs.values() if len(p[0]) > 0]
+
+
+def benchmark_scale(n_articles, n_items, folder, seed=0):
+    """One row per analysis with the timings of every stage at this scale."""
+    cosmin_path = write_cosmin_workbook(os.path.join(folder, f"cosmin_{n_articles}x{n_items}.xlsx"),
+                                        n_articles, n_items, seed=seed)
+    qa_path = write_qa_workbook(os.path.join(folder, f"qa_{n_articles}x{n_items}.xlsx"),
+                                n_articles, seed=seed)
+
+    plans = [
+        ("cosmin_items", lambda: load_cosmin(cosmin_path, cosmin.suffixes), clean_items, cosmin.kappa_weights),
+        ("cosmin_worst_score", lambda: load_cosmin(cosmin_path, worst.suffixes), clean_worst, worst.kappa_weights),
+        ("qa", lambda: load_qa(qa_path), clean_qa, qa.kappa_weights),
+    ]
+    rows = []
+    for analysis, load, clean, weights in plans:
+        t_load, raw = timed(load)
+        t_clean, pairs = timed(clean, raw)
+        t_kappa, t_sklearn, diff = compare_kappas(pairs, weights)
+        rows.append({
+            "analysis": analysis,
+            "articles": n_articles,
+            "items": n_items if analysis != "qa" else len(qa.columns_of_interest),
+            "pairs": int(sum(len(v1) for v1, _ in pairs)),
+            "load_s": t_load,
+            "clean_s": t_clean,
+            "kappa_s": t_kappa,
+            "kappa_sklearn_s": t_sklearn,
+            "max_abs_diff_vs_sklearn": diff,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the agreement computations.")
+    parser.add_argument("--scales", nargs="+", default=default_scales,
+                        help="Scales as ARTICLESxITEMS (items per COSMIN domain)")
+    parser.add_argument("--out", default=None, help="Optional CSV output")
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as folder:
+        for scale in args.scales:
+            n_articles, n_items = (int(v) for v in scale.lower().split("x"))
+            print(f">>> {n_articles} articles x {n_items} items...")
+            rows += benchmark_scale(n_articles, n_items, folder)
+
+    table = pd.DataFrame(rows)
+    pd.set_option("display.width", 200)
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"✅ Écrit : {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,12 @@
 import pandas as pd
-import numpy as np
-from sklearn.metrics import cohen_kappa_score
 import os
-import warnings
+
+from Kappa_stats import AgreementAccumulator
+from review_config import get_path
+from review_profiling import stage
 
 # --- CONFIGURATION ---
-file_path = r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\COSMIN_kappa.xlsx"
+file_path = get_path('cosmin_workbook')
 
 domains = [
     "Reliability",
@@ -17,78 +18,87 @@ domains = [
 
 suffixes = ("_NH", "_MB")
 
-# Stockage pour le Grand Total
-grand_total_mb = []
-grand_total_nh = []
-
-
-def calculate_metrics(v1, v2):
-    """Calcule Kappa et Accord en gérant les exceptions"""
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        try:
-            if len(v1) == 0: return 0.0, 0.0
+# Échelle de cotation COSMIN (ensemble des catégories pour PABAK / AC1)
+score_levels = [0, 1, 2, 3]
 
-            # Pourcentage d'Accord
-            accord = np.mean(v1 == v2) * 100
+# Pondération du Kappa (échelle ordinale)
+kappa_weights = "quadratic"
 
-            # Kappa
-            # Si accord parfait constant (ex: que des '2' partout)
-            #if np.array_equal(v1, v2) and len(np.unique(v1)) == 1:
-                #kappa = 1.0
-            #else:
-            kappa = cohen_kappa_score(v1, v2, weights="quadratic")
-            if np.isnan(kappa): kappa = 0.0
 
-            return kappa, accord
-        except:
-            return 0.0, 0.0
-
-
-def analyze_domain_clean(xls, domain_name):
+def load_domain_sheets(xls, domain_name):
+    """
+    Charge les deux feuilles d'un domaine (une par juge).
+    Retourne (df_mb, df_nh, question_cols) avec Lignes = Articles, Colonnes = Items.
+    Lève une exception si une feuille est absente.
+    """
     sheet_mb = f"{domain_name}{suffixes[0]}"
     sheet_nh = f"{domain_name}{suffixes[1]}"
 
-    try:
-        # Lecture (header=0 suppose que la ligne 1 contient les noms d'articles)
+    # Lecture (header=0 suppose que la ligne 1 contient les noms d'articles)
+    with stage("read_excel"):
         df_mb = pd.read_excel(xls, sheet_name=sheet_mb, header=0)
         df_nh = pd.read_excel(xls, sheet_name=sheet_nh, header=0)
 
-        # --- TRANSPOSITION AUTOMATIQUE ---
-        # Si vos colonnes sont des articles (ex: "Smith et al."), on transpose.
-        # Ainsi : Lignes = Articles, Colonnes = Items. C'est plus facile à traiter.
-        cols_check = [str(c).lower() for c in df_mb.columns[:5]]
-        if any("et al" in c for c in cols_check) or any("20" in c for c in cols_check):
-            # On ne garde que les données numériques/texte (pas les index bizarres)
-            # On transpose pour avoir : Colonne = Item 1, Item 2...
-            df_mb = df_mb.set_index(df_mb.columns[0])  # On suppose que col 1 = Noms des items
-            df_nh = df_nh.set_index(df_nh.columns[0])
-
-            # Transposition
-            df_mb = df_mb.T
-            df_nh = df_nh.T
-
-        # Maintenant :
-        # Lignes = Articles
-        # Colonnes = Questions (Items)
-
-        # Identification des colonnes communes (Questions)
-        common_cols = [c for c in df_mb.columns if c in df_nh.columns]
-
-        # Filtrage : On ne garde que les colonnes qui ressemblent à des questions
-        # (On évite les métadonnées si elles ont survécu)
-        question_cols = []
-        for col in common_cols:
-            # On garde tout ce qui est commun pour l'instant
-            question_cols.append(col)
+    return prepare_domain_frames(df_mb, df_nh)
+
+
+def prepare_domain_frames(df_mb, df_nh):
+    """
+    Mise en forme des deux feuilles brutes d'un domaine (déjà lues).
+    Retourne (df_mb, df_nh, question_cols).
+    """
+    # --- TRANSPOSITION AUTOMATIQUE ---
+    # Si vos colonnes sont des articles (ex: "Smith et al."), on transpose.
+    # Ainsi : Lignes = Articles, Colonnes = Items. C'est plus facile à traiter.
+    cols_check = [str(c).lower() for c in df_mb.columns[:5]]
+    if any("et al" in c for c in cols_check) or any("20" in c for c in cols_check):
+        # On ne garde que les données numériques/texte (pas les index bizarres)
+        # On transpose pour avoir : Colonne = Item 1, Item 2...
+        df_mb = df_mb.set_index(df_mb.columns[0])  # On suppose que col 1 = Noms des items
+        df_nh = df_nh.set_index(df_nh.columns[0])
+
+        # Transposition
+        df_mb = df_mb.T
+        df_nh = df_nh.T
+
+    # Maintenant :
+    # Lignes = Articles
+    # Colonnes = Questions (Items)
+
+    # Identification des colonnes communes (Questions)
+    # (On garde tout ce qui est commun pour l'instant)
+    question_cols = [c for c in df_mb.columns if c in df_nh.columns]
+
+    return df_mb, df_nh, question_cols
+
+
+def valid_pairs(df_mb, df_nh, col):
+    """
+    Vecteurs (v1, v2) d'une question, nettoyés :
+    on ne garde l'article QUE SI les deux juges ont mis un chiffre.
+    """
+    # On force en numérique (les "NA" ou texte deviennent NaN)
+    s1 = pd.to_numeric(df_mb[col], errors='coerce')
+    s2 = pd.to_numeric(df_nh[col], errors='coerce')
+
+    mask = s1.notna() & s2.notna()
+    return s1[mask].values, s2[mask].values
+
+
+def analyze_domain_clean(xls, domain_name):
+    """
+    Analyse un domaine question par question.
+    Retourne l'accumulateur du domaine (matrice de confusion poolée), ou None.
+    """
+    try:
+        df_mb, df_nh, question_cols = load_domain_sheets(xls, domain_name)
 
         if not question_cols:
             print(f"WARNING: No matching questions found for {domain_name}.")
             return
 
-        # Listes pour le pool du domaine
-        domain_mb = []
-        domain_nh = []
+        # Pool du domaine (matrice de confusion uniquement)
+        domain_total = AgreementAccumulator()
 
         # --- ANALYSE QUESTION PAR QUESTION ---
         # (Utile pour voir quel item pose problème, même si N est petit)
@@ -96,41 +106,30 @@ def analyze_domain_clean(xls, domain_name):
         print(f"{'QUESTION':<40} | {'N (Valid)'} | {'KAPPA'} | {'ACCORD'}")
 
         for col in question_cols:
-            # Récupération des vecteurs bruts (tous les articles pour cette question)
-            # On force en numérique (les "NA" ou texte deviennent NaN)
-            s1 = pd.to_numeric(df_mb[col], errors='coerce')
-            s2 = pd.to_numeric(df_nh[col], errors='coerce')
-
-            # --- NETTOYAGE CHIRURGICAL ---
-            # On ne garde l'article QUE SI les deux juges ont mis un chiffre
-            mask = s1.notna() & s2.notna()
-
-            v1 = s1[mask].values
-            v2 = s2[mask].values
+            # Récupération des vecteurs nettoyés (tous les articles pour cette question)
+            v1, v2 = valid_pairs(df_mb, df_nh, col)
 
             if len(v1) > 0:
+                item_total = AgreementAccumulator().update(v1, v2)
+
                 # Ajout au pool
-                domain_mb.extend(v1)
-                domain_nh.extend(v2)
-                grand_total_mb.extend(v1)
-                grand_total_nh.extend(v2)
+                domain_total.merge(item_total)
 
                 # Calcul local (juste pour info)
-                k, acc = calculate_metrics(v1, v2)
+                k, acc = item_total.metrics(kappa_weights)
                 print(f"{str(col)[:38]:<40} | {len(v1):<9} | {k:.3f} | {acc:.1f}%")
 
         # --- RÉSULTAT DU DOMAINE ---
-        if len(domain_mb) > 0:
-            arr_mb = np.array(domain_mb)
-            arr_nh = np.array(domain_nh)
-            k_dom, acc_dom = calculate_metrics(arr_mb, arr_nh)
+        if domain_total.n > 0:
+            k_dom, acc_dom = domain_total.metrics(kappa_weights)
 
             print("-" * 70)
             print(f">>> DOMAIN RESULT: {domain_name}")
             print(f"    Weighted Kappa : {k_dom:.4f}")
             print(f"    Agreement      : {acc_dom:.2f}%")
-            print(f"    Valid Pairs    : {len(arr_mb)}")
+            print(f"    Valid Pairs    : {domain_total.n}")
             print("-" * 70)
+            return domain_total
         else:
             print(f"No valid data pairs found for {domain_name} (All NA).")
 
@@ -146,23 +145,24 @@ if __name__ == "__main__":
             xls = pd.ExcelFile(file_path)
 
             # 1. Analyse par Domaine
+            grand_total = AgreementAccumulator()
             for domain in domains:
-                analyze_domain_clean(xls, domain)
+                with stage(domain):
+                    domain_total = analyze_domain_clean(xls, domain)
+                if domain_total is not None:
+                    grand_total.merge(domain_total)
 
             # 2. Calcul du GRAND TOTAL
             print("\n" + "=" * 80)
             print("GRAND TOTAL (ALL DOMAINS POOLED)")
             print("=" * 80)
 
-            if len(grand_total_mb) > 0:
-                gt_mb = np.array(grand_total_mb)
-                gt_nh = np.array(grand_total_nh)
-
-                gt_kappa, gt_accord = calculate_metrics(gt_mb, gt_nh)
+            if grand_total.n > 0:
+                gt_kappa, gt_accord = grand_total.metrics(kappa_weights)
 
                 print(f"-> OVERALL Linear Weighted Kappa : {gt_kappa:.4f}")
                 print(f"-> OVERALL Percent Agreement     : {gt_accord:.2f}%")
-                print(f"-> TOTAL Valid Ratings           : {len(gt_mb)}")
+                print(f"-> TOTAL Valid Ratings           : {grand_total.n}")
 
                 if gt_kappa <= 0.0:
                     verdict = "Poor"
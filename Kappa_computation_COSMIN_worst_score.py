@@ -1,12 +1,13 @@
 import pandas as pd
-import numpy as np
-from sklearn.metrics import cohen_kappa_score
 import os
-import warnings
+
+from Kappa_stats import AgreementAccumulator
+from review_config import get_path
+from review_profiling import stage
 
 # --- CONFIGURATION ---
 # Update this path to your actual file location
-file_path = r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\COSMIN_kappa.xlsx"
+file_path = get_path('cosmin_workbook')
 
 domains = [
     "Reliability",
@@ -19,33 +20,8 @@ domains = [
 # Sheet name suffixes for each rater
 suffixes = ("_MB", "_NH")
 
-# Storage for the Grand Total (Pooled data)
-grand_total_mb_final = []
-grand_total_nh_final = []
-
-
-def calculate_metrics(v1, v2):
-    """
-    Calculates Linear Weighted Kappa and Raw Percent Agreement.
-    Handles exceptions for empty vectors or constant values.
-    """
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        try:
-            if len(v1) == 0: return np.nan, 0.0
-
-            # Percent Agreement
-            accord = np.mean(v1 == v2) * 100
-
-            # Kappa (Linear Weighted for ordinal scales)
-            # If there is no variance (e.g., all scores are '2'), Kappa might return NaN or 0
-            kappa = cohen_kappa_score(v1, v2, weights='linear')
-
-            if np.isnan(kappa): kappa = 0.0
-
-            return kappa, accord
-        except:
-            return 0.0, 0.0
+# Kappa weighting (ordinal scale)
+kappa_weights = "linear"
 
 
 def get_worst_score_per_article(df):
@@ -67,63 +43,88 @@ def get_worst_score_per_article(df):
     return worst_scores
 
 
-def analyze_domain_worst_score(xls, domain_name):
+def load_domain_scores(xls, domain_name):
+    """
+    Loads both rater sheets of a domain.
+    Returns (df_mb, df_nh) restricted to the questions present in both sheets,
+    with Rows = Articles and Columns = Questions (empty if no common question).
+    """
     sheet_mb = f"{domain_name}{suffixes[0]}"
     sheet_nh = f"{domain_name}{suffixes[1]}"
 
-    try:
-        # Load sheets
+    # Load sheets
+    with stage("read_excel"):
         df_mb = pd.read_excel(xls, sheet_name=sheet_mb, header=0)
         df_nh = pd.read_excel(xls, sheet_name=sheet_nh, header=0)
 
-        # --- TRANSPOSITION & CLEANING ---
-        # Check if the first column contains article names (e.g., "Smith et al.")
-        cols_check = [str(c).lower() for c in df_mb.columns[:5]]
-        if any("et al" in c for c in cols_check) or any("20" in c for c in cols_check):
-            # Set the first column as index (Article Names)
-            df_mb = df_mb.set_index(df_mb.columns[0])
-            df_nh = df_nh.set_index(df_nh.columns[0])
-            # Transpose: Rows = Articles, Columns = Questions
-            df_mb = df_mb.T
-            df_nh = df_nh.T
-
-        # --- FILTER COMMON COLUMNS ---
-        # Keep only columns (questions) that exist in both sheets
-        common_cols = [c for c in df_mb.columns if c in df_nh.columns]
-
-        if not common_cols:
-            print(f"WARNING: No matching questions found for {domain_name}.")
-            return
+    return prepare_domain_scores(df_mb, df_nh)
 
-        # Restrict DataFrames to common questions only
-        df_mb_clean = df_mb[common_cols]
-        df_nh_clean = df_nh[common_cols]
 
-        # --- APPLY 'WORST SCORE COUNTS' ---
-        # Result: One single score per article per rater
-        scores_mb = get_worst_score_per_article(df_mb_clean)
-        scores_nh = get_worst_score_per_article(df_nh_clean)
+def prepare_domain_scores(df_mb, df_nh):
+    """
+    Reshapes the two raw sheets of a domain (already loaded).
+    Returns (df_mb, df_nh) restricted to the common questions.
+    """
+    # --- TRANSPOSITION & CLEANING ---
+    # Check if the first column contains article names (e.g., "Smith et al.")
+    cols_check = [str(c).lower() for c in df_mb.columns[:5]]
+    if any("et al" in c for c in cols_check) or any("20" in c for c in cols_check):
+        # Set the first column as index (Article Names)
+        df_mb = df_mb.set_index(df_mb.columns[0])
+        df_nh = df_nh.set_index(df_nh.columns[0])
+        # Transpose: Rows = Articles, Columns = Questions
+        df_mb = df_mb.T
+        df_nh = df_nh.T
+
+    # --- FILTER COMMON COLUMNS ---
+    # Keep only columns (questions) that exist in both sheets
+    common_cols = [c for c in df_mb.columns if c in df_nh.columns]
+
+    # Restrict DataFrames to common questions only
+    return df_mb[common_cols], df_nh[common_cols]
+
+
+def worst_score_pairs(df_mb_clean, df_nh_clean):
+    """
+    Final score of each article for both raters (v1, v2), keeping only the
+    articles scored by both.
+    """
+    # --- APPLY 'WORST SCORE COUNTS' ---
+    # Result: One single score per article per rater
+    scores_mb = get_worst_score_per_article(df_mb_clean)
+    scores_nh = get_worst_score_per_article(df_nh_clean)
+
+    # --- ALIGNMENT & FINAL CLEANING ---
+    # Create a temp DataFrame to align articles by index
+    comparison_df = pd.DataFrame({'MB': scores_mb, 'NH': scores_nh})
 
-        # --- ALIGNMENT & FINAL CLEANING ---
-        # Create a temp DataFrame to align articles by index
-        comparison_df = pd.DataFrame({'MB': scores_mb, 'NH': scores_nh})
+    # Drop articles where one or both raters have no valid score (NaN)
+    # (e.g., Article not evaluated for this specific domain)
+    valid_comparison = comparison_df.dropna()
+
+    return valid_comparison['MB'].values, valid_comparison['NH'].values
+
+
+def analyze_domain_worst_score(xls, domain_name):
+    """
+    Final (worst score) agreement of one domain.
+    Returns the domain accumulator (confusion matrix of final scores), or None.
+    """
+    try:
+        df_mb_clean, df_nh_clean = load_domain_scores(xls, domain_name)
 
-        # Drop articles where one or both raters have no valid score (NaN)
-        # (e.g., Article not evaluated for this specific domain)
-        valid_comparison = comparison_df.dropna()
+        if df_mb_clean.shape[1] == 0:
+            print(f"WARNING: No matching questions found for {domain_name}.")
+            return
 
-        v1 = valid_comparison['MB'].values
-        v2 = valid_comparison['NH'].values
+        v1, v2 = worst_score_pairs(df_mb_clean, df_nh_clean)
 
         # --- CALCULATION & PRINTING ---
         print(f"\n--- {domain_name.upper()} : FINAL SCORES (Worst Score Counts) ---")
 
         if len(v1) > 0:
-            # Add to the global pool for final calculation
-            grand_total_mb_final.extend(v1)
-            grand_total_nh_final.extend(v2)
-
-            kappa, accord = calculate_metrics(v1, v2)
+            domain_total = AgreementAccumulator().update(v1, v2)
+            kappa, accord = domain_total.metrics(kappa_weights)
 
             print(f"    Valid Articles : {len(v1)}")
             print(f"    Raw Agreement  : {accord:.2f}%")
@@ -134,6 +135,9 @@ def analyze_domain_worst_score(xls, domain_name):
             else:
                 print(f"    Weighted Kappa : {kappa:.4f}")
 
+            # Returned to the caller for the pooled final calculation
+            return domain_total
+
         else:
             print("    No valid articles found (All NA).")
 
@@ -150,23 +154,24 @@ if __name__ == "__main__":
             xls = pd.ExcelFile(file_path)
 
             # 1. Analyze per Domain (Final Score only)
+            grand_total = AgreementAccumulator()
             for domain in domains:
-                analyze_domain_worst_score(xls, domain)
+                with stage(domain):
+                    domain_total = analyze_domain_worst_score(xls, domain)
+                if domain_total is not None:
+                    grand_total.merge(domain_total)
 
             # 2. Calculate GRAND TOTAL (POOLED FINAL SCORES)
             print("\n" + "=" * 80)
             print("GRAND TOTAL (POOLED FINAL SCORES)")
             print("=" * 80)
 
-            if len(grand_total_mb_final) > 0:
-                gt_mb = np.array(grand_total_mb_final)
-                gt_nh = np.array(grand_total_nh_final)
-
-                gt_kappa, gt_accord = calculate_metrics(gt_mb, gt_nh)
+            if grand_total.n > 0:
+                gt_kappa, gt_accord = grand_total.metrics(kappa_weights)
 
                 print(f"-> POOLED Linear Weighted Kappa : {gt_kappa:.4f}")
                 print(f"-> POOLED Percent Agreement     : {gt_accord:.2f}%")
-                print(f"-> TOTAL Valid Domain Ratings   : {len(gt_mb)}")
+                print(f"-> TOTAL Valid Domain Ratings   : {grand_total.n}")
 
                 # Standard interpretation of Kappa
                 if gt_kappa < 0:
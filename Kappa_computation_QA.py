@@ -1,10 +1,13 @@
 import pandas as pd
 import numpy as np
-from sklearn.metrics import cohen_kappa_score
+
+from Kappa_stats import confusion_matrix, agreement_indices, interpret_kappa
+from review_config import get_path
+from review_profiling import stage
 
 # --- CONFIGURATION ---
 # Replace with the actual path to your Excel file
-excel_file_path = r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\Quality_assessment_kappa.xlsx"
+excel_file_path = get_path('qa_workbook')
 
 # Exact names of your Excel sheets
 sheet_rater1 = 'QA_MB_v2'
@@ -28,97 +31,112 @@ columns_of_interest = [
 ]
 
 
+# Full QA scoring scale (0 = Inadequate, 1 = Partial, 2 = Adequate)
+# Used as the category set K for PABAK and Gwet's AC1/AC2
+score_levels = [0, 1, 2]
+
+# Kappa weighting (ordinal scale)
+kappa_weights = 'linear'
+
+
+def load_qa_pairs(path=None):
+    """
+    Paired ratings of both raters for every QA item.
+    Returns (pairs, labels): pairs maps each item to (v1, v2) and labels is the
+    category set shared by all items (so confusion matrices can be pooled).
+    Raises KeyError if a column of interest is missing.
+    """
+    path = path or excel_file_path
+    with stage("read_excel"):
+        df_mb = pd.read_excel(path, sheet_name=sheet_rater1)
+        df_nh = pd.read_excel(path, sheet_name=sheet_rater2)
+
+    return qa_pairs_from_frames(df_mb, df_nh)
+
+
+def qa_pairs_from_frames(df_mb, df_nh):
+    """Same as load_qa_pairs, from the two rater sheets already loaded."""
+    # Check for missing columns
+    missing = [c for c in columns_of_interest if c not in df_mb.columns]
+    if missing:
+        raise KeyError(f"The following columns are missing in the Excel file: {missing}")
+
+    # --- PAIRED RATINGS PER ITEM ---
+    pairs = {}
+    for col in columns_of_interest:
+        # Clean data: drop empty cells (NaNs)
+        s1 = pd.to_numeric(df_mb[col], errors='coerce').dropna()
+        s2 = pd.to_numeric(df_nh[col], errors='coerce').dropna()
+
+        # Align indices to ensure we compare the same rows
+        common_idx = s1.index.intersection(s2.index)
+        pairs[col] = (s1.loc[common_idx].values, s2.loc[common_idx].values)
+
+    # One category set for every item
+    labels = np.union1d(score_levels, np.concatenate([np.concatenate(p) for p in pairs.values()]))
+    return pairs, labels
+
+
 def analyze_reliability():
     try:
         print("Loading data...")
-        df_mb = pd.read_excel(excel_file_path, sheet_name=sheet_rater1)
-        df_nh = pd.read_excel(excel_file_path, sheet_name=sheet_rater2)
-
-        # Check for missing columns
-        missing = [c for c in columns_of_interest if c not in df_mb.columns]
-        if missing:
-            print(f"ERROR: The following columns are missing in the Excel file: {missing}")
+        try:
+            pairs, labels = load_qa_pairs()
+        except KeyError as e:
+            print(f"ERROR: {e.args[0]}")
             return
 
-        # Storage for global pooled calculation
-        global_mb = []
-        global_nh = []
+        # --- ONE CONFUSION MATRIX PER ITEM + POOLED TOTAL ---
+        # Pooled matrix = sum of the item matrices (same as pooling all ratings)
+        with stage("kappa"):
+            cms = np.stack([confusion_matrix(v1, v2, labels) for v1, v2 in pairs.values()])
+            cms = np.concatenate([cms, cms.sum(axis=0, keepdims=True)])
+
+            # Every statistic for every item and the pooled total, in one pass
+            stats = agreement_indices(cms, weights=kappa_weights)
 
         # Print Table Header
-        print("\n" + "=" * 105)
-        print(f"{'ITEM':<55} | {'WEIGHTED KAPPA'} | {'AGREEMENT (%)'} | {'INTERPRETATION'}")
-        print("=" * 105)
+        width = 146
+        print("\n" + "=" * width)
+        print(f"{'ITEM':<45} | {'N':>4} | {'W. KAPPA':>8} | {'PABAK':>6} | {'AC1':>6} | {'AC2':>6} | "
+              f"{'PI':>5} | {'BI':>5} | {'AGREEMENT':>9} | {'INTERPRETATION'}")
+        print("=" * width)
 
         # --- LOOP THROUGH EACH ITEM ---
-        for col in columns_of_interest:
-            # Clean data: drop empty cells (NaNs)
-            s1 = df_mb[col].dropna()
-            s2 = df_nh[col].dropna()
-
-            # Align indices to ensure we compare the same rows
-            common_idx = s1.index.intersection(s2.index)
-
-            if len(common_idx) > 0:
-                val1 = s1.loc[common_idx].values
-                val2 = s2.loc[common_idx].values
-
-                # 1. Calculate Linear Weighted Kappa
-                # Handle cases where Kappa is impossible (e.g., only one score used)
-                try:
-                    kappa = cohen_kappa_score(val1, val2, weights='linear')
-                except:
-                    kappa = 0.0
-
-                # 2. Calculate Percent Agreement
-                agreement = np.mean(val1 == val2) * 100
-
-                # Add to global lists for pooled calculation later
-                global_mb.extend(val1)
-                global_nh.extend(val2)
-
-                # Logic for text interpretation
-                if kappa <= 0.0:
-                    verdict = "Poor"
-                elif kappa <= 0.2:
-                    verdict = "Slight"
-                elif kappa <= 0.4:
-                    verdict = "Fair"
-                elif kappa <= 0.6:
-                    verdict = "Moderate"
-                elif kappa <= 0.8:
-                    verdict = "Substantial"
-                else:
-                    verdict = "Almost perfect"
-
-                # Special Case: "Kappa Paradox" (Low Kappa but High Agreement)
-                if kappa < 0.40 and agreement > 85:
-                    interp = "Paradox*"
-
-                # Print row
-                print(f"{col[:53]:<55} | {kappa:.3f}          | {agreement:.1f}%         | {interp}")
-            else:
-                print(f"{col[:53]:<55} | ---            | ---           | No data")
-
-        print("-" * 105)
+        for i, col in enumerate(columns_of_interest):
+            if stats['n'][i] == 0:
+                print(f"{col[:43]:<45} | {'---':>4} | {'---':>8} | {'':>6} | {'':>6} | {'':>6} | "
+                      f"{'':>5} | {'':>5} | {'---':>9} | No data")
+                continue
 
-        # --- GLOBAL CALCULATIONS (POOLED) ---
-        if len(global_mb) > 0:
-            # Convert lists to numpy arrays
-            pool_mb = np.array(global_mb)
-            pool_nh = np.array(global_nh)
+            kappa = stats['kappa'][i]
+            agreement = stats['agreement'][i]
 
-            # Global Weighted Kappa
-            k_global = cohen_kappa_score(pool_mb, pool_nh, weights='linear')
+            # Logic for text interpretation
+            interp = interpret_kappa(kappa)
 
-            # Global Percent Agreement
-            a_global = np.mean(pool_mb == pool_nh) * 100
+            # Special Case: "Kappa Paradox" (Low Kappa but High Agreement)
+            if (np.isnan(kappa) or kappa < 0.40) and agreement > 85:
+                interp = "Paradox*"
 
-            print(
-                f"{'GLOBAL RESULT (Pooled across all items)':<55} | {k_global:.3f}          | {a_global:.1f}%         | GLOBAL")
-            print("=" * 105)
+            print(f"{col[:43]:<45} | {stats['n'][i]:>4} | {kappa:>8.3f} | {stats['pabak'][i]:>6.3f} | "
+                  f"{stats['ac1'][i]:>6.3f} | {stats['ac2'][i]:>6.3f} | {stats['prevalence_index'][i]:>5.2f} | "
+                  f"{stats['bias_index'][i]:>5.2f} | {agreement:>8.1f}% | {interp}")
+
+        print("-" * width)
+
+        # --- GLOBAL CALCULATIONS (POOLED) ---
+        if stats['n'][-1] > 0:
+            print(f"{'GLOBAL RESULT (Pooled across all items)':<45} | {stats['n'][-1]:>4} | "
+                  f"{stats['kappa'][-1]:>8.3f} | {stats['pabak'][-1]:>6.3f} | {stats['ac1'][-1]:>6.3f} | "
+                  f"{stats['ac2'][-1]:>6.3f} | {stats['prevalence_index'][-1]:>5.2f} | "
+                  f"{stats['bias_index'][-1]:>5.2f} | {stats['agreement'][-1]:>8.1f}% | GLOBAL")
+            print("=" * width)
             print(
                 f"*Paradox: Kappa is low due to a lack of variance (ceiling effect), but the actual agreement is high.")
-            print(f"Calculation base: {len(pool_mb)} total observations.")
+            print("PABAK and AC1 (unweighted), AC2 (linear weights): chance-corrected indices robust to prevalence.")
+            print("PI = prevalence index, BI = bias index (0 = balanced).")
+            print(f"Calculation base: {stats['n'][-1]} total observations.")
 
     except FileNotFoundError:
         print(f"Error: Could not find the file '{excel_file_path}'.")
@@ -126,4 +144,5 @@ def analyze_reliability():
         print(f"An unexpected error occurred: {e}")
 
 
-analyze_reliability()
+if __name__ == "__main__":
+    analyze_reliability()
@@ -0,0 +1,146 @@
+import os
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import Kappa_computation_COSMIN as cosmin
+import Kappa_computation_QA as qa
+from Kappa_stats import per_unit_confusion, leave_one_out_kappa
+
+# --- CONFIGURATION ---
+# Number of most influential articles listed per domain / QA item
+top_n = 5
+
+
+def influence_table(article_names, s1, s2, labels, weights):
+    """
+    Leave-one-article-out kappas for one scope.
+
+    `s1` and `s2` are (articles x items) numeric arrays for the two raters,
+    NaN where a score is missing. A rating pair counts only if both raters
+    scored it, as in the main analyses.
+
+    Returns (kappa_all, DataFrame sorted by influence). 'Delta' is the change
+    in kappa when the article is removed: a positive delta means the article
+    pulls the kappa down (it drives disagreement).
+    """
+    s1 = np.asarray(s1, dtype=float)
+    s2 = np.asarray(s2, dtype=float)
+    mask = ~np.isnan(s1) & ~np.isnan(s2)
+
+    n_articles = s1.shape[0]
+    article_codes = np.broadcast_to(np.arange(n_articles)[:, None], s1.shape)[mask]
+    cms = per_unit_confusion(article_codes, s1[mask], s2[mask], labels, n_units=n_articles)
+
+    kappa_all, kappa_loo = leave_one_out_kappa(cms, weights)
+    table = pd.DataFrame({
+        "Article": list(article_names),
+        "N pairs": cms.sum(axis=(1, 2)),
+        "Disagreements": cms.sum(axis=(1, 2)) - np.trace(cms, axis1=1, axis2=2),
+        "Kappa without": kappa_loo,
+        "Delta": kappa_loo - kappa_all,
+    })
+    table = table[table["N pairs"] > 0]
+    table = table.sort_values("Delta", ascending=False, key=lambda d: d.fillna(-np.inf))
+    return kappa_all, table.reset_index(drop=True)
+
+
+def duplicated_articles(names):
+    """
+    Article names present more than once in a rater sheet. The articles are
+    Excel headers, which pandas renames when repeated ('X', 'X.1', 'X.2'...).
+    """
+    names = [str(n) for n in names]
+    known = set(names)
+    duplicated = {n for n, count in Counter(names).items() if count > 1}
+    for name in names:
+        match = re.match(r"^(.*)\.\d+$", name)
+        if match and match.group(1) in known:
+            duplicated.add(match.group(1))
+    return sorted(duplicated)
+
+
+def cosmin_domain_influence(xls, domain_name):
+    """Influence of each article on the pooled (all questions) kappa of a domain."""
+    df_mb, df_nh, question_cols = cosmin.load_domain_sheets(xls, domain_name)
+    if not question_cols:
+        return np.nan, pd.DataFrame()
+
+    # Align the second rater on the articles of the first one (article names must be unique)
+    for rater, df in (("MB", df_mb), ("NH", df_nh)):
+        duplicated = duplicated_articles(df.index)
+        if duplicated:
+            raise ValueError(f"duplicated article(s) in the {rater} sheet: {duplicated}")
+    df_nh = df_nh.reindex(df_mb.index)
+    s1 = df_mb[question_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    s2 = df_nh[question_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+
+    observed = np.union1d(s1[~np.isnan(s1)], s2[~np.isnan(s2)])
+    return influence_table(df_mb.index, s1, s2, observed, cosmin.kappa_weights)
+
+
+def qa_item_influence(df_mb, df_nh, article_names):
+    """Influence of each article on every QA item kappa. Yields (item, kappa_all, table)."""
+    s1 = df_mb[qa.columns_of_interest].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    s2 = df_nh[qa.columns_of_interest].apply(pd.to_numeric, errors='coerce').reindex(df_mb.index)
+    s2 = s2.to_numpy(dtype=float)
+
+    observed = np.concatenate([s1[~np.isnan(s1)], s2[~np.isnan(s2)]])
+    labels = np.union1d(qa.score_levels, observed)
+    for j, item in enumerate(qa.columns_of_interest):
+        kappa_all, table = influence_table(article_names, s1[:, [j]], s2[:, [j]], labels, qa.kappa_weights)
+        yield item, kappa_all, table
+
+
+def qa_article_names(df):
+    """First column if it holds article identifiers, otherwise the Excel row number."""
+    first = df.columns[0]
+    if first not in qa.columns_of_interest:
+        return df[first].astype(str).values
+    return [f"Row {i + 2}" for i in df.index]
+
+
+def print_influence(title, kappa_all, table):
+    print(f"\n--- {title} (kappa = {kappa_all:.3f}) ---")
+    if table.empty:
+        print("    No valid data.")
+        return
+    print(f"{'ARTICLE':<40} | {'PAIRS':>5} | {'DISAGREE':>8} | {'KAPPA W/O':>9} | {'DELTA':>7}")
+    for _, r in table.head(top_n).iterrows():
+        print(f"{str(r['Article'])[:38]:<40} | {r['N pairs']:>5} | {r['Disagreements']:>8} | "
+              f"{r['Kappa without']:>9.3f} | {r['Delta']:>+7.3f}")
+
+
+# --- MAIN ---
+if __name__ == "__main__":
+    print("=" * 80)
+    print("LEAVE-ONE-ARTICLE-OUT INFLUENCE (Delta > 0: removing the article raises kappa)")
+    print("=" * 80)
+
+    # 1. COSMIN domains (pooled over questions, as in analyze_domain_clean)
+    if os.path.exists(cosmin.file_path):
+        xls = pd.ExcelFile(cosmin.file_path)
+        for domain in cosmin.domains:
+            try:
+                kappa_all, table = cosmin_domain_influence(xls, domain)
+            except Exception as e:
+                print(f"Skipping {domain} (Structure error or missing sheet): {e}")
+                continue
+            print_influence(f"COSMIN - {domain}", kappa_all, table)
+    else:
+        print(f"COSMIN file not found at: {cosmin.file_path}")
+
+    # 2. QA items
+    if os.path.exists(qa.excel_file_path):
+        df_mb = pd.read_excel(qa.excel_file_path, sheet_name=qa.sheet_rater1)
+        df_nh = pd.read_excel(qa.excel_file_path, sheet_name=qa.sheet_rater2)
+        missing = [c for c in qa.columns_of_interest if c not in df_mb.columns or c not in df_nh.columns]
+        if missing:
+            print(f"ERROR: The following columns are missing in the QA file: {missing}")
+        else:
+            for item, kappa_all, table in qa_item_influence(df_mb, df_nh, qa_article_names(df_mb)):
+                print_influence(f"QA - {item}", kappa_all, table)
+    else:
+        print(f"QA file not found at: {qa.excel_file_path}")
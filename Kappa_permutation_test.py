@@ -0,0 +1,105 @@
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+from Kappa_computation_COSMIN import file_path, domains, kappa_weights, load_domain_sheets, valid_pairs
+from Kappa_stats import permutation_test, default_jobs
+
+# --- CONFIGURATION ---
+# Same kappa weighting as the item-level analysis (kappa_weights in Kappa_computation_COSMIN)
+n_permutations = 10000
+random_seed = 2024
+
+# Use a process pool from this number of permutations on
+parallel_threshold = 50000
+
+# Optional item groups to compare, e.g.:
+# item_groups = {
+#     "Reliability (items 1-3)": ("Reliability", ["Item 1", "Item 2", "Item 3"]),
+#     "Reliability (items 4-6)": ("Reliability", ["Item 4", "Item 5", "Item 6"]),
+# }
+# Each group pools the listed questions of one domain. Leave empty to compare domains only.
+item_groups = {}
+
+
+def pooled_pairs(xls, domain_name, questions=None):
+    """
+    Pooled (v1, v2) ratings of a domain, restricted to `questions` if given.
+    Same cleaning as analyze_domain_clean: an article counts for a question
+    only if both raters gave a number.
+    """
+    df_mb, df_nh, question_cols = load_domain_sheets(xls, domain_name)
+    if questions is not None:
+        question_cols = [c for c in question_cols if c in questions]
+
+    v1_parts, v2_parts = [], []
+    for col in question_cols:
+        v1, v2 = valid_pairs(df_mb, df_nh, col)
+        v1_parts.append(v1)
+        v2_parts.append(v2)
+
+    if not v1_parts:
+        return np.array([]), np.array([])
+    return np.concatenate(v1_parts), np.concatenate(v2_parts)
+
+
+def compare_groups(groups, weights=kappa_weights, n_perm=n_permutations, seed=random_seed):
+    """
+    Pairwise permutation tests between all groups.
+    `groups` maps a name to (v1, v2) paired ratings (domain, item group or rater pair).
+    Returns a DataFrame with one row per comparison.
+    """
+    n_jobs = default_jobs() if n_perm >= parallel_threshold else 1
+    rows = []
+    for name_a, name_b in itertools.combinations(groups, 2):
+        res = permutation_test(groups[name_a], groups[name_b], weights=weights,
+                               n_perm=n_perm, seed=seed, n_jobs=n_jobs)
+        rows.append({"Group A": name_a, "Group B": name_b, **res})
+    return pd.DataFrame(rows)
+
+
+def print_comparisons(results):
+    print("\n" + "=" * 110)
+    print(f"{'GROUP A':<28} | {'GROUP B':<28} | {'KAPPA A':>7} | {'KAPPA B':>7} | {'DIFF':>7} | {'P-VALUE':>7}")
+    print("=" * 110)
+    for _, r in results.iterrows():
+        print(f"{str(r['Group A'])[:26]:<28} | {str(r['Group B'])[:26]:<28} | "
+              f"{r['kappa_a']:>7.3f} | {r['kappa_b']:>7.3f} | {r['diff']:>7.3f} | {r['p_value']:>7.4f}")
+    print("-" * 110)
+    print(f"Two-sided permutation p-values ({n_permutations} permutations, {kappa_weights} weighted kappa).")
+    print("No correction for multiple comparisons is applied.")
+
+
+# --- MAIN ---
+if __name__ == "__main__":
+    if os.path.exists(file_path):
+        print("Loading Excel file...")
+        try:
+            xls = pd.ExcelFile(file_path)
+
+            groups = {}
+            for domain in domains:
+                try:
+                    v1, v2 = pooled_pairs(xls, domain)
+                except Exception as e:
+                    print(f"Skipping {domain} (Structure error or missing sheet): {e}")
+                    continue
+                if len(v1) > 0:
+                    groups[domain] = (v1, v2)
+
+            for name, (domain, questions) in item_groups.items():
+                v1, v2 = pooled_pairs(xls, domain, questions)
+                if len(v1) > 0:
+                    groups[name] = (v1, v2)
+
+            if len(groups) < 2:
+                print("Not enough groups with valid data to compare.")
+            else:
+                print_comparisons(compare_groups(groups))
+
+        except Exception as e:
+            print(f"Critical Error: {e}")
+    else:
+        print("File not found.")
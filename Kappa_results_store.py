@@ -0,0 +1,307 @@
+"""
+Kappa_results_store.py — Tidy, cached export of the agreement analyses.
+
+Each analysis (COSMIN item level, COSMIN worst score, QA) is turned into a
+tidy table with one row per scope (item / domain / pooled total):
+
+    analysis, scope, domain, item, n, weights, kappa, kappa_ci_low, kappa_ci_high,
+    pabak, ac1, ac2, prevalence_index, bias_index, agreement,
+    agreement_ci_low, agreement_ci_high, verdict
+
+The table is written as CSV, Parquet (if pyarrow/fastparquet is installed)
+and JSON, under a key made from the SHA-256 of the input workbook, the
+settings, the configuration of the analysis module (domains, sheet names,
+items, score levels) and the source code of the modules computing it.
+Re-running with unchanged inputs reads the stored table instead of
+recomputing it.
+
+Usage : python Kappa_results_store.py
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import Kappa_computation_COSMIN as cosmin
+import Kappa_computation_COSMIN_worst_score as worst
+import Kappa_computation_QA as qa
+import Kappa_stats
+from Kappa_stats import (AgreementAccumulator, agreement_indices, bootstrap_kappa_ci,
+                         wilson_ci, interpret_kappa)
+from review_config import get_path
+
+# --- CONFIGURATION ---
+cache_dir = get_path('kappa_results')
+
+# Bootstrap settings for the kappa confidence intervals
+n_bootstrap = 2000
+ci_level = 0.95
+random_seed = 2024
+
+# Bump when the table layout or the computations change (invalidates the cache)
+RESULTS_VERSION = 1
+
+COLUMNS = [
+    "analysis", "scope", "domain", "item", "n", "weights",
+    "kappa", "kappa_ci_low", "kappa_ci_high",
+    "pabak", "ac1", "ac2", "prevalence_index", "bias_index",
+    "agreement", "agreement_ci_low", "agreement_ci_high", "verdict",
+]
+
+
+# ==========================================
+# 1. TIDY RECORDS
+# ==========================================
+def agreement_record(analysis, scope, domain, item, acc, weights, settings):
+    """One tidy row from an AgreementAccumulator."""
+    stats = agreement_indices(acc.cm, weights)
+    kappa_low, kappa_high = bootstrap_kappa_ci(acc.cm, weights, n_boot=settings["n_bootstrap"],
+                                               level=settings["ci_level"], seed=settings["random_seed"])
+    agree_low, agree_high = wilson_ci(int(np.trace(acc.cm)), acc.n, level=settings["ci_level"])
+    return {
+        "analysis": analysis,
+        "scope": scope,
+        "domain": domain,
+        "item": item,
+        "n": acc.n,
+        "weights": weights or "none",
+        "kappa": float(stats["kappa"]),
+        "kappa_ci_low": kappa_low,
+        "kappa_ci_high": kappa_high,
+        "pabak": float(stats["pabak"]),
+        "ac1": float(stats["ac1"]),
+        "ac2": float(stats["ac2"]),
+        "prevalence_index": float(stats["prevalence_index"]),
+        "bias_index": float(stats["bias_index"]),
+        "agreement": float(stats["agreement"]),
+        "agreement_ci_low": agree_low,
+        "agreement_ci_high": agree_high,
+        "verdict": interpret_kappa(float(stats["kappa"])),
+    }
+
+
+def cosmin_item_level_records(path, settings):
+    """Item, domain and pooled rows of the COSMIN item-level analysis (analyze_domain_clean)."""
+    weights = settings["cosmin_weights"]
+    xls = pd.ExcelFile(path)
+    records = []
+    grand_total = AgreementAccumulator(cosmin.score_levels)
+    for domain in cosmin.domains:
+        try:
+            df_mb, df_nh, question_cols = cosmin.load_domain_sheets(xls, domain)
+        except Exception as e:
+            print(f"Skipping {domain} (Structure error or missing sheet): {e}")
+            continue
+
+        domain_total = AgreementAccumulator(cosmin.score_levels)
+        for col in question_cols:
+            v1, v2 = cosmin.valid_pairs(df_mb, df_nh, col)
+            if len(v1) == 0:
+                continue
+            item_total = AgreementAccumulator(cosmin.score_levels).update(v1, v2)
+            domain_total.merge(item_total)
+            records.append(agreement_record("cosmin_items", "item", domain, str(col),
+                                            item_total, weights, settings))
+
+        if domain_total.n > 0:
+            grand_total.merge(domain_total)
+            records.append(agreement_record("cosmin_items", "domain", domain, "",
+                                            domain_total, weights, settings))
+
+    if grand_total.n > 0:
+        records.append(agreement_record("cosmin_items", "total", "", "", grand_total, weights, settings))
+    return records
+
+
+def cosmin_worst_score_records(path, settings):
+    """Domain and pooled rows of the COSMIN 'worst score counts' analysis."""
+    weights = settings["worst_score_weights"]
+    xls = pd.ExcelFile(path)
+    records = []
+    grand_total = AgreementAccumulator(cosmin.score_levels)
+    for domain in worst.domains:
+        try:
+            df_mb_clean, df_nh_clean = worst.load_domain_scores(xls, domain)
+        except Exception as e:
+            print(f"Skipping {domain} (Error or missing sheet): {e}")
+            continue
+        if df_mb_clean.shape[1] == 0:
+            continue
+
+        v1, v2 = worst.worst_score_pairs(df_mb_clean, df_nh_clean)
+        if len(v1) == 0:
+            continue
+        domain_total = AgreementAccumulator(cosmin.score_levels).update(v1, v2)
+        grand_total.merge(domain_total)
+        records.append(agreement_record("cosmin_worst_score", "domain", domain, "",
+                                        domain_total, weights, settings))
+
+    if grand_total.n > 0:
+        records.append(agreement_record("cosmin_worst_score", "total", "", "", grand_total, weights, settings))
+    return records
+
+
+def qa_records(path, settings):
+    """Item and pooled rows of the quality assessment analysis."""
+    weights = settings["qa_weights"]
+    pairs, labels = qa.load_qa_pairs(path)
+    records = []
+    grand_total = AgreementAccumulator(labels)
+    for item, (v1, v2) in pairs.items():
+        if len(v1) == 0:
+            continue
+        item_total = AgreementAccumulator(labels).update(v1, v2)
+        grand_total.merge(item_total)
+        records.append(agreement_record("qa", "item", "", item, item_total, weights, settings))
+
+    if grand_total.n > 0:
+        records.append(agreement_record("qa", "total", "", "", grand_total, weights, settings))
+    return records
+
+
+ANALYSES = {
+    "cosmin_items": cosmin_item_level_records,
+    "cosmin_worst_score": cosmin_worst_score_records,
+    "qa": qa_records,
+}
+
+
+def default_settings():
+    return {
+        "cosmin_weights": cosmin.kappa_weights,
+        "worst_score_weights": worst.kappa_weights,
+        "qa_weights": qa.kappa_weights,
+        "n_bootstrap": n_bootstrap,
+        "ci_level": ci_level,
+        "random_seed": random_seed,
+    }
+
+
+def analysis_settings(analysis):
+    """Configuration of the analysis module (part of the cache key): what is read and how it is scored."""
+    if analysis == "cosmin_items":
+        return {"domains": cosmin.domains, "suffixes": list(cosmin.suffixes), "score_levels": cosmin.score_levels}
+    if analysis == "cosmin_worst_score":
+        return {"domains": worst.domains, "suffixes": list(worst.suffixes), "score_levels": cosmin.score_levels}
+    return {"sheets": [qa.sheet_rater1, qa.sheet_rater2], "columns": qa.columns_of_interest,
+            "score_levels": qa.score_levels}
+
+
+ANALYSIS_MODULES = {
+    "cosmin_items": [cosmin],
+    "cosmin_worst_score": [worst, cosmin],
+    "qa": [qa],
+}
+
+
+# ==========================================
+# 2. CACHED STORE
+# ==========================================
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_sha256(analysis):
+    """Hash of the source of the modules the analysis runs (a code change invalidates the cache)."""
+    digest = hashlib.sha256()
+    for module in ANALYSIS_MODULES[analysis] + [Kappa_stats]:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def results_key(analysis, path, settings):
+    """
+    Cache key: analysis name + workbook content hash + settings + module
+    configuration and source + RESULTS_VERSION.
+    """
+    payload = json.dumps({
+        "analysis": analysis,
+        "input": file_sha256(path),
+        "settings": settings,
+        "module_settings": analysis_settings(analysis),
+        "code": code_sha256(analysis),
+        "version": RESULTS_VERSION,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def write_results(df, base_path):
+    """
+    Writes <base_path>.csv, .json and .parquet (if a Parquet engine is available).
+    Each file is written to a temporary name and then renamed, so workers of
+    a batch run sharing the same store never read a half-written table.
+    """
+    writers = {
+        ".csv": lambda p: df.to_csv(p, index=False, encoding="utf-8-sig"),
+        ".json": lambda p: df.to_json(p, orient="records", indent=1, force_ascii=False),
+        ".parquet": lambda p: df.to_parquet(p, index=False),
+    }
+    for ext, write in writers.items():
+        tmp_path = f"{base_path}.{os.getpid()}.tmp{ext}"
+        try:
+            write(tmp_path)
+        except ImportError:
+            # No Parquet engine installed
+            continue
+        os.replace(tmp_path, base_path + ext)
+
+
+def read_results(base_path):
+    """Reads a stored table (Parquet if present, otherwise JSON). None if absent."""
+    if os.path.exists(base_path + ".parquet"):
+        try:
+            return pd.read_parquet(base_path + ".parquet")
+        except ImportError:
+            pass
+    if os.path.exists(base_path + ".json"):
+        return pd.read_json(base_path + ".json", orient="records", dtype={"domain": str, "item": str})
+    return None
+
+
+def load_or_compute(analysis, path, settings=None, store_dir=None):
+    """
+    Tidy results of `analysis` ('cosmin_items', 'cosmin_worst_score' or 'qa')
+    for the workbook `path`. Returns the stored table if the workbook and
+    settings are unchanged, otherwise computes and stores it.
+    """
+    settings = settings or default_settings()
+    store_dir = store_dir or cache_dir
+    base_path = os.path.join(store_dir, f"{analysis}_{results_key(analysis, path, settings)}")
+
+    cached = read_results(base_path)
+    if cached is not None:
+        return cached
+
+    df = pd.DataFrame(ANALYSES[analysis](path, settings), columns=COLUMNS)
+    os.makedirs(store_dir, exist_ok=True)
+    write_results(df, base_path)
+    return df
+
+
+# --- MAIN ---
+if __name__ == "__main__":
+    inputs = {
+        "cosmin_items": cosmin.file_path,
+        "cosmin_worst_score": worst.file_path,
+        "qa": qa.excel_file_path,
+    }
+    tables = []
+    for analysis, path in inputs.items():
+        if not os.path.exists(path):
+            print(f"File not found for {analysis}: {path}")
+            continue
+        tables.append(load_or_compute(analysis, path))
+
+    if tables:
+        combined = pd.concat(tables, ignore_index=True)
+        write_results(combined, os.path.join(cache_dir, "agreement_results"))
+        print(combined.to_string(index=False, max_colwidth=40))
+        print(f"\nResults written to: {cache_dir}")
@@ -0,0 +1,446 @@
+"""
+Kappa_stats.py — Shared agreement statistics computed from confusion matrices.
+
+All statistics are derived from K x K confusion matrices (rater 1 in rows,
+rater 2 in columns), so they can be evaluated for many matrices at once
+(permutations, bootstrap replicates, leave-one-out...) without going back
+to the raw ratings.
+
+The weighted kappa follows sklearn's `cohen_kappa_score` exactly: weights are
+based on the rank of each category among the categories actually used by
+the two raters, so the numbers match the existing Kappa_computation_* scripts.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+
+# ==========================================
+# 1. CONFUSION MATRICES
+# ==========================================
+def category_codes(values, labels):
+    """
+    Maps raw ratings to their position in `labels` (sorted array).
+    Raises ValueError if a rating is not one of the labels.
+    """
+    values = np.asarray(values)
+    labels = np.asarray(labels)
+    codes = np.searchsorted(labels, values)
+    codes = np.clip(codes, 0, len(labels) - 1)
+    if len(values) and not np.array_equal(labels[codes], values):
+        unknown = np.setdiff1d(values, labels)
+        raise ValueError(f"Ratings not in the category set {labels.tolist()}: {unknown.tolist()}")
+    return codes
+
+
+def confusion_matrix(v1, v2, labels=None):
+    """
+    K x K confusion matrix of two rating vectors (int64 counts).
+    If `labels` is None, the union of observed ratings is used (like sklearn).
+    """
+    v1 = np.asarray(v1)
+    v2 = np.asarray(v2)
+    if labels is None:
+        labels = np.union1d(v1, v2)
+    labels = np.asarray(labels)
+    k = len(labels)
+    pair_codes = category_codes(v1, labels) * k + category_codes(v2, labels)
+    return np.bincount(pair_codes, minlength=k * k).reshape(k, k).astype(np.int64)
+
+
+# ==========================================
+# 2. STATISTICS (VECTORIZED OVER LEADING AXES)
+# ==========================================
+def disagreement_weights(cm, weights=None):
+    """
+    Disagreement weights matching sklearn for every matrix in `cm` (..., K, K).
+    Categories used by neither rater are skipped when ranking, so the weights
+    of a matrix only depend on the categories it actually contains.
+    """
+    cm = np.asarray(cm)
+    k = cm.shape[-1]
+    if weights is None:
+        w = 1.0 - np.eye(k)
+        return np.broadcast_to(w, cm.shape)
+
+    used = (cm.sum(axis=-1) + cm.sum(axis=-2)) > 0
+    rank = np.cumsum(used, axis=-1) - 1
+    diff = np.abs(rank[..., :, None] - rank[..., None, :]).astype(float)
+    if weights == "linear":
+        return diff
+    if weights == "quadratic":
+        return diff ** 2
+    raise ValueError(f"Unknown weighting: {weights!r}")
+
+
+def kappa_from_confusion(cm, weights=None):
+    """
+    Cohen's kappa (unweighted, 'linear' or 'quadratic') of one or many
+    confusion matrices. Returns NaN where kappa is undefined (no variance).
+    """
+    cm = np.asarray(cm, dtype=float)
+    n = cm.sum(axis=(-2, -1))
+    rows = cm.sum(axis=-1)
+    cols = cm.sum(axis=-2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = rows[..., :, None] * cols[..., None, :] / n[..., None, None]
+        w = disagreement_weights(cm, weights)
+        observed_dis = (w * cm).sum(axis=(-2, -1))
+        expected_dis = (w * expected).sum(axis=(-2, -1))
+        return 1.0 - observed_dis / expected_dis
+
+
+def agreement_from_confusion(cm):
+    """Raw percent agreement (diagonal / total * 100). NaN for empty matrices."""
+    cm = np.asarray(cm, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.trace(cm, axis1=-2, axis2=-1) / cm.sum(axis=(-2, -1)) * 100
+
+
+def scale_disagreement(k, weights=None):
+    """
+    Disagreement weights on the full K-point scale (category positions 0..K-1),
+    used by the chance-independent statistics (PABAK, Gwet's AC1/AC2).
+    """
+    pos = np.arange(k)
+    diff = np.abs(pos[:, None] - pos[None, :]).astype(float)
+    if weights is None:
+        return (diff > 0).astype(float)
+    if weights == "linear":
+        return diff
+    if weights == "quadratic":
+        return diff ** 2
+    raise ValueError(f"Unknown weighting: {weights!r}")
+
+
+def pabak_from_confusion(cm, weights=None):
+    """
+    Prevalence-and-bias-adjusted kappa: kappa with chance agreement taken from
+    a uniform distribution over the K categories. Unweighted, this is
+    (K * p_o - 1) / (K - 1), i.e. 2 * p_o - 1 for a binary scale.
+    Undefined (NaN) on a single-category scale (K = 1): no disagreement is possible.
+    """
+    cm = np.asarray(cm, dtype=float)
+    k = cm.shape[-1]
+    if k < 2:
+        return np.full(cm.shape[:-2], np.nan)[()]
+    d = scale_disagreement(k, weights)
+    n = cm.sum(axis=(-2, -1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 1.0 - (d * cm).sum(axis=(-2, -1)) / (n * d.sum() / k ** 2)
+
+
+def gwet_ac_from_confusion(cm, weights=None):
+    """
+    Gwet's AC1 (weights=None) or AC2 ('linear' / 'quadratic') agreement
+    coefficient. Chance agreement uses the mean classification probability of
+    the two raters, which keeps the coefficient stable when one category
+    dominates (the "kappa paradox").
+    Undefined (NaN) on a single-category scale (K = 1), like PABAK.
+    """
+    cm = np.asarray(cm, dtype=float)
+    k = cm.shape[-1]
+    if k < 2:
+        return np.full(cm.shape[:-2], np.nan)[()]
+    d = scale_disagreement(k, weights)
+    n = cm.sum(axis=(-2, -1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = 1.0 - d / d.max()
+        p = cm / n[..., None, None]
+        pi = (p.sum(axis=-1) + p.sum(axis=-2)) / 2
+        p_a = (w * p).sum(axis=(-2, -1))
+        p_e = w.sum() / (k * (k - 1)) * (pi * (1 - pi)).sum(axis=-1)
+        return (p_a - p_e) / (1 - p_e)
+
+
+def prevalence_index(cm):
+    """
+    Prevalence index: spread of the agreement cells, (max - min of the diagonal) / N.
+    Equals |a - d| / N for a 2 x 2 table.
+    """
+    cm = np.asarray(cm, dtype=float)
+    diag = np.diagonal(cm, axis1=-2, axis2=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (diag.max(axis=-1) - diag.min(axis=-1)) / cm.sum(axis=(-2, -1))
+
+
+def bias_index(cm):
+    """
+    Bias index: half the total difference between the two raters' marginals / N.
+    Equals |b - c| / N for a 2 x 2 table.
+    """
+    cm = np.asarray(cm, dtype=float)
+    diff = np.abs(cm.sum(axis=-1) - cm.sum(axis=-2)).sum(axis=-1) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return diff / cm.sum(axis=(-2, -1))
+
+
+def agreement_indices(cm, weights=None):
+    """
+    Every agreement statistic of one or many confusion matrices, in one pass.
+    Kappa and AC2 use `weights`; PABAK and AC1 are unweighted.
+    """
+    cm = np.asarray(cm)
+    return {
+        "n": cm.sum(axis=(-2, -1)),
+        "kappa": kappa_from_confusion(cm, weights),
+        "pabak": pabak_from_confusion(cm),
+        "ac1": gwet_ac_from_confusion(cm),
+        "ac2": gwet_ac_from_confusion(cm, weights if weights is not None else "linear"),
+        "prevalence_index": prevalence_index(cm),
+        "bias_index": bias_index(cm),
+        "agreement": agreement_from_confusion(cm),
+    }
+
+
+def interpret_kappa(kappa):
+    """Landis & Koch verbal label of a kappa value."""
+    if np.isnan(kappa):
+        return "Undefined"
+    if kappa <= 0.0:
+        return "Poor"
+    elif kappa <= 0.2:
+        return "Slight"
+    elif kappa <= 0.4:
+        return "Fair"
+    elif kappa <= 0.6:
+        return "Moderate"
+    elif kappa <= 0.8:
+        return "Substantial"
+    return "Almost perfect"
+
+
+def bootstrap_kappa_ci(cm, weights=None, n_boot=2000, level=0.95, seed=None):
+    """
+    Percentile bootstrap CI of kappa. Rating pairs are resampled with
+    replacement, which is a multinomial draw over the confusion-matrix cells,
+    so all replicates are evaluated as one stack of matrices.
+    Returns (low, high); NaN if the matrix is empty.
+    """
+    cm = np.asarray(cm, dtype=np.int64)
+    n = int(cm.sum())
+    if n == 0:
+        return np.nan, np.nan
+    rng = np.random.default_rng(seed)
+    draws = rng.multinomial(n, cm.ravel() / n, size=n_boot).reshape(n_boot, *cm.shape)
+    kappas = kappa_from_confusion(draws, weights)
+    kappas = kappas[~np.isnan(kappas)]
+    if len(kappas) == 0:
+        return np.nan, np.nan
+    alpha = (1 - level) / 2
+    low, high = np.quantile(kappas, [alpha, 1 - alpha])
+    return float(low), float(high)
+
+
+def wilson_ci(successes, n, level=0.95):
+    """Wilson score interval of a proportion, in percent. Returns (low, high)."""
+    if n == 0:
+        return np.nan, np.nan
+    z = NormalDist().inv_cdf(1 - (1 - level) / 2)
+    p = successes / n
+    centre = (p + z ** 2 / (2 * n)) / (1 + z ** 2 / n)
+    half = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / (1 + z ** 2 / n)
+    return float((centre - half) * 100), float((centre + half) * 100)
+
+
+# ==========================================
+# 3. STREAMING ACCUMULATOR
+# ==========================================
+class AgreementAccumulator:
+    """
+    Running K x K confusion matrix of two raters.
+
+    Holds only the category labels and the counts (O(K^2) memory), whatever
+    the number of ratings. `update` adds paired ratings, `merge` adds another
+    accumulator (item -> domain -> grand total, or results coming from other
+    sheets, processes or files). New categories extend the matrix on the fly.
+    """
+
+    def __init__(self, labels=()):
+        self.labels = np.unique(np.asarray(labels, dtype=float))
+        self.cm = np.zeros((len(self.labels), len(self.labels)), dtype=np.int64)
+
+    def _extend(self, labels):
+        new_labels = np.union1d(self.labels, np.asarray(labels, dtype=float))
+        if len(new_labels) == len(self.labels):
+            return
+        idx = np.searchsorted(new_labels, self.labels)
+        cm = np.zeros((len(new_labels), len(new_labels)), dtype=np.int64)
+        cm[np.ix_(idx, idx)] = self.cm
+        self.labels, self.cm = new_labels, cm
+
+    def update(self, v1, v2):
+        """Adds paired ratings (equal-length vectors without missing values)."""
+        v1 = np.asarray(v1, dtype=float)
+        v2 = np.asarray(v2, dtype=float)
+        if len(v1) != len(v2):
+            raise ValueError(f"Rating vectors differ in length: {len(v1)} vs {len(v2)}")
+        self._extend(np.union1d(v1, v2))
+        self.cm += confusion_matrix(v1, v2, self.labels)
+        return self
+
+    def merge(self, other):
+        """Adds the counts of another accumulator."""
+        self._extend(other.labels)
+        idx = np.searchsorted(self.labels, other.labels)
+        self.cm[np.ix_(idx, idx)] += other.cm
+        return self
+
+    @property
+    def n(self):
+        return int(self.cm.sum())
+
+    def kappa(self, weights=None):
+        return float(kappa_from_confusion(self.cm, weights))
+
+    def agreement(self):
+        return float(agreement_from_confusion(self.cm))
+
+    def metrics(self, weights=None):
+        """(kappa, percent agreement); an undefined kappa (no variance) is reported as 0."""
+        if self.n == 0:
+            return 0.0, 0.0
+        kappa = self.kappa(weights)
+        if np.isnan(kappa):
+            kappa = 0.0
+        return kappa, self.agreement()
+
+
+# ==========================================
+# 4. LEAVE-ONE-OUT INFLUENCE
+# ==========================================
+def per_unit_confusion(unit_codes, v1, v2, labels, n_units=None):
+    """
+    One confusion matrix per unit (e.g. per article), shape (n_units, K, K).
+    `unit_codes[i]` is the unit (0..n_units-1) the rating pair (v1[i], v2[i]) belongs to.
+    """
+    unit_codes = np.asarray(unit_codes)
+    labels = np.asarray(labels)
+    k = len(labels)
+    if n_units is None:
+        n_units = int(unit_codes.max()) + 1 if len(unit_codes) else 0
+    cell = category_codes(v1, labels) * k + category_codes(v2, labels)
+    counts = np.bincount(unit_codes * k * k + cell, minlength=n_units * k * k)
+    return counts.reshape(n_units, k, k).astype(np.int64)
+
+
+def leave_one_out_kappa(unit_cms, weights=None):
+    """
+    Kappa with each unit left out in turn, from the per-unit confusion matrices.
+    Each leave-one-out matrix is (total - unit), so the whole analysis costs
+    O(n * K^2) instead of n full recomputations.
+    Returns (kappa_all, kappa_without_unit array).
+    """
+    unit_cms = np.asarray(unit_cms)
+    total = unit_cms.sum(axis=0)
+    return float(kappa_from_confusion(total, weights)), kappa_from_confusion(total - unit_cms, weights)
+
+
+# ==========================================
+# 5. PERMUTATION TEST (DIFFERENCE OF KAPPAS)
+# ==========================================
+# Permutations per random stream. Fixed (not derived from n_jobs) so that a
+# seeded test gives the same p-value whatever the number of processes.
+PERMUTATION_CHUNK = 2000
+
+
+def _pair_onehot(v1, v2, labels):
+    """One row per rating pair, one column per confusion-matrix cell."""
+    k = len(labels)
+    pair_codes = category_codes(v1, labels) * k + category_codes(v2, labels)
+    onehot = np.zeros((len(pair_codes), k * k), dtype=np.float32)
+    onehot[np.arange(len(pair_codes)), pair_codes] = 1.0
+    return onehot
+
+
+def _permuted_differences(onehot, total, n_a, k, weights, n_perm, seed, batch_size):
+    """
+    Kappa(A) - Kappa(B) for `n_perm` random relabellings of the pooled pairs.
+    Each batch draws all permutations at once; the confusion matrix of group A
+    is the product (assignment matrix @ one-hot pair cells), and group B is the
+    pooled total minus A.
+    """
+    rng = np.random.default_rng(seed)
+    n = onehot.shape[0]
+    diffs = np.empty(n_perm)
+    done = 0
+    while done < n_perm:
+        size = min(batch_size, n_perm - done)
+        # Random group assignment: the n_a smallest keys go to group A
+        keys = rng.random((size, n))
+        in_a = np.argsort(keys, axis=1)[:, :n_a]
+        assign = np.zeros((size, n), dtype=np.float32)
+        np.put_along_axis(assign, in_a, 1.0, axis=1)
+
+        cm_a = (assign @ onehot).reshape(size, k, k)
+        cm_b = total - cm_a
+        diffs[done:done + size] = (kappa_from_confusion(cm_a, weights)
+                                   - kappa_from_confusion(cm_b, weights))
+        done += size
+    return diffs
+
+
+def permutation_test(group_a, group_b, weights=None, n_perm=10000, seed=None,
+                     n_jobs=1, batch_size=1000, labels=None):
+    """
+    Two-sided permutation test of H0: kappa(A) == kappa(B).
+
+    `group_a` and `group_b` are (v1, v2) tuples of paired ratings (two domains,
+    two item groups, or the same items scored by two rater pairs). Under H0 the
+    rating pairs are exchangeable between the groups, so group labels are
+    shuffled and the kappa difference recomputed from the permuted confusion
+    matrices. With n_jobs > 1 the permutations are split across a process pool;
+    a given seed gives the same p-value for any n_jobs.
+
+    Returns a dict: kappa_a, kappa_b, diff, p_value, n_a, n_b, n_perm.
+    NaN kappas (no variance in a permuted group) are counted as non-extreme.
+    """
+    a1, a2 = (np.asarray(v) for v in group_a)
+    b1, b2 = (np.asarray(v) for v in group_b)
+    if labels is None:
+        labels = np.union1d(np.union1d(a1, a2), np.union1d(b1, b2))
+    labels = np.asarray(labels)
+    k = len(labels)
+
+    cm_a = confusion_matrix(a1, a2, labels)
+    cm_b = confusion_matrix(b1, b2, labels)
+    kappa_a = kappa_from_confusion(cm_a, weights)
+    kappa_b = kappa_from_confusion(cm_b, weights)
+    observed = kappa_a - kappa_b
+
+    onehot = _pair_onehot(np.concatenate([a1, b1]), np.concatenate([a2, b2]), labels)
+    total = (cm_a + cm_b).astype(np.float32)
+    n_a = len(a1)
+
+    # One random stream per chunk of PERMUTATION_CHUNK permutations; the processes share the chunks
+    sizes = [min(PERMUTATION_CHUNK, n_perm - start) for start in range(0, n_perm, PERMUTATION_CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if n_jobs > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(sizes))) as pool:
+            futures = [pool.submit(_permuted_differences, onehot, total, n_a, k, weights, size, s, batch_size)
+                       for size, s in zip(sizes, seeds)]
+            diffs = np.concatenate([f.result() for f in futures])
+    else:
+        diffs = np.concatenate([_permuted_differences(onehot, total, n_a, k, weights, size, s, batch_size)
+                                for size, s in zip(sizes, seeds)] or [np.empty(0)])
+
+    extreme = np.sum(np.abs(diffs[~np.isnan(diffs)]) >= abs(observed) - 1e-12)
+    p_value = (extreme + 1) / (n_perm + 1) if not np.isnan(observed) else np.nan
+
+    return {
+        "kappa_a": float(kappa_a),
+        "kappa_b": float(kappa_b),
+        "diff": float(observed),
+        "p_value": float(p_value),
+        "n_a": n_a,
+        "n_b": len(b1),
+        "n_perm": n_perm,
+    }
+
+
+def default_jobs():
+    """Number of worker processes to use when n_jobs is not given."""
+    return max(1, (os.cpu_count() or 1) - 1)
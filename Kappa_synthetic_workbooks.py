@@ -0,0 +1,123 @@
+"""
+Kappa_synthetic_workbooks.py — Synthetic COSMIN and QA workbooks for testing and benchmarks.
+
+The workbooks have the same layout as the real ones, so every Kappa_* script
+runs on them unchanged:
+  - COSMIN : one sheet per domain and rater ("<Domain>_MB", "<Domain>_NH", then
+             "<Domain>_R3"...), items in rows, articles in columns ("AuthorN et al. 20xx")
+  - QA     : one sheet per rater ("QA_MB_v2", "QA_NH_v2", then "QA_R3_v2"...),
+             articles in rows, the 13 QA items in columns
+
+Each article/item has a "true" score; every rater reports it with probability
+`agreement` and a random score otherwise, and leaves a cell empty with
+probability `missing`.
+
+Usage :
+    python Kappa_synthetic_workbooks.py --articles 1000 --items 20 --raters 3 --out synthetic
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+import Kappa_computation_COSMIN as cosmin
+import Kappa_computation_QA as qa
+
+# Rater codes used in the sheet names (first two match the real workbooks)
+RATER_CODES = ["MB", "NH"]
+
+
+def rater_codes(n_raters):
+    return (RATER_CODES + [f"R{i + 1}" for i in range(len(RATER_CODES), n_raters)])[:n_raters]
+
+
+def make_ratings(n_articles, n_items, n_raters=2, agreement=0.8, missing=0.1,
+                 levels=(0, 1, 2, 3), prevalence=None, seed=None):
+    """
+    Synthetic ratings, shape (raters x articles x items), NaN for missing cells.
+    `prevalence` gives the probability of each level for the true scores
+    (default: skewed towards the highest level, as in real quality ratings).
+    """
+    rng = np.random.default_rng(seed)
+    levels = np.asarray(levels, dtype=float)
+    if prevalence is None:
+        prevalence = np.arange(1, len(levels) + 1, dtype=float)
+        prevalence /= prevalence.sum()
+
+    truth = rng.choice(levels, size=(n_articles, n_items), p=prevalence)
+    shape = (n_raters, n_articles, n_items)
+    noise = rng.choice(levels, size=shape)
+    ratings = np.where(rng.random(shape) < agreement, truth, noise)
+    ratings[rng.random(shape) < missing] = np.nan
+    return ratings
+
+
+def article_names(n_articles):
+    return [f"Author{i} et al. {2000 + i % 25}" for i in range(n_articles)]
+
+
+def write_cosmin_workbook(path, n_articles=30, n_items=6, n_raters=2, agreement=0.8,
+                          missing=0.1, seed=None):
+    """COSMIN workbook: every domain of Kappa_computation_COSMIN, one sheet per rater."""
+    articles = article_names(n_articles)
+    codes = rater_codes(n_raters)
+    rng = np.random.default_rng(seed)
+    with pd.ExcelWriter(path) as writer:
+        for domain in cosmin.domains:
+            ratings = make_ratings(n_articles, n_items, n_raters, agreement, missing,
+                                   levels=cosmin.score_levels, seed=rng.integers(2 ** 32))
+            items = [f"{domain} - Item {j + 1}" for j in range(n_items)]
+            for code, scores in zip(codes, ratings):
+                # Items in rows, articles in columns (as in the real sheets)
+                sheet = pd.DataFrame(scores.T, columns=articles)
+                sheet.insert(0, "Item", items)
+                sheet.to_excel(writer, sheet_name=f"{domain}_{code}"[:31], index=False)
+    return path
+
+
+def write_qa_workbook(path, n_articles=30, n_items=None, n_raters=2, agreement=0.85,
+                      missing=0.05, seed=None):
+    """
+    QA workbook with one sheet per rater. Uses the 13 QA items; extra synthetic
+    items are appended when n_items > 13.
+    """
+    items = list(qa.columns_of_interest)
+    n_items = n_items or len(items)
+    items = (items + [f"{j + 1} Synthetic item" for j in range(len(items), n_items)])[:n_items]
+    codes = rater_codes(n_raters)
+    ratings = make_ratings(n_articles, n_items, n_raters, agreement, missing,
+                           levels=qa.score_levels, seed=seed)
+    with pd.ExcelWriter(path) as writer:
+        for code, scores in zip(codes, ratings):
+            sheet = pd.DataFrame(scores, columns=items)
+            sheet.insert(0, "Article", article_names(n_articles))
+            sheet.to_excel(writer, sheet_name=f"QA_{code}_v2", index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Writes synthetic COSMIN and QA workbooks.")
+    parser.add_argument("--articles", type=int, default=30)
+    parser.add_argument("--items", type=int, default=6, help="Items per COSMIN domain")
+    parser.add_argument("--qa-items", type=int, default=None, help="QA items (default 13)")
+    parser.add_argument("--raters", type=int, default=2)
+    parser.add_argument("--agreement", type=float, default=0.8)
+    parser.add_argument("--missing", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="synthetic", help="Output folder")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    tag = f"{args.articles}x{args.items}_r{args.raters}"
+    p1 = write_cosmin_workbook(os.path.join(args.out, f"COSMIN_kappa_{tag}.xlsx"), args.articles,
+                               args.items, args.raters, args.agreement, args.missing, args.seed)
+    p2 = write_qa_workbook(os.path.join(args.out, f"Quality_assessment_kappa_{tag}.xlsx"), args.articles,
+                           args.qa_items, args.raters, args.agreement, args.missing, args.seed)
+    print(f"✅ Écrit : {p1}")
+    print(f"✅ Écrit : {p2}")
+
+
+if __name__ == "__main__":
+    main()
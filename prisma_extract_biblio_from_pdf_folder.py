@@ -13,8 +13,11 @@ Prérequis : Docker Desktop lancé (🐳 running)
 import sys, os, time, re, csv, socket, subprocess
 from pathlib import Path
 
+from review_config import get_path
+from review_profiling import stage
+
 # ========== CONFIG UTILISATEUR ==========
-PDF_DIR = Path(r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\Full_text")
+PDF_DIR = Path(get_path('pdf_dir'))
 OUT_DIR = PDF_DIR / "output"
 GROBID_PORT = 8070
 GROBID_IMAGE = "lfoppiano/grobid:0.8.0"
@@ -283,10 +286,12 @@ def main():
         try:
             if not pdf.exists():
                 raise FileNotFoundError("Disparu avant ouverture (OneDrive ?)")
-            tei = call_grobid(pdf)
+            with stage("grobid"):
+                tei = call_grobid(pdf)
             (OUT_DIR / (pdf.stem + ".tei.xml")).write_text(tei, encoding="utf-8")
 
-            refs = parse_refs_from_tei(tei)
+            with stage("parse_tei"):
+                refs = parse_refs_from_tei(tei)
             for r in refs:
                 r["source_pdf"] = pdf.name
             all_rows.extend(refs)
@@ -335,7 +340,8 @@ def main():
         for r in uniq:
             if r.get("doi"):
                 continue
-            hit = crossref_enrich(r.get("title"))
+            with stage("crossref"):
+                hit = crossref_enrich(r.get("title"))
             if hit and hit.get("doi"):
                 r["doi"] = hit["doi"]
                 if not r.get("year") and hit.get("year"):
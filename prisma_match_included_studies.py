@@ -0,0 +1,207 @@
+"""
+prisma_match_included_studies.py — Links the extracted references (refs_unique.csv) to the included studies.
+
+Backward-citation snowballing: every reference cited by the included PDFs
+(prisma_extract_biblio_from_pdf_folder.py) is compared with the titles of the
+Global_overview sheet, and labelled:
+  - 'already included'    : best title score >= INCLUDED_SCORE (same title,
+                            up to GROBID / typing differences)
+  - 'candidate new study' : best title score >= CANDIDATE_SCORE, or a usable
+                            title and the same first author and year as an
+                            included study (other report of the same cohort,
+                            companion paper...) -> to screen first
+  - 'no match'            : nothing close among the included studies, and
+                            every reference without a usable title (shorter
+                            than MIN_TITLE_LENGTH once normalised)
+
+Titles are normalised (lower case, punctuation removed) and their words
+sorted once, so that the plain fuzz.ratio of cdist gives the token_sort_ratio
+(word order ignored) about 5x faster. Each distinct title is scored once, and
+the scores of all (reference, study) pairs come from one rapidfuzz cdist call
+per block of references, on all cores, as uint8: 50k references x 500
+studies take a few seconds and BLOCK_SIZE x 500 bytes of memory.
+
+Output: refs_matched.csv next to refs_unique.csv (columns of refs_unique +
+match_label, match_score, ArtNb, included_ref, included_title).
+
+Usage :
+    python prisma_match_included_studies.py
+    python prisma_match_included_studies.py --refs other/refs_unique.csv --candidate-score 80
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from review_config import get_path
+from review_dataset import load_global_overview, file_path, sheet_name
+from review_profiling import stage
+
+# --- CONFIGURATION ---
+REFS_PATH = os.path.join(get_path('pdf_dir'), "output", "refs_unique.csv")
+OUT_NAME = "refs_matched.csv"
+
+INCLUDED_SCORE = 90   # ratio of the sorted words (0-100)
+CANDIDATE_SCORE = 75
+MIN_TITLE_LENGTH = 10  # shorter normalised titles are not scored ('no match')
+BLOCK_SIZE = 20000     # references per cdist call
+
+LABEL_INCLUDED = "already included"
+LABEL_CANDIDATE = "candidate new study"
+LABEL_NO_MATCH = "no match"
+
+
+# ==========================================
+# 1. NORMALISATION
+# ==========================================
+def normalize_titles(titles):
+    """Series of normalised titles ('' when missing)."""
+    return (pd.Series(titles, dtype=object).fillna("").astype(str)
+            .str.replace(r"[^\w\s]", " ", regex=True)
+            .str.replace(r"\s+", " ", regex=True)
+            .str.strip().str.lower())
+
+
+def sorted_words(titles):
+    """Normalised titles with their words in alphabetical order (cdist keys)."""
+    return [" ".join(sorted(t.split())) for t in titles]
+
+
+def author_year_keys(surnames, years):
+    """'surname|year' keys (last word of the surname, lower case); '' when one part is missing."""
+    surname = normalize_titles(surnames).str.split().str[-1].fillna("")
+    year = pd.Series(years, dtype=object).astype(str).str.extract(r"(\d{4})", expand=False).fillna("")
+    keys = surname.to_numpy(dtype=object) + "|" + year.to_numpy(dtype=object)
+    keys[(surname == "").to_numpy() | (year == "").to_numpy()] = ""
+    return keys
+
+
+def included_author_keys(refs):
+    """Keys of the 'ref' column ('Smith et al. 2015', 'van der Berg and Li, 2009')."""
+    refs = pd.Series(refs, dtype=object).fillna("").astype(str)
+    surnames = refs.str.extract(r"^\s*(.*?)(?:\s+et\s+al\b|\s+and\s+|\s*&|\s*,|\s*\(|\s+\d{4})",
+                                expand=False).fillna(refs)
+    return author_year_keys(surnames, refs)
+
+
+# ==========================================
+# 2. MATCHING
+# ==========================================
+def best_matches(queries, choices, score_cutoff=CANDIDATE_SCORE, block_size=BLOCK_SIZE, workers=-1):
+    """
+    (best_index, best_score) of every query among the choices (sorted_words
+    keys), by blocks of queries. Scores below score_cutoff are cut to 0 by
+    rapidfuzz; best_index is -1 then.
+    """
+    best_index = np.full(len(queries), -1, dtype=np.int64)
+    best_score = np.zeros(len(queries), dtype=np.uint8)
+    if not len(queries) or not len(choices):
+        return best_index, best_score
+
+    for start in range(0, len(queries), block_size):
+        block = queries[start:start + block_size]
+        scores = process.cdist(block, choices, scorer=fuzz.ratio, dtype=np.uint8,
+                               score_cutoff=score_cutoff, workers=workers)
+        index = scores.argmax(axis=1)
+        best_index[start:start + len(block)] = index
+        best_score[start:start + len(block)] = scores[np.arange(len(block)), index]
+    best_index[best_score == 0] = -1
+    return best_index, best_score
+
+
+def match_references(refs, included, included_score=INCLUDED_SCORE, candidate_score=CANDIDATE_SCORE):
+    """
+    refs (title, first_author, year) and included (ArtNb, ref, title) ->
+    refs with the match columns added (labels of the module docstring).
+    """
+    ref_titles = normalize_titles(refs['title'])
+    inc_titles = normalize_titles(included['title'])
+
+    # Every distinct title is scored once
+    usable = (ref_titles.str.len() >= MIN_TITLE_LENGTH).to_numpy()
+    queries, inverse = np.unique(ref_titles[usable].to_numpy(dtype=str), return_inverse=True)
+    has_title = (inc_titles != "").to_numpy()
+    choices = inc_titles[has_title].to_numpy(dtype=str)
+    choice_rows = np.flatnonzero(has_title)
+
+    with stage("cdist"):
+        query_index, query_score = best_matches(sorted_words(queries), sorted_words(choices), candidate_score)
+
+    row = np.full(len(refs), -1, dtype=np.int64)
+    score = np.zeros(len(refs), dtype=np.uint8)
+    matched = query_index[inverse] >= 0
+    rows_usable = np.flatnonzero(usable)
+    row[rows_usable[matched]] = choice_rows[query_index[inverse][matched]]
+    score[rows_usable] = query_score[inverse]
+
+    # Same first author and year as an included study: candidate, even with another title
+    # (references without a usable title stay 'no match')
+    inc_keys = included_author_keys(included['ref'])
+    key_row = {k: i for i, k in reversed(list(enumerate(inc_keys))) if k}
+    ref_keys = author_year_keys(refs['first_author'], refs['year'])
+    same_author = np.array([k in key_row for k in ref_keys], dtype=bool) & usable
+    by_author = same_author & (row < 0)
+    row[by_author] = [key_row[k] for k in ref_keys[by_author]]
+
+    labels = np.full(len(refs), LABEL_NO_MATCH, dtype=object)
+    labels[(score >= candidate_score) | same_author] = LABEL_CANDIDATE
+    labels[score >= included_score] = LABEL_INCLUDED
+
+    out = refs.copy()
+    out['match_label'] = labels
+    out['match_score'] = score
+    found = row >= 0
+    for col, source in [('ArtNb', 'ArtNb'), ('included_ref', 'ref'), ('included_title', 'title')]:
+        values = np.full(len(refs), None, dtype=object)
+        values[found] = included[source].to_numpy(dtype=object)[row[found]]
+        out[col] = values
+    return out
+
+
+# ==========================================
+# 3. MAIN
+# ==========================================
+def main():
+    parser = argparse.ArgumentParser(description="Matches the extracted references against the included studies.")
+    parser.add_argument("--refs", default=REFS_PATH, help="refs_unique.csv of the extraction")
+    parser.add_argument("--file", default=file_path, help="Inclusion workbook (Global_overview)")
+    parser.add_argument("--sheet", default=sheet_name)
+    parser.add_argument("--out", default=None, help=f"Output CSV (default: {OUT_NAME} next to --refs)")
+    parser.add_argument("--included-score", type=int, default=INCLUDED_SCORE)
+    parser.add_argument("--candidate-score", type=int, default=CANDIDATE_SCORE)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.refs):
+        print(f"❌ Fichier introuvable : {args.refs} (lancer d'abord prisma_extract_biblio_from_pdf_folder.py)")
+        raise SystemExit(1)
+    try:
+        included = load_global_overview(args.file, columns=['ArtNb', 'ref', 'title'], sheet=args.sheet)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    with stage("read_refs"):
+        refs = pd.read_csv(args.refs, encoding="utf-8-sig", dtype=str)
+    for col in ['title', 'first_author', 'year']:
+        if col not in refs.columns:
+            refs[col] = None
+
+    t0 = time.perf_counter()
+    matched = match_references(refs, included, args.included_score, args.candidate_score)
+    elapsed = time.perf_counter() - t0
+
+    out_path = args.out or os.path.join(os.path.dirname(os.path.abspath(args.refs)), OUT_NAME)
+    matched.to_csv(out_path, index=False, encoding="utf-8-sig")
+
+    counts = matched['match_label'].value_counts()
+    print(f"🔗 {len(refs)} références x {len(included)} études incluses ({elapsed:.2f} s)")
+    for label in [LABEL_INCLUDED, LABEL_CANDIDATE, LABEL_NO_MATCH]:
+        print(f"   {label:<20} : {counts.get(label, 0)}")
+    print(f"✅ Écrit : {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+review.py — Single command-line entry point of the review scripts.
+
+    review.py [--config review.ini] <command> ...
+
+Commands :
+    extract                         bibliographies of the PDF folder (GROBID)
+    match                           extracted references vs included studies (snowballing)
+    kappa [cosmin|worst_score|qa]   inter-rater agreement (all three by default)
+    subgroups gmfcs|cp_type|laterality
+                                    articles per combination of categories
+    plots [figure ...]              review figures, headless (see review_render_all.py)
+    validate                        checks Global_overview against review_schema.py
+    config                          effective settings and the file they come from
+
+Every command reads the same settings (review_config.py): --config, or
+REVIEW_CONFIG, or review.ini in the current folder. Only argparse is imported
+up front; pandas, matplotlib, plotly... are imported by the command that
+needs them, so e.g. `review.py subgroups gmfcs` only pays for pandas.
+
+Usage :
+    python review.py subgroups gmfcs
+    python review.py --config D:/ENABLE/review.ini kappa qa
+    python review.py plots sankey years --profile web --out figures
+    python review.py --profiling stacks kappa qa      (see review_profiling.py)
+"""
+
+import argparse
+import os
+import runpy
+import sys
+
+# --- CONFIGURATION ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+KAPPA_SCRIPTS = {
+    'cosmin': "Kappa_computation_COSMIN.py",
+    'worst_score': "Kappa_computation_COSMIN_worst_score.py",
+    'qa': "Kappa_computation_QA.py",
+}
+SUBGROUP_SCRIPTS = {
+    'gmfcs': "review_GMFCS_common.py",
+    'cp_type': "review_cp_type_common.py",
+    'laterality': "review_laterality_common.py",
+}
+EXTRACT_SCRIPT = "prisma_extract_biblio_from_pdf_folder.py"
+MATCH_SCRIPT = "prisma_match_included_studies.py"
+
+
+def run_script(script):
+    """Runs one of the scripts as __main__ in this process (its own imports only)."""
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    from review_profiling import stage
+
+    with stage(os.path.splitext(script)[0]):
+        saved_argv = sys.argv
+        sys.argv = [script]
+        try:
+            runpy.run_path(os.path.join(SCRIPT_DIR, script), run_name="__main__")
+        finally:
+            sys.argv = saved_argv
+
+
+# ==========================================
+# COMMANDS
+# ==========================================
+def cmd_extract(args):
+    run_script(EXTRACT_SCRIPT)
+
+
+def cmd_match(args):
+    run_script(MATCH_SCRIPT)
+
+
+def check_names(names, known, what):
+    # argparse rejects an empty nargs="*" list when `choices` is set: checked here instead
+    unknown = [n for n in names if n not in known]
+    if unknown:
+        raise SystemExit(f"Unknown {what} {unknown}, expected {list(known)}")
+    return names or list(known)
+
+
+def cmd_kappa(args):
+    for name in check_names(args.analyses, KAPPA_SCRIPTS, "analysis"):
+        print(f"\n===== kappa : {name} =====")
+        run_script(KAPPA_SCRIPTS[name])
+
+
+def cmd_subgroups(args):
+    run_script(SUBGROUP_SCRIPTS[args.variable])
+
+
+def cmd_plots(args):
+    from review_render_all import render_all, FIGURES
+
+    results = render_all(check_names(args.figures, FIGURES, "figure"), args.out, args.jobs, args.verbose, args.profile)
+    if any(error for *_, error in results):
+        raise SystemExit(1)
+
+
+def cmd_validate(args):
+    run_script("review_schema.py")
+
+
+def cmd_config(args):
+    from review_config import describe
+
+    print("\n".join(describe()))
+
+
+def build_parser():
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    parser = argparse.ArgumentParser(prog="review", description="Review analyses and figures.")
+    parser.add_argument("--config", help="Settings file (default: REVIEW_CONFIG or ./review.ini)")
+    parser.add_argument("--profiling", metavar="MODES",
+                        help="Stage timings and memory (REVIEW_PROFILING): 1, cprofile, stacks or cprofile,stacks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("extract", help="Bibliographies of the PDF folder (GROBID + Crossref)")
+    p.set_defaults(func=cmd_extract)
+
+    p = commands.add_parser("match", help="Extracted references vs included studies (refs_matched.csv)")
+    p.set_defaults(func=cmd_match)
+
+    p = commands.add_parser("kappa", help="Inter-rater agreement")
+    p.add_argument("analyses", nargs="*", help=f"{', '.join(KAPPA_SCRIPTS)} (default: all)")
+    p.set_defaults(func=cmd_kappa)
+
+    p = commands.add_parser("subgroups", help="Articles per combination of categories")
+    p.add_argument("variable", choices=list(SUBGROUP_SCRIPTS))
+    p.set_defaults(func=cmd_subgroups)
+
+    # Both modules only import the standard library at load time
+    from review_plot_utils import PROFILES
+    from review_render_all import FIGURES
+
+    p = commands.add_parser("plots", help="Review figures, headless and in parallel")
+    p.add_argument("figures", nargs="*", help=f"{', '.join(FIGURES)} (default: all)")
+    p.add_argument("--out", default=None, help="Output folder (default: paths of the settings)")
+    p.add_argument("--profile", choices=list(PROFILES), default=None,
+                   help="Output profile (default: [plots] profile of the settings)")
+    p.add_argument("--jobs", type=int, default=None)
+    p.add_argument("--verbose", action="store_true")
+    p.set_defaults(func=cmd_plots)
+
+    p = commands.add_parser("validate", help="Checks Global_overview against the schema")
+    p.set_defaults(func=cmd_validate)
+
+    p = commands.add_parser("config", help="Effective settings")
+    p.set_defaults(func=cmd_config)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.config:
+        # Environment variable: also seen by the worker processes of `plots`
+        os.environ["REVIEW_CONFIG"] = os.path.abspath(args.config)
+    if args.profiling:
+        os.environ["REVIEW_PROFILING"] = args.profiling
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
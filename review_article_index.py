@@ -0,0 +1,321 @@
+"""
+review_article_index.py — Inverted index of the included studies, for ad-hoc queries.
+
+Every category value of the Global_overview sheet points to the set of
+articles having it, stored as a bitset (a Python int, bit i <-> row i of the
+sheet). A question such as "GMFCS III children doing stair negotiation with
+spastic diplegia" is then a boolean expression over these keys, answered by
+a few integer AND / OR operations instead of a new script:
+
+    GMFCS-III AND Stair-negotiation AND Spastic AND Diplegic
+
+Keys (case-insensitive):
+    Stair-negotiation, GMFCS-III, Diplegic...   indicator column is PRESENT
+    GMFCS-III=absent, GMFCS-III=unknown           other states ('0', '???' / empty)
+    Study_type=RCT, Study_type="Cross-sectional"  value of a text column
+    year=2015, year>=2015, year<2010              publication year
+    Study_type!=RCT, year!=2015                   negated comparisons
+
+Operators: AND (&), OR (|), NOT (!), parentheses; adjacent keys are ANDed.
+A word is an operator only when followed by a space or '(' ("not-walking" is a key).
+
+The bitsets are dense (n_articles / 8 bytes each, 63 bytes for 500 articles),
+not compressed (roaring, run-length): at the size of a systematic review the
+whole index fits in a few kB and one AND / OR is a single big-int operation,
+while compressed formats only pay off for sparse sets over millions of rows.
+
+Usage :
+    python review_article_index.py "GMFCS-III AND Stair-negotiation AND (Spastic OR Mixed)"
+    python review_article_index.py            (interactive mode)
+"""
+
+import argparse
+import difflib
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from review_dataset import (load_global_overview, file_path, sheet_name, ID_COLUMNS, TASK_COLUMNS,
+                            GMFCS_COLUMNS, TOPOGRAPHY_COLUMNS, SUBTYPE_COLUMNS)
+from review_presence_codec import encode_presence, STATUS_LABELS, PRESENT
+
+# --- CONFIGURATION ---
+INDICATOR_COLUMNS = TASK_COLUMNS + GMFCS_COLUMNS + TOPOGRAPHY_COLUMNS + SUBTYPE_COLUMNS
+VALUE_COLUMNS = ['Study_type']
+YEAR_COLUMN = 'year'
+
+# Value key of the empty cells of a text column
+MISSING_VALUE = "unknown"
+
+
+# ==========================================
+# 1. BITSETS
+# ==========================================
+def to_bitset(mask):
+    """Boolean row mask -> int bitset (bit i set if mask[i])."""
+    packed = np.packbits(np.asarray(mask, dtype=bool), bitorder="little")
+    return int.from_bytes(packed.tobytes(), "little")
+
+
+def bitset_rows(bits, n_rows):
+    """int bitset -> sorted row positions."""
+    raw = np.frombuffer(bits.to_bytes((n_rows + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little")[:n_rows])
+
+
+def normalize_key(text):
+    return str(text).strip().strip('"').strip().lower()
+
+
+# ==========================================
+# 2. QUERY PARSER
+# ==========================================
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<lpar>\() | (?P<rpar>\)) |
+        (?P<op>(?:AND|OR|NOT)(?=[\s(]|$)|&&?|\|\|?|!(?!=)) |
+        (?P<atom>[^\s()&|!<>=]+(?:\s*(?:>=|<=|!=|=|>|<)\s*(?:"[^"]*"|[^\s()&|!<>=]+))?)
+    )""", re.VERBOSE | re.IGNORECASE)
+
+ATOM_RE = re.compile(r'^(?P<name>[^<>=!]+?)\s*(?:(?P<cmp>>=|<=|!=|=|>|<)\s*(?P<value>.+))?$')
+
+OPERATORS = {"and": "AND", "&": "AND", "&&": "AND",
+             "or": "OR", "|": "OR", "||": "OR",
+             "not": "NOT", "!": "NOT"}
+
+
+def tokenize(expression):
+    tokens, pos = [], 0
+    expression = expression.rstrip()
+    while pos < len(expression):
+        match = TOKEN_RE.match(expression, pos)
+        if match is None or match.end() == pos:
+            raise SyntaxError(f"Unexpected text at position {pos}: {expression[pos:]!r}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "op":
+            tokens.append(("op", OPERATORS[text.lower()]))
+        else:
+            tokens.append((kind, text))
+        pos = match.end()
+    return tokens
+
+
+class QueryParser:
+    """
+    Recursive descent over the tokens, evaluated on the fly:
+        expr   := term (OR term)*
+        term   := factor ([AND] factor)*
+        factor := NOT factor | '(' expr ')' | atom
+    """
+
+    def __init__(self, index, expression):
+        self.index = index
+        self.tokens = tokenize(expression)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise SyntaxError("Empty query")
+        bits = self.expr()
+        if self.pos < len(self.tokens):
+            raise SyntaxError(f"Unexpected {self.peek()[1]!r}")
+        return bits
+
+    def expr(self):
+        bits = self.term()
+        while self.peek() == ("op", "OR"):
+            self.take()
+            bits |= self.term()
+        return bits
+
+    def term(self):
+        bits = self.factor()
+        while True:
+            kind, value = self.peek()
+            if (kind, value) == ("op", "AND"):
+                self.take()
+            elif not (kind in ("atom", "lpar") or (kind, value) == ("op", "NOT")):
+                return bits
+            bits &= self.factor()
+
+    def factor(self):
+        kind, value = self.take()
+        if (kind, value) == ("op", "NOT"):
+            return self.index.all_bits & ~self.factor()
+        if kind == "lpar":
+            bits = self.expr()
+            if self.take()[0] != "rpar":
+                raise SyntaxError("Missing ')'")
+            return bits
+        if kind == "atom":
+            return self.index.atom(value)
+        raise SyntaxError(f"Unexpected {value!r}" if value else "Incomplete query")
+
+
+# ==========================================
+# 3. INDEX
+# ==========================================
+class ArticleIndex:
+    """Bitsets of the sheet rows per category value."""
+
+    def __init__(self, df):
+        self.n = len(df)
+        self.all_bits = (1 << self.n) - 1
+        self.articles = df[[c for c in ID_COLUMNS if c in df.columns]].reset_index(drop=True)
+        self.postings = {}
+        self.values = {}
+        self.years = {}
+
+        # Indicator columns: one bitset per column and status, in one decoding pass
+        indicators = [c for c in INDICATOR_COLUMNS if c in df.columns]
+        codes, _ = encode_presence(df, indicators)
+        for j, col in enumerate(indicators):
+            for code, label in STATUS_LABELS.items():
+                bits = to_bitset(codes[:, j] == code)
+                self.postings[f"{normalize_key(col)}={label.lower()}"] = bits
+                if code == PRESENT:
+                    self.postings[normalize_key(col)] = bits
+
+        # Text columns: one bitset per distinct value
+        for col in [c for c in VALUE_COLUMNS if c in df.columns]:
+            text = df[col].astype(object).where(df[col].notna())
+            keys = text.map(lambda v: MISSING_VALUE if pd.isna(v) else normalize_key(v))
+            codes_v, uniques = pd.factorize(keys)
+            self.values[normalize_key(col)] = {u: to_bitset(codes_v == k) for k, u in enumerate(uniques)}
+
+        # Years: one bitset per year, comparisons OR the matching years
+        if YEAR_COLUMN in df.columns:
+            years = pd.to_numeric(df[YEAR_COLUMN], errors="coerce").to_numpy()
+            for year in np.unique(years[~np.isnan(years)]).astype(int):
+                self.years[int(year)] = to_bitset(years == year)
+
+    @classmethod
+    def from_workbook(cls, path=file_path, sheet=sheet_name):
+        columns = ID_COLUMNS + INDICATOR_COLUMNS + VALUE_COLUMNS + [YEAR_COLUMN]
+        return cls(load_global_overview(path, columns=columns, sheet=sheet))
+
+    def keys(self):
+        keys = sorted(self.postings)
+        keys += [f"{col}={value}" for col, values in self.values.items() for value in sorted(values)]
+        if self.years:
+            keys.append(f"{YEAR_COLUMN}={min(self.years)}..{max(self.years)}")
+        return keys
+
+    def unknown_key(self, key):
+        close = difflib.get_close_matches(key, self.keys(), n=3)
+        hint = f" (did you mean {', '.join(close)}?)" if close else ""
+        return KeyError(f"Unknown key {key!r}{hint}")
+
+    def atom(self, text):
+        match = ATOM_RE.match(text.strip())
+        name, cmp, value = normalize_key(match["name"]), match["cmp"], match["value"]
+        if cmp is None:
+            if name not in self.postings:
+                raise self.unknown_key(name)
+            return self.postings[name]
+
+        negate = cmp == "!="
+        if name == normalize_key(YEAR_COLUMN):
+            bits = self.year_bits("=" if negate else cmp, value)
+        elif name in self.values:
+            bits = self.values[name].get(normalize_key(value), 0)
+        elif cmp in ("=", "!=") and f"{name}={normalize_key(value)}" in self.postings:
+            bits = self.postings[f"{name}={normalize_key(value)}"]
+        else:
+            raise self.unknown_key(f"{name}{cmp}{normalize_key(value)}")
+        return self.all_bits & ~bits if negate else bits
+
+    def year_bits(self, cmp, value):
+        try:
+            target = int(normalize_key(value))
+        except ValueError:
+            raise SyntaxError(f"Year expected, got {value!r}") from None
+        tests = {"=": target.__eq__, ">=": target.__le__, "<=": target.__ge__,
+                 ">": target.__lt__, "<": target.__gt__}
+        bits = 0
+        for year, year_bits in self.years.items():
+            if tests[cmp](year):
+                bits |= year_bits
+        return bits
+
+    def query(self, expression):
+        """Bitset of the articles matching the expression."""
+        return QueryParser(self, expression).parse()
+
+    def count(self, expression):
+        return self.query(expression).bit_count()
+
+    def select(self, expression):
+        """Identification columns (ArtNb, ref, title) of the matching articles."""
+        return self.articles.iloc[bitset_rows(self.query(expression), self.n)]
+
+
+# ==========================================
+# 4. CLI / REPL
+# ==========================================
+def print_result(index, expression, show=True):
+    start = time.perf_counter()
+    bits = index.query(expression)
+    elapsed = time.perf_counter() - start
+    print(f"--> {bits.bit_count()} article(s) sur {index.n}  ({elapsed * 1e6:.0f} µs)")
+    if show and bits:
+        print(index.articles.iloc[bitset_rows(bits, index.n)].to_string(index=False))
+
+
+def repl(index):
+    print(f"Index : {index.n} articles, {len(index.keys())} clés.")
+    print("Tapez une requête (ex: GMFCS-III AND Stair-negotiation AND Diplegic),")
+    print("':keys' pour la liste des clés, ':count' pour masquer/afficher les articles, ':quit' pour sortir.")
+    show = True
+    while True:
+        try:
+            line = input("query> ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            break
+        if not line:
+            continue
+        if line in (":quit", ":q", "exit"):
+            break
+        if line == ":keys":
+            print("\n".join(index.keys()))
+            continue
+        if line == ":count":
+            show = not show
+            continue
+        try:
+            print_result(index, line, show)
+        except (SyntaxError, KeyError) as e:
+            print(f"❌ {e.args[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Boolean queries over the included studies.")
+    parser.add_argument("query", nargs="*", help="Query expression (interactive mode if omitted)")
+    parser.add_argument("--file", default=file_path, help="Workbook with the Global_overview sheet")
+    parser.add_argument("--count", action="store_true", help="Print only the number of articles")
+    args = parser.parse_args()
+
+    index = ArticleIndex.from_workbook(args.file)
+    if args.query:
+        try:
+            print_result(index, " ".join(args.query), show=not args.count)
+        except (SyntaxError, KeyError) as e:
+            raise SystemExit(f"❌ {e.args[0]}")
+    else:
+        repl(index)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+review_combinations.py — Bitmask engine for presence combinations (GMFCS levels, topography, subtypes...).
+
+For a list of k indicator columns, each article is encoded as two integers:
+  - present mask : bit j set if column j is PRESENT
+  - known mask   : bit j set if column j is PRESENT or ABSENT (not UNKNOWN)
+All 2^k combinations are then counted with one np.bincount, and the articles
+of any combination are a single integer comparison away.
+
+A combination is "strict" when the other columns must be ABSENT (not just
+not PRESENT), as in the "I + II ONLY" type of groups.
+"""
+
+import numpy as np
+import pandas as pd
+
+from review_presence_codec import encode_presence, PRESENT, UNKNOWN
+
+
+def presence_bitmasks(df, columns):
+    """(present_mask, known_mask) int64 arrays, bit j <-> columns[j]."""
+    codes, _ = encode_presence(df, columns)
+    bits = np.left_shift(1, np.arange(len(columns), dtype=np.int64))
+    present = (codes == PRESENT).astype(np.int64) @ bits
+    known = (codes != UNKNOWN).astype(np.int64) @ bits
+    return present, known
+
+
+def combination_bits(columns, members):
+    """Bitmask of a combination given by its column names."""
+    unknown = [m for m in members if m not in columns]
+    if unknown:
+        raise KeyError(f"Not in the combination columns {columns}: {unknown}")
+    return int(sum(1 << columns.index(m) for m in members))
+
+
+def combination_label(bits, columns, empty_label="Unspecified / None"):
+    names = [col for j, col in enumerate(columns) if bits >> j & 1]
+    return " + ".join(names) if names else empty_label
+
+
+def count_combinations(present, n_columns, known=None, strict=False):
+    """
+    Number of articles per combination, indexed by bitmask (length 2^k).
+    With strict=True only the articles whose columns are all known are counted.
+    """
+    if strict:
+        present = present[known == (1 << n_columns) - 1]
+    return np.bincount(present, minlength=1 << n_columns)
+
+
+def combination_mask(present, known, bits, n_columns, strict=True):
+    """Boolean row mask of the articles having exactly the combination `bits`."""
+    mask = present == bits
+    if strict:
+        mask &= known == (1 << n_columns) - 1
+    return mask
+
+
+def combination_summary(df, columns, strict=False, empty_label="Unspecified / None", masks=None):
+    """
+    Count of articles per combination found in the sheet, most frequent first.
+    Returns a Series indexed by combination label.
+    `masks` : (present, known) of presence_bitmasks(df, columns) if already computed.
+    """
+    present, known = masks if masks is not None else presence_bitmasks(df, columns)
+    counts = count_combinations(present, len(columns), known, strict)
+    found = np.flatnonzero(counts)
+    summary = pd.Series(counts[found], index=[combination_label(b, columns, empty_label) for b in found],
+                        name="count")
+    return summary.sort_values(ascending=False, kind="stable")
+
+
+def select_groups(df, columns, groups, strict=True):
+    """
+    Articles of each declared group.
+    `groups` is a list of (title, [present columns]); with strict=True every
+    other column of `columns` must be ABSENT. Returns a list of (title, sub-DataFrame).
+    """
+    present, known = presence_bitmasks(df, columns)
+    return [(title, df[combination_mask(present, known, combination_bits(columns, members),
+                                         len(columns), strict)])
+            for title, members in groups]
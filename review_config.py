@@ -0,0 +1,107 @@
+"""
+review_config.py — Shared settings of the review scripts (input workbooks, figure paths, output profile).
+
+The settings come from one INI file, the first found of:
+  - the file named by the REVIEW_CONFIG environment variable (set by `review.py --config`),
+  - review.ini in the current folder,
+  - review.ini next to the scripts.
+Every key is optional: without a file, the scripts keep the paths below.
+Values can refer to other keys of the same section with ${key}, so moving the
+whole review folder only takes one line:
+
+    [paths]
+    review_dir = D:/ENABLE/Review
+
+    [plots]
+    profile = web
+
+Only the standard library is imported here: reading the settings costs
+nothing at startup.
+
+Usage :
+    python review_config.py            (prints the effective settings and their source)
+"""
+
+import configparser
+import os
+
+# --- CONFIGURATION ---
+CONFIG_ENV = "REVIEW_CONFIG"
+CONFIG_NAME = "review.ini"
+
+DEFAULTS = {
+    'paths': {
+        'review_dir': r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review",
+        'inclusion_workbook': "${review_dir}/Full_text_inclusion_v1.xlsx",
+        'cosmin_workbook': "${review_dir}/COSMIN_kappa.xlsx",
+        'qa_workbook': "${review_dir}/Quality_assessment_kappa.xlsx",
+        'pdf_dir': "${review_dir}/Full_text",
+        'kappa_results': "${review_dir}/Kappa_results",
+        'figure_2': "${review_dir}/Plot/Figure_2.svg",
+        'years_plot': "${review_dir}/Reports_per_years_plot.png",
+        'file_type_plot': "${review_dir}/Type_of_article_plot.png",
+        'quality_plot': "${review_dir}/Quality_assessment_plot.png",
+        'quality_heatmap': "${review_dir}/Quality_assessment_heatmap.png",
+        'sankey_plot': "${review_dir}/Sankey_MultiColors.html",
+        'dashboard': "${review_dir}/Review_dashboard.html",
+    },
+    'plots': {
+        'profile': "manuscript",
+    },
+}
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_config = None
+_source = None
+
+
+def config_file():
+    """Path of the INI file in use, or None (defaults only)."""
+    candidates = [os.environ.get(CONFIG_ENV), os.path.join(os.getcwd(), CONFIG_NAME),
+                  os.path.join(SCRIPT_DIR, CONFIG_NAME)]
+    for path in candidates:
+        if path and os.path.isfile(path):
+            return path
+    if os.environ.get(CONFIG_ENV):
+        raise FileNotFoundError(f"Config file not found: {os.environ[CONFIG_ENV]} (from {CONFIG_ENV})")
+    return None
+
+
+def load_config(reload=False):
+    """The ConfigParser of the defaults updated with the INI file (read once per process)."""
+    global _config, _source
+    if _config is None or reload:
+        config = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
+        config.read_dict(DEFAULTS)
+        _source = config_file()
+        if _source:
+            config.read(_source, encoding="utf-8")
+        _config = config
+    return _config
+
+
+def setting(section, key, fallback=None):
+    return load_config().get(section, key, fallback=fallback)
+
+
+def get_path(key):
+    """A path of the [paths] section, user home (~) expanded and separators normalized."""
+    value = setting('paths', key)
+    if value is None:
+        raise KeyError(f"Unknown path {key!r}, expected one of {list(load_config()['paths'])}")
+    return os.path.normpath(os.path.expanduser(value))
+
+
+def describe():
+    """Lines 'section.key = value' of the effective settings."""
+    config = load_config()
+    lines = [f"# source : {_source or 'defaults (no ' + CONFIG_NAME + ' found)'}"]
+    for section in config.sections():
+        for key in config[section]:
+            lines.append(f"{section}.{key} = {config[section][key]}")
+    return lines
+
+
+if __name__ == "__main__":
+    print("\n".join(describe()))
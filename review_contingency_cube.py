@@ -0,0 +1,183 @@
+"""
+review_contingency_cube.py — Task x GMFCS x CP subtype x topography contingency cube.
+
+Each dimension is a group of indicator columns of Global_overview. An article
+is a member of every category it has PRESENT (an article with GMFCS I and II
+counts under both, as in the Sankey links), of 'Unknown' when none is PRESENT,
+and always of 'All'. With one membership matrix per dimension
+(articles x categories), the whole cube is a single einsum:
+
+    cube[t, g, s, p] = sum_a  w[a] * T[a, t] * G[a, g] * S[a, s] * P[a, p]
+
+computed for two weightings at once: articles (w = 1) and participants
+(w = N_CP, 0 when not a number).
+
+Since 'All' is a category of every dimension, margins are read from the cube
+instead of summed: cube[t, All, All, All] is the exact number of articles
+with task t, even when articles have several GMFCS levels.
+
+Usage :
+    python review_contingency_cube.py
+    python review_contingency_cube.py --rows task --cols GMFCS --weight participants --where subtype=Spastic
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from review_dataset import (load_global_overview, file_path, sheet_name, TASK_COLUMNS, GMFCS_COLUMNS,
+                            SUBTYPE_COLUMNS, TOPOGRAPHY_COLUMNS)
+from review_presence_codec import is_present, numeric_counts
+
+# --- CONFIGURATION ---
+DIMENSIONS = {
+    'task': TASK_COLUMNS,
+    'GMFCS': GMFCS_COLUMNS,
+    'subtype': SUBTYPE_COLUMNS,
+    'topography': TOPOGRAPHY_COLUMNS,
+}
+PARTICIPANT_COLUMN = 'N_CP'
+
+UNKNOWN = 'Unknown'
+ALL = 'All'
+WEIGHTS = ['articles', 'participants']
+
+
+def membership(df, columns):
+    """
+    (articles x (k + 2)) 0/1 matrix: one column per PRESENT category, then
+    'Unknown' (nothing PRESENT) and 'All'. Columns absent from the sheet are
+    never PRESENT.
+    """
+    found = [c for c in columns if c in df.columns]
+    present = np.zeros((len(df), len(columns)), dtype=bool)
+    if found:
+        present[:, [columns.index(c) for c in found]] = is_present(df, found)
+    unknown = ~present.any(axis=1)
+    return np.column_stack([present, unknown, np.ones(len(df), dtype=bool)]).astype(np.float64)
+
+
+class ContingencyCube:
+    """
+    values : array (weights x dim_1 x ... x dim_n), weights in WEIGHTS order
+    categories : {dimension: labels}, each ending with 'Unknown', 'All'
+    """
+
+    def __init__(self, values, categories):
+        self.values = values
+        self.categories = categories
+        self.dims = list(categories)
+
+    @classmethod
+    def from_frame(cls, df, dimensions=None):
+        dimensions = dimensions or DIMENSIONS
+        matrices = [membership(df, cols) for cols in dimensions.values()]
+        if PARTICIPANT_COLUMN in df.columns:
+            n_cp = numeric_counts(df, [PARTICIPANT_COLUMN])[:, 0].astype(np.float64)
+        else:
+            n_cp = np.zeros(len(df))
+        w = np.stack([np.ones(len(df)), n_cp])
+
+        # 'wa,ab,ac,...->wbc...' : every dimension in one pass
+        letters = "bcdefghijklmnopqrstuvxyz"[:len(matrices)]
+        spec = "wa," + ",".join(f"a{l}" for l in letters) + "->w" + letters
+        values = np.einsum(spec, w, *matrices, optimize=True)
+
+        categories = {dim: list(cols) + [UNKNOWN, ALL] for dim, cols in dimensions.items()}
+        return cls(values, categories)
+
+    @classmethod
+    def from_workbook(cls, path=file_path, sheet=sheet_name, dimensions=None):
+        dimensions = dimensions or DIMENSIONS
+        columns = [c for cols in dimensions.values() for c in cols] + [PARTICIPANT_COLUMN]
+        return cls.from_frame(load_global_overview(path, columns=columns, sheet=sheet), dimensions)
+
+    def index_of(self, dim, label):
+        try:
+            return self.categories[dim].index(label)
+        except (KeyError, ValueError):
+            raise KeyError(f"Unknown category {dim}={label!r}") from None
+
+    def margin(self, keep, weight='articles', include_unknown=True, **where):
+        """
+        Weighted counts over the dimensions in `keep` (Series, MultiIndex if
+        several). The other dimensions are fixed to `where[dim]` (a label) or to
+        'All'. Example: margin(['task', 'GMFCS'], subtype='Spastic').unstack()
+        """
+        keep = [keep] if isinstance(keep, str) else list(keep)
+        unknown_dims = [d for d in keep + list(where) if d not in self.dims]
+        if unknown_dims:
+            raise KeyError(f"Unknown dimension(s) {unknown_dims}, expected {self.dims}")
+        if len(set(keep)) != len(keep):
+            raise ValueError(f"Each dimension can only be kept once, got {keep}")
+
+        selector = [WEIGHTS.index(weight)]
+        for dim in self.dims:
+            if dim in keep:
+                labels = self.categories[dim][:-1] if include_unknown else self.categories[dim][:-2]
+                selector.append(slice(0, len(labels)))
+            else:
+                selector.append(self.index_of(dim, where.get(dim, ALL)))
+        block = self.values[tuple(selector)]
+
+        # Kept dimensions in the requested order
+        in_cube_order = [d for d in self.dims if d in keep]
+        block = np.transpose(block, [in_cube_order.index(d) for d in keep])
+        labels = [self.categories[d][:block.shape[i]] for i, d in enumerate(keep)]
+        index = pd.MultiIndex.from_product(labels, names=keep) if len(keep) > 1 else pd.Index(labels[0], name=keep[0])
+        return pd.Series(block.ravel(), index=index, name=weight)
+
+    def total(self, weight='articles', **where):
+        """Weighted number of articles matching `where` (no double counting)."""
+        selector = [WEIGHTS.index(weight)] + [self.index_of(d, where.get(d, ALL)) for d in self.dims]
+        return float(self.values[tuple(selector)])
+
+    def to_frame(self):
+        """Long format: one row per cell, one column per weighting (for export)."""
+        index = pd.MultiIndex.from_product(self.categories.values(), names=self.dims)
+        return pd.DataFrame(self.values.reshape(len(WEIGHTS), -1).T, index=index, columns=WEIGHTS)
+
+
+def parse_where(items):
+    where = {}
+    for item in items or []:
+        dim, _, label = item.partition("=")
+        where[dim.strip()] = label.strip()
+    return where
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Contingency tables from the task x GMFCS x subtype x topography cube.")
+    parser.add_argument("--file", default=file_path)
+    parser.add_argument("--rows", default="task", choices=list(DIMENSIONS))
+    parser.add_argument("--cols", default="GMFCS", choices=list(DIMENSIONS))
+    parser.add_argument("--weight", default="articles", choices=WEIGHTS)
+    parser.add_argument("--where", nargs="*", help="Fixed categories, e.g. subtype=Spastic topography=Diplegic")
+    parser.add_argument("--out", default=None, help="Optional CSV export of the full cube")
+    args = parser.parse_args()
+
+    cube = ContingencyCube.from_workbook(args.file)
+    where = parse_where(args.where)
+    if args.rows == args.cols:
+        # Same dimension on both axes: one-way table
+        table = cube.margin(args.rows, weight=args.weight, **where).to_frame()
+        title = f"{args.rows} ({args.weight})"
+    else:
+        table = cube.margin([args.rows, args.cols], weight=args.weight, **where).unstack()
+        table = table.reindex(index=cube.categories[args.rows][:-1], columns=cube.categories[args.cols][:-1])
+        table[ALL] = cube.margin(args.rows, weight=args.weight, **where)
+        title = f"{args.rows} x {args.cols} ({args.weight})"
+    if where:
+        title += " | " + ", ".join(f"{d}={v}" for d, v in where.items())
+    print(f"\n{title}\n" + "-" * len(title))
+    print(table.to_string(float_format=lambda v: f"{v:.0f}"))
+    print(f"\nTotal : {cube.total(args.weight, **where):.0f}")
+
+    if args.out:
+        cube.to_frame().to_csv(args.out)
+        print(f"✅ Cube exporté : {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+review_curved_text.py — Text along a circular arc, drawn as a single artist per ring.
+
+The former draw_curved_text of the sunburst created one ax.text per
+character: dozens of Text artists per ring, each laid out, measured for
+tight_layout / bbox_inches='tight' and drawn on its own.
+
+CurvedText keeps the characters of every label of a ring in arrays (positions
+on the arc in data coordinates, rotations) and draws them in one pass:
+  - character sizes are measured once per distinct character,
+  - the offsets of the rotated characters are computed with numpy,
+  - each character goes straight to the renderer (renderer.draw_text), so the
+    SVG backend still writes every glyph once in <defs> and references it,
+    instead of one full outline per character.
+
+The layout (angle per character, reading direction on the lower half, centered
+characters) is the one of draw_curved_text.
+"""
+
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.colors import to_rgba
+from matplotlib.font_manager import FontProperties
+from matplotlib.transforms import Bbox
+
+
+def arc_layout(text, radius, center_angle, fontsize, spacing):
+    """Angles (radians) and rotations (degrees) of the characters of one label."""
+    center_angle = center_angle % 360
+    center_rad = np.deg2rad(center_angle)
+    angle_per_char = (fontsize / radius / 100) * spacing * 3.5
+    total_angle = len(text) * angle_per_char
+    is_bottom = 180 < center_angle < 360
+
+    if is_bottom:
+        angles = np.linspace(center_rad - total_angle / 2, center_rad + total_angle / 2, len(text))
+        rotations = np.degrees(angles) - 90 + 180
+    else:
+        angles = np.linspace(center_rad + total_angle / 2, center_rad - total_angle / 2, len(text))
+        rotations = np.degrees(angles) - 90
+    return angles, rotations
+
+
+class CurvedText(Artist):
+    """Every character of several arc labels, drawn by one artist."""
+
+    def __init__(self, texts, radius, center_angles, fontsize=12, spacing=1.2, color='black',
+                 fontweight='bold'):
+        super().__init__()
+        radii = np.broadcast_to(np.asarray(radius, dtype=float), (len(texts),))
+        chars, xy, rotations = [], [], []
+        for text, r, center in zip(texts, radii, center_angles):
+            if not text:
+                continue
+            angles, rot = arc_layout(text, r, center, fontsize, spacing)
+            chars += list(text)
+            xy.append(np.column_stack([r * np.cos(angles), r * np.sin(angles)]))
+            rotations.append(rot)
+
+        # Blanks take their place on the arc but are not drawn
+        keep = np.array([not c.isspace() for c in chars], dtype=bool)
+        self.chars = [c for c, k in zip(chars, keep) if k]
+        self.xy = np.concatenate(xy)[keep] if xy else np.empty((0, 2))
+        self.rotations = np.concatenate(rotations)[keep] if rotations else np.empty(0)
+        self.color = color
+        self.prop = FontProperties(size=fontsize, weight=fontweight)
+        self.set_zorder(3)
+
+    def char_offsets(self, renderer):
+        """(dx, dy) in pixels from the center of each character to its baseline start."""
+        metrics = {c: renderer.get_text_width_height_descent(c, self.prop, ismath=False)
+                   for c in set(self.chars)}
+        # Line box as for a Text with va='center': at least the height of "lp"
+        _, lp_h, lp_d = renderer.get_text_width_height_descent("lp", self.prop, ismath=False)
+        w, h, d = np.array([metrics[c] for c in self.chars], dtype=float).T
+        h, d = np.maximum(h, lp_h), np.maximum(d, lp_d)
+
+        local_x, local_y = -w / 2, d - h / 2
+        theta = np.deg2rad(self.rotations)
+        cos, sin = np.cos(theta), np.sin(theta)
+        return np.column_stack([local_x * cos - local_y * sin, local_x * sin + local_y * cos])
+
+    def draw(self, renderer):
+        if not self.get_visible() or not self.chars:
+            return
+        renderer.open_group('curved_text', self.get_gid())
+        positions = self.axes.transData.transform(self.xy) + self.char_offsets(renderer)
+        if renderer.flipy():
+            positions[:, 1] = renderer.get_canvas_width_height()[1] - positions[:, 1]
+
+        gc = renderer.new_gc()
+        gc.set_foreground(to_rgba(self.color), isRGBA=True)
+        gc.set_alpha(self.get_alpha())
+        for char, (x, y), angle in zip(self.chars, positions, self.rotations):
+            renderer.draw_text(gc, x, y, char, self.prop, angle, ismath=False)
+        gc.restore()
+        renderer.close_group('curved_text')
+        self.stale = False
+
+    def get_window_extent(self, renderer=None):
+        if not self.chars:
+            return Bbox.null()
+        # Character centers, padded by the font size
+        pad = self.prop.get_size_in_points() * self.figure.dpi / 72
+        points = self.axes.transData.transform(self.xy)
+        return Bbox.from_extents(*(points.min(axis=0) - pad), *(points.max(axis=0) + pad))
+
+
+def curved_labels(ax, texts, radius, center_angles, **kwargs):
+    """
+    Draws several labels on the same ring as one CurvedText artist.
+    `texts` and `center_angles` (degrees) go together; `radius` is a number or
+    one radius per label. Keyword arguments: fontsize, spacing, color, fontweight.
+    """
+    artist = CurvedText(texts, radius, center_angles, **kwargs)
+    ax.add_artist(artist)
+    return artist
+
+
+def curved_label(ax, text, radius, center_angle, **kwargs):
+    """Single label version of curved_labels."""
+    return curved_labels(ax, [text], radius, [center_angle], **kwargs)
@@ -0,0 +1,419 @@
+"""
+review_dashboard.py — Self-contained HTML dashboard of the included studies, filtered in the browser.
+
+The Global_overview sheet (and the quality scores, when the QA workbook is
+found) is embedded once in the page, in columnar form:
+  - years, N_CP and study types as arrays (study types dictionary-encoded),
+  - tasks, GMFCS levels, CP subtypes and topographies as one presence bitmask
+    per article and group (bit j <-> column j, same masks as review_combinations),
+  - quality scores as an (articles x items) array linked to the sheet rows.
+The filters (year range, study types, GMFCS, tasks, subtype, topography)
+select articles with integer bit tests, and the four linked views (task ->
+GMFCS Sankey, year trend, study-type bars, quality distribution) are
+recomputed in the browser. Clicking a study-type bar, a year or a Sankey node
+toggles the corresponding filter.
+
+Plotly.js is embedded in the file by default (works offline); use --cdn for
+a much smaller file that loads it from the Plotly CDN.
+
+Usage :
+    python review_dashboard.py --out Review_dashboard.html
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from review_combinations import presence_bitmasks
+from review_config import get_path
+from review_dataset import (load_global_overview, file_path, sheet_name, TASK_COLUMNS, GMFCS_COLUMNS,
+                            SUBTYPE_COLUMNS, TOPOGRAPHY_COLUMNS)
+from review_presence_codec import numeric_counts
+from review_sankey_flows import Stage, stage_membership
+
+# --- CONFIGURATION ---
+quality_path = get_path('qa_workbook')
+quality_sheet = "Quality_assessment_results"
+out_path = get_path('dashboard')
+
+GROUPS = {
+    'task': TASK_COLUMNS,
+    'subtype': SUBTYPE_COLUMNS,
+    'topography': TOPOGRAPHY_COLUMNS,
+}
+GMFCS_UNKNOWN = 'GMFCS Unknown'
+QUALITY_LEVELS = [0, 1, 2]
+QUALITY_LABELS = ["0 - Inadequate", "1 - Partial", "2 - Adequate"]
+
+
+# ==========================================
+# 1. COLUMNAR DATA
+# ==========================================
+def normalize_ref(text):
+    return " ".join(str(text).lower().replace(",", " ").split())
+
+
+def quality_scores(quality_df, refs):
+    """
+    (items, scores, article_rows) of the QA results sheet: scores as int lists
+    (-1 when missing), article_rows = row of the article in Global_overview
+    (-1 when its name matches no 'ref').
+    """
+    scores_df = quality_df.select_dtypes(include=['number'])
+    names = quality_df.drop(columns=scores_df.columns)
+    position = {normalize_ref(r): i for i, r in enumerate(refs) if isinstance(r, str)}
+    if names.shape[1]:
+        rows = [position.get(normalize_ref(n), -1) for n in names.iloc[:, 0]]
+    else:
+        rows = [-1] * len(quality_df)
+    scores = scores_df.to_numpy(dtype=float)
+    scores = np.where(np.isin(scores, QUALITY_LEVELS), scores, -1).astype(int)
+    return [str(c) for c in scores_df.columns], scores.tolist(), rows
+
+
+def dashboard_data(df, quality_df=None):
+    """Everything the page needs, as JSON-serialisable columns."""
+    n = len(df)
+    years = pd.to_numeric(df['year'], errors='coerce') if 'year' in df.columns else pd.Series(np.nan, index=df.index)
+    study = df['Study_type'] if 'Study_type' in df.columns else pd.Series(np.nan, index=df.index)
+    study_codes, study_values = pd.factorize(study.where(study.notna(), "Unknown").astype(str).str.strip())
+    n_cp = numeric_counts(df, ['N_CP'])[:, 0] if 'N_CP' in df.columns else np.zeros(n)
+
+    data = {
+        'n': n,
+        'ids': df['ArtNb'].astype(object).where(df['ArtNb'].notna(), "").astype(str).tolist()
+        if 'ArtNb' in df.columns else [str(i + 1) for i in range(n)],
+        'refs': df['ref'].astype(object).where(df['ref'].notna(), "").astype(str).tolist()
+        if 'ref' in df.columns else [""] * n,
+        'year': years.fillna(-1).astype(int).tolist(),
+        'n_cp': n_cp.astype(int).tolist(),
+        'study_values': list(study_values),
+        'study': study_codes.tolist(),
+        'groups': {},
+    }
+    for group, columns in GROUPS.items():
+        present = [c for c in columns if c in df.columns]
+        masks, _ = presence_bitmasks(df, present) if present else (np.zeros(n, dtype=np.int64), None)
+        data['groups'][group] = {'labels': present, 'mask': masks.astype(int).tolist()}
+
+    # GMFCS with the Unknown node of the Sankey ('???' or nothing PRESENT)
+    gmfcs = stage_membership(df, Stage('GMFCS', GMFCS_COLUMNS, GMFCS_UNKNOWN)).astype(np.int64)
+    bits = np.left_shift(1, np.arange(gmfcs.shape[1], dtype=np.int64))
+    data['groups']['GMFCS'] = {'labels': GMFCS_COLUMNS + [GMFCS_UNKNOWN], 'mask': (gmfcs @ bits).astype(int).tolist()}
+
+    if quality_df is not None:
+        items, scores, rows = quality_scores(quality_df, data['refs'])
+        data['quality'] = {'items': items, 'scores': scores, 'rows': rows,
+                           'levels': QUALITY_LEVELS, 'labels': QUALITY_LABELS}
+    return data
+
+
+# ==========================================
+# 2. PAGE
+# ==========================================
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Included studies — dashboard</title>
+__PLOTLY__
+<style>
+  body { font-family: Helvetica, Arial, sans-serif; margin: 0; color: #222; }
+  header { padding: 10px 18px; background: #4c72b0; color: white; }
+  header h1 { font-size: 18px; margin: 0; display: inline-block; }
+  header span { margin-left: 18px; font-size: 14px; }
+  #layout { display: flex; }
+  #filters { width: 250px; padding: 10px 14px; border-right: 1px solid #ddd; font-size: 13px;
+             height: calc(100vh - 48px); overflow-y: auto; box-sizing: border-box; }
+  #filters fieldset { border: 1px solid #ddd; margin: 0 0 10px 0; padding: 6px 8px; }
+  #filters legend { font-weight: bold; }
+  #filters label { display: block; white-space: nowrap; }
+  #filters input[type=number] { width: 70px; }
+  #views { flex: 1; display: grid; grid-template-columns: 1fr 1fr; grid-auto-rows: 420px; }
+  #views > div { border-bottom: 1px solid #eee; }
+  #articles { grid-column: 1 / span 2; overflow-y: auto; font-size: 12px; padding: 6px 14px; }
+  #articles table { border-collapse: collapse; }
+  #articles td { padding: 1px 10px 1px 0; }
+  button { margin-top: 4px; }
+</style>
+</head>
+<body>
+<header><h1>Included studies</h1><span id="summary"></span></header>
+<div id="layout">
+  <div id="filters">
+    <fieldset><legend>Year</legend>
+      <input type="number" id="year_min"> – <input type="number" id="year_max">
+    </fieldset>
+    <div id="group_filters"></div>
+    <button id="reset">Reset filters</button>
+  </div>
+  <div id="views">
+    <div id="sankey"></div>
+    <div id="years"></div>
+    <div id="study"></div>
+    <div id="quality"></div>
+    <div id="articles"></div>
+  </div>
+</div>
+<script>
+const DATA = __DATA__;
+const GROUP_ORDER = ["GMFCS", "task", "subtype", "topography"];
+const state = { yearMin: null, yearMax: null, study: new Set(), groups: {} };
+GROUP_ORDER.forEach(g => state.groups[g] = 0);
+
+// ---------- filters ----------
+function buildFilters() {
+  const known = DATA.year.filter(y => y >= 0);
+  // No known year: empty, disabled year inputs
+  const yMin = known.length ? Math.min(...known) : "", yMax = known.length ? Math.max(...known) : "";
+  for (const id of ["year_min", "year_max"]) {
+    const el = document.getElementById(id);
+    el.min = yMin; el.max = yMax; el.value = id === "year_min" ? yMin : yMax;
+    el.disabled = !known.length;
+    el.addEventListener("change", () => {
+      state.yearMin = +document.getElementById("year_min").value;
+      state.yearMax = +document.getElementById("year_max").value;
+      update();
+    });
+  }
+  const container = document.getElementById("group_filters");
+  const addGroup = (title, labels, onToggle, name) => {
+    const fs = document.createElement("fieldset");
+    // Labels come from the workbook: set as text, never as HTML
+    const legend = document.createElement("legend");
+    legend.textContent = title;
+    fs.appendChild(legend);
+    labels.forEach((label, j) => {
+      const lab = document.createElement("label");
+      const box = document.createElement("input");
+      box.type = "checkbox"; box.dataset.group = name; box.dataset.bit = j;
+      box.addEventListener("change", e => { onToggle(j, e.target.checked); update(); });
+      lab.append(box, " " + label);
+      fs.appendChild(lab);
+    });
+    container.appendChild(fs);
+  };
+  addGroup("Study type", DATA.study_values, (j, on) => on ? state.study.add(j) : state.study.delete(j), "study");
+  GROUP_ORDER.forEach(g => addGroup(g, DATA.groups[g].labels, (j, on) => {
+    state.groups[g] = on ? (state.groups[g] | (1 << j)) : (state.groups[g] & ~(1 << j));
+  }, g));
+  document.getElementById("reset").addEventListener("click", () => {
+    state.yearMin = state.yearMax = null; state.study.clear();
+    GROUP_ORDER.forEach(g => state.groups[g] = 0);
+    document.getElementById("year_min").value = yMin; document.getElementById("year_max").value = yMax;
+    syncCheckboxes(); update();
+  });
+}
+
+function syncCheckboxes() {
+  document.querySelectorAll("#filters input[type=checkbox]").forEach(box => {
+    const g = box.dataset.group, bit = +box.dataset.bit;
+    box.checked = g === "study" ? state.study.has(bit) : (state.groups[g] & (1 << bit)) !== 0;
+  });
+}
+
+function toggleGroupBit(group, bit) {
+  state.groups[group] ^= (1 << bit);
+  syncCheckboxes(); update();
+}
+
+// Articles passing every filter (within a group: any of the checked categories)
+function selection() {
+  const keep = new Uint8Array(DATA.n);
+  for (let i = 0; i < DATA.n; i++) {
+    const y = DATA.year[i];
+    if (state.yearMin !== null && (y < 0 || y < state.yearMin)) continue;
+    if (state.yearMax !== null && (y < 0 || y > state.yearMax)) continue;
+    if (state.study.size && !state.study.has(DATA.study[i])) continue;
+    let ok = true;
+    for (const g of GROUP_ORDER) {
+      const want = state.groups[g];
+      if (want && !(DATA.groups[g].mask[i] & want)) { ok = false; break; }
+    }
+    if (ok) keep[i] = 1;
+  }
+  return keep;
+}
+
+function filtersActive() {
+  return state.yearMin !== null || state.yearMax !== null || state.study.size > 0 ||
+         GROUP_ORDER.some(g => state.groups[g] !== 0);
+}
+
+// ---------- views ----------
+const BITS = m => { const out = []; for (let j = 0; m; j++, m >>= 1) if (m & 1) out.push(j); return out; };
+const GMFCS_COLORS = ["rgba(46, 204, 113, A)", "rgba(52, 152, 219, A)", "rgba(243, 156, 18, A)",
+                      "rgba(231, 76, 60, A)", "rgba(149, 165, 166, A)"];
+
+function drawSankey(keep) {
+  const tasks = DATA.groups.task, gmfcs = DATA.groups.GMFCS;
+  const nT = tasks.labels.length, nG = gmfcs.labels.length;
+  const links = new Float64Array(nT * nG);
+  for (let i = 0; i < DATA.n; i++) {
+    if (!keep[i] || !tasks.mask[i]) continue;
+    const g = BITS(gmfcs.mask[i]);
+    for (const t of BITS(tasks.mask[i])) for (const k of g) links[t * nG + k] += 1;
+  }
+  const source = [], target = [], value = [], color = [];
+  links.forEach((v, idx) => {
+    if (!v) return;
+    const k = idx % nG;
+    source.push(Math.floor(idx / nG)); target.push(nT + k); value.push(v);
+    color.push(GMFCS_COLORS[k % GMFCS_COLORS.length].replace("A", "0.3"));
+  });
+  const nodeColors = tasks.labels.map(() => "rgba(70, 130, 180, 0.8)")
+    .concat(gmfcs.labels.map((_, k) => GMFCS_COLORS[k % GMFCS_COLORS.length].replace("A", "0.8")));
+  Plotly.react("sankey", [{
+    type: "sankey", arrangement: "snap",
+    node: { label: tasks.labels.concat(gmfcs.labels), color: nodeColors, pad: 12, thickness: 16,
+            line: { color: "black", width: 0.5 } },
+    link: { source, target, value, color }
+  }], { title: "Tasks → GMFCS (click a node to filter)", margin: { l: 10, r: 10, t: 40, b: 10 }, font: { size: 11 } });
+}
+
+function drawYears(keep) {
+  const counts = new Map();
+  DATA.year.forEach((y, i) => { if (keep[i] && y >= 0) counts.set(y, (counts.get(y) || 0) + 1); });
+  const known = DATA.year.filter(y => y >= 0);
+  const x = [], y = [];
+  for (let yr = Math.min(...known); yr <= Math.max(...known); yr++) { x.push(yr); y.push(counts.get(yr) || 0); }
+  Plotly.react("years", [{ x, y, type: "scatter", mode: "lines+markers", fill: "tozeroy",
+                           line: { color: "#4c72b0", width: 2 }, fillcolor: "rgba(76, 114, 176, 0.1)" }],
+               { title: "Timeline of included studies (click a year to filter)",
+                 xaxis: { title: "Year", dtick: 1, tickangle: -45 }, yaxis: { title: "Number of articles", rangemode: "tozero" },
+                 margin: { l: 60, r: 20, t: 40, b: 60 } });
+}
+
+function drawStudy(keep) {
+  const counts = new Array(DATA.study_values.length).fill(0);
+  DATA.study.forEach((s, i) => { if (keep[i]) counts[s] += 1; });
+  const order = counts.map((c, j) => j).sort((a, b) => counts[a] - counts[b]);
+  Plotly.react("study", [{ type: "bar", orientation: "h", x: order.map(j => counts[j]),
+                           y: order.map(j => DATA.study_values[j]), text: order.map(j => counts[j]),
+                           textposition: "inside", marker: { color: order.map(j => state.study.has(j) ? "#2a4d8f" : "#4c72b0") } }],
+               { title: "Study designs (click a bar to filter)", xaxis: { title: "Number of articles" },
+                 margin: { l: 140, r: 20, t: 40, b: 50 } });
+}
+
+function drawQuality(keep) {
+  const q = DATA.quality;
+  if (!q) { document.getElementById("quality").innerHTML = "<p style='padding:20px'>No quality scores found.</p>"; return; }
+  const all = !filtersActive();
+  const counts = q.levels.map(() => new Array(q.items.length).fill(0));
+  let used = 0;
+  q.scores.forEach((row, r) => {
+    const a = q.rows[r];
+    if (!(all || (a >= 0 && keep[a]))) return;
+    used += 1;
+    row.forEach((s, j) => { const l = q.levels.indexOf(s); if (l >= 0) counts[l][j] += 1; });
+  });
+  const colors = ["red", "orange", "green"];
+  Plotly.react("quality", q.levels.map((l, k) => ({
+    type: "bar", orientation: "h", name: q.labels[k], x: counts[k], y: q.items,
+    marker: { color: colors[k % colors.length], line: { color: "black", width: 0.5 } }
+  })), { barmode: "stack", title: "Quality scores per item (" + used + " articles)",
+         yaxis: { autorange: "reversed", automargin: true, tickfont: { size: 9 } },
+         xaxis: { title: "Number of articles" }, legend: { orientation: "h", y: -0.15 },
+         margin: { l: 10, r: 20, t: 40, b: 60 } });
+}
+
+function drawArticles(keep) {
+  // Cells built as text nodes: a ref such as "Smith & Li <2015>" is shown as is
+  const table = document.createElement("table");
+  for (let i = 0; i < DATA.n; i++) if (keep[i]) {
+    const tr = table.insertRow();
+    for (const value of [DATA.ids[i], DATA.refs[i], DATA.year[i] >= 0 ? DATA.year[i] : "",
+                         DATA.study_values[DATA.study[i]]])
+      tr.insertCell().textContent = value;
+  }
+  document.getElementById("articles").replaceChildren(table);
+}
+
+function update() {
+  const keep = selection();
+  let n = 0, participants = 0;
+  for (let i = 0; i < DATA.n; i++) if (keep[i]) { n += 1; participants += DATA.n_cp[i]; }
+  document.getElementById("summary").textContent =
+    n + " / " + DATA.n + " articles — " + participants + " children with CP (N_CP)";
+  drawSankey(keep); drawYears(keep); drawStudy(keep); drawQuality(keep); drawArticles(keep);
+}
+
+buildFilters();
+update();
+
+// ---------- linked clicks ----------
+document.getElementById("study").on("plotly_click", ev => {
+  const j = DATA.study_values.indexOf(ev.points[0].y);
+  state.study.has(j) ? state.study.delete(j) : state.study.add(j);
+  syncCheckboxes(); update();
+});
+document.getElementById("years").on("plotly_click", ev => {
+  const yr = ev.points[0].x;
+  const single = state.yearMin === yr && state.yearMax === yr;
+  state.yearMin = single ? null : yr; state.yearMax = single ? null : yr;
+  const known = DATA.year.filter(y => y >= 0);
+  document.getElementById("year_min").value = single ? Math.min(...known) : yr;
+  document.getElementById("year_max").value = single ? Math.max(...known) : yr;
+  update();
+});
+document.getElementById("sankey").on("plotly_click", ev => {
+  const p = ev.points[0];
+  if (p.sourceLinks === undefined) return;  // links are not filters
+  const nT = DATA.groups.task.labels.length;
+  p.pointNumber < nT ? toggleGroupBit("task", p.pointNumber) : toggleGroupBit("GMFCS", p.pointNumber - nT);
+});
+</script>
+</body>
+</html>
+"""
+
+
+def write_dashboard(path, data, plotlyjs="inline"):
+    """Writes the page. plotlyjs: 'inline' (self-contained) or 'cdn'."""
+    if plotlyjs == "inline":
+        from plotly.offline import get_plotlyjs
+        script = f"<script>{get_plotlyjs()}</script>"
+    else:
+        import plotly
+        script = f'<script src="https://cdn.plot.ly/plotly-{plotly.__version__}.min.js"></script>'
+    # Compact JSON; '</' escaped so the data can never close the <script> tag
+    payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False).replace("</", "<\\/")
+    html = PAGE.replace("__PLOTLY__", script).replace("__DATA__", payload)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Self-contained HTML dashboard of the included studies.")
+    parser.add_argument("--file", default=file_path)
+    parser.add_argument("--quality", default=quality_path, help="QA workbook (skipped if not found)")
+    parser.add_argument("--out", default=out_path)
+    parser.add_argument("--cdn", action="store_true", help="Load plotly.js from the CDN instead of embedding it")
+    args = parser.parse_args()
+
+    from review_plot_utils import output_path
+
+    columns = ['ArtNb', 'ref', 'year', 'Study_type', 'N_CP'] + GMFCS_COLUMNS + [c for g in GROUPS.values() for c in g]
+    df = load_global_overview(args.file, columns=columns, sheet=sheet_name)
+    quality_df = None
+    if not os.path.exists(args.quality):
+        print(f"⚠️ Quality workbook not found, quality view disabled: {args.quality}")
+    elif quality_sheet not in pd.ExcelFile(args.quality).sheet_names:
+        print(f"⚠️ Sheet '{quality_sheet}' not found in {args.quality}, quality view disabled")
+    else:
+        quality_df = pd.read_excel(args.quality, sheet_name=quality_sheet)
+
+    data = dashboard_data(df, quality_df)
+    target = write_dashboard(output_path(args.out), data, "cdn" if args.cdn else "inline")
+    payload_kb = len(json.dumps(data, separators=(",", ":"))) / 1024
+    print(f"✅ Dashboard : {target} ({data['n']} articles, données {payload_kb:.0f} Ko)")
+
+
+if __name__ == "__main__":
+    main()
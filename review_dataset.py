@@ -0,0 +1,171 @@
+"""
+review_dataset.py — Shared loader for the Global_overview sheet.
+
+The sheet is parsed from Excel once and stored as a typed, columnar Arrow
+snapshot (uncompressed IPC file, memory-mapped on read) keyed by the SHA-256
+of the workbook and SNAPSHOT_VERSION. Every review_* script then loads only the columns it needs
+from the snapshot; the Excel file is only parsed again when it changes.
+
+Column types in the snapshot:
+  - headers are stripped of surrounding spaces
+  - purely numeric columns stay numeric
+  - mixed columns (numbers, 'X', '???'...) are stored as text; empty cells
+    come back as NaN, as with pd.read_excel
+
+If pyarrow is not installed, the sheet is read directly with pd.read_excel.
+Every load is checked against review_schema (missing columns, invalid values).
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from review_config import get_path
+from review_profiling import profiled, stage
+
+# --- CONFIGURATION ---
+file_path = get_path('inclusion_workbook')
+sheet_name = "Global_overview"
+
+# Snapshots are stored in this folder, next to the workbook
+cache_dirname = ".review_cache"
+
+# Bump when read_sheet / to_columnar change the stored columns or types (invalidates the snapshots)
+SNAPSHOT_VERSION = 1
+
+# Column groups of the sheet
+ID_COLUMNS = ['ArtNb', 'ref', 'title']
+TASK_COLUMNS = [
+    'Sit-to-stand', 'Running', 'Cycling', 'Stair-negotiation',
+    'Time-Up-and-Go', 'Obstacle-clearance', 'Game', 'One-leg-standing',
+    'Jumping', 'Squat', 'Stepping-target', 'Hopping', 'Kicking-a-ball'
+]
+GMFCS_COLUMNS = ['GMFCS-I', 'GMFCS-II', 'GMFCS-III', 'GMFCS-IV']
+TOPOGRAPHY_COLUMNS = ['Hemiplegic', 'Diplegic', 'Quadriplegic']
+SUBTYPE_COLUMNS = ['Spastic', 'Ataxic', 'Dyskinetic', 'Mixed']
+SEX_COLUMNS = ['Boy_with_CP', 'Girl_with_CP']
+
+
+# ==========================================
+# 1. SNAPSHOT
+# ==========================================
+def workbook_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def snapshot_path(path=file_path, sheet=sheet_name):
+    name = f"{sheet}_{workbook_hash(path)}_v{SNAPSHOT_VERSION}.arrow"
+    return os.path.join(os.path.dirname(path), cache_dirname, name)
+
+
+def read_sheet(path=file_path, sheet=sheet_name):
+    """Parses the sheet from Excel (headers stripped). This is the slow step."""
+    with stage("read_excel"):
+        df = pd.read_excel(path, sheet_name=sheet)
+    df.columns = [str(c).strip() for c in df.columns]
+    return df
+
+
+def to_columnar(df):
+    """
+    Gives every column a single type so it can be stored in Arrow:
+    numeric if all values are numbers, otherwise text (NaN kept as null).
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        values = df[col]
+        numeric = pd.to_numeric(values, errors="coerce")
+        if numeric.notna().sum() == values.notna().sum():
+            df[col] = numeric
+        else:
+            df[col] = values.map(lambda v: None if pd.isna(v) else str(v))
+    return df
+
+
+def build_snapshot(path=file_path, sheet=sheet_name):
+    """Parses the sheet once and writes its Arrow snapshot. Returns the snapshot path."""
+    import pyarrow as pa
+
+    target = snapshot_path(path, sheet)
+    table = pa.Table.from_pandas(to_columnar(read_sheet(path, sheet)), preserve_index=False)
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # Temporary file + rename: scripts running in parallel never see a partial snapshot
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, target)
+    return target
+
+
+# ==========================================
+# 2. LOADING
+# ==========================================
+def match_columns(requested, available):
+    """
+    Sheet columns matching the requested names, in the requested order.
+    A name without exact match is matched ignoring case and spaces.
+    """
+    available = list(available)
+    by_key = {str(c).strip().lower(): c for c in available}
+    found = []
+    for name in requested:
+        col = name if name in available else by_key.get(str(name).strip().lower())
+        if col is not None and col not in found:
+            found.append(col)
+    return found
+
+
+@profiled("load_global_overview")
+def load_global_overview(path=file_path, columns=None, sheet=sheet_name, check_schema=True):
+    """
+    Global_overview as a DataFrame, restricted to `columns` if given.
+    With check_schema (default), the frame is checked right away against
+    review_schema: a requested column absent from the sheet or an invalid
+    value raises SchemaError (a ValueError) listing every problem. Without
+    it, absent columns are simply not returned. The requested columns are
+    returned under the requested names, even when the sheet spells them
+    with another case or extra spaces.
+    """
+    df = _load_columns(path, columns, sheet)
+    if check_schema:
+        from review_schema import validate
+        with stage("validate_schema"):
+            validate(df, columns, sheet=sheet)
+    if columns is not None:
+        by_key = {str(c).strip().lower(): c for c in columns}
+        df = df.rename(columns=lambda c: c if c in columns else by_key.get(str(c).strip().lower(), c))
+    return df
+
+
+def _load_columns(path, columns, sheet):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        df = read_sheet(path, sheet)
+        return df if columns is None else df[match_columns(columns, df.columns)]
+
+    target = snapshot_path(path, sheet)
+    if not os.path.exists(target):
+        build_snapshot(path, sheet)
+
+    with pa.memory_map(target, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(match_columns(columns, table.column_names))
+        df = table.to_pandas()
+
+    # Text columns: back to object with NaN for empty cells, as pd.read_excel gives
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype(object).where(df[col].notna(), np.nan)
+    return df
@@ -3,12 +3,16 @@ import seaborn as sns
 import pandas as pd
 import os
 
+from review_dataset import load_global_overview
+from review_config import get_path
+from review_plot_utils import save_figure, show_figure
+
 # ==========================================
 # 1. CONFIGURATION
 # ==========================================
-file_path = r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\Full_text_inclusion_v1.xlsx"
+file_path = get_path('inclusion_workbook')
 sheet_name = "Global_overview"
-save_path = r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\Type_of_article_plot.png"
+save_path = get_path('file_type_plot')
 
 column_name = "Study_type"
 
@@ -18,16 +22,18 @@ column_name = "Study_type"
 
 if not os.path.exists(file_path):
     print(f"Error: File not found at path: {file_path}")
+    raise SystemExit(1)
 else:
     try:
         # Load Excel file
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        df = load_global_overview(file_path, columns=[column_name], sheet=sheet_name)
 
         # Check if the column exists
         if column_name not in df.columns:
             print(f"Error: The column '{column_name}' was not found.")
             print("Available columns:", list(df.columns))
             print("Please update the 'column_name' variable in the script.")
+            raise SystemExit(1)
         else:
             # Count occurrences and sort (descending)
             counts = df[column_name].value_counts().reset_index()
@@ -72,8 +78,9 @@ else:
             #plt.title("Distribution of study designs", fontsize=22, fontweight='bold', pad=20, loc='left')
 
             plt.tight_layout()
-            plt.savefig(save_path)
-            plt.show()
+            save_figure(save_path)
+            show_figure()
 
     except Exception as e:
-        print(f"An error occurred: {e}")
\ No newline at end of file
+        print(f"An error occurred: {e}")
+        raise SystemExit(1)
\ No newline at end of file
@@ -1,7 +1,13 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 
+from review_dataset import load_global_overview
+from review_config import get_path
+from review_presence_codec import numeric_counts
+from review_curved_text import curved_labels
+from review_sunburst import Level, Sunburst, draw_ring
+from review_plot_utils import save_figure, show_figure
+
 
 # ==========================================
 # 0. FONCTION UTILITAIRE : RGB (0-255)
@@ -11,40 +17,10 @@ def rgb(r, g, b):
 
 
 # ==========================================
-# 1. FONCTION : TEXTE COURBE
-# ==========================================
-def draw_curved_text(text, radius, center_angle, ax, fontsize=12, facteur_espacement=1.2):
-    if not text: return
-    center_angle = center_angle % 360
-    center_angle_rad = np.deg2rad(center_angle)
-    angle_per_char = (fontsize / radius / 100) * facteur_espacement * 3.5
-    total_angle = len(text) * angle_per_char
-    is_bottom = 180 < center_angle < 360
-
-    if is_bottom:
-        angles = np.linspace(center_angle_rad - total_angle / 2,
-                             center_angle_rad + total_angle / 2, len(text))
-    else:
-        angles = np.linspace(center_angle_rad + total_angle / 2,
-                             center_angle_rad - total_angle / 2, len(text))
-
-    for char, angle in zip(text, angles):
-        x = radius * np.cos(angle)
-        y = radius * np.sin(angle)
-        degrees = np.degrees(angle)
-        if is_bottom:
-            rotation = degrees - 90 + 180
-        else:
-            rotation = degrees - 90
-        ax.text(x, y, char, rotation=rotation,
-                ha='center', va='center', fontsize=fontsize, fontweight='bold', color='black')
-
-
-# ==========================================
-# 2. CONFIGURATION & COULEURS PERSONNALISÉES
+# 1. CONFIGURATION & COULEURS PERSONNALISÉES
 # ==========================================
 
-fichier_excel = r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\Full_text_inclusion_v1.xlsx"
+fichier_excel = get_path('inclusion_workbook')
 col_total_article = 'N_CP'
 
 config = {
@@ -88,91 +64,52 @@ couleur_inconnu_defaut = rgb(220, 220, 220)
 
 
 # --- CHARGEMENT ---
-def nettoyer_valeur(val):
-    try:
-        return float(val) if not np.isnan(float(val)) else 0
-    except:
-        return 0
-
-
-try:
-    df = pd.read_excel(fichier_excel)
-except:
-    df = pd.DataFrame(columns=[col_total_article])
 cols_to_clean = [col_total_article]
 for cat in config.values(): cols_to_clean.extend(cat.values())
-for col in cols_to_clean:
-    if col in df.columns:
-        df[col] = df[col].apply(nettoyer_valeur)
-    else:
-        df[col] = 0
+# Colonne absente ou valeur invalide : arrêt immédiat (SchemaError), avant tout rendu
+try:
+    df = load_global_overview(fichier_excel, columns=cols_to_clean)
+except (OSError, ValueError) as e:
+    print(f"❌ {e}")
+    raise SystemExit(1)
+# Valeurs numériques (0 si 'X', '???', vide...)
+df[cols_to_clean] = numeric_counts(df, cols_to_clean)
 if not df.empty:
     GRAND_TOTAL = df[col_total_article].sum()
 else:
     GRAND_TOTAL = 1
 
 # ==========================================
-# 3. PRÉPARATION DES DONNÉES
+# 2. PRÉPARATION DES DONNÉES
 # ==========================================
 
-valeurs_interne = []
-labels_interne = []
-valeurs_externe = []
-labels_externe = []
-couleurs_externe = []
-
-for nom_categorie, sous_categories in config.items():
-    valeurs_interne.append(1)
-    labels_interne.append(nom_categorie)
-
-    palette_actuelle = couleurs_perso.get(nom_categorie, {})
-    somme_connue = 0
-
-    # Données connues
-    for label_sub, col_name in sous_categories.items():
-        total_sub = df[col_name].sum()
-        somme_connue += total_sub
-        valeurs_externe.append(total_sub / len(config) / GRAND_TOTAL)
-        labels_externe.append(f"{label_sub}\n({int(total_sub)})")
-
-        # Couleur connue
-        code_couleur = palette_actuelle.get(label_sub, (0, 0, 0))
-        couleurs_externe.append(code_couleur)
-
-    # Données inconnues
-    total_inconnu = GRAND_TOTAL - somme_connue
-    if total_inconnu > 0:
-        valeurs_externe.append(total_inconnu / len(config) / GRAND_TOTAL)
-        labels_externe.append(f"Unknown\n({int(total_inconnu)})")
-
-        # --- NOUVELLE LOGIQUE ICI ---
-        # On cherche la couleur 'Unknown' spécifique au bloc.
-        # Si elle n'existe pas, on prend le gris par défaut.
-        couleur_specifique = palette_actuelle.get('Unknown', couleur_inconnu_defaut)
-        couleurs_externe.append(couleur_specifique)
+# Un bloc par catégorie (SEX, TOPOGRAPHY...) : un seul niveau, avec son reste 'Unknown'
+# (participants non renseignés), calculé une fois pour tous les blocs.
+# Si la couleur 'Unknown' n'est pas définie dans un bloc, on prend le gris par défaut.
+blocs = [(nom_categorie, [Level(nom_categorie, sous_categories,
+                                colors={'Unknown': couleur_inconnu_defaut, **couleurs_perso.get(nom_categorie, {})})])
+         for nom_categorie, sous_categories in config.items()]
+sunburst = Sunburst(df, blocs, total_column=col_total_article)
+labels_interne = list(config)
 
 # ==========================================
-# 4. AFFICHAGE FINAL
+# 3. AFFICHAGE FINAL
 # ==========================================
 
 fig, ax = plt.subplots(figsize=(12, 12))
-ax.axis('equal')
 
-# ANNEAU 1
-wedges_interne, _ = ax.pie(valeurs_interne, radius=0.65,
-                           colors=['white'] * len(config),
-                           wedgeprops=dict(width=0.25, edgecolor='white'),
-                           startangle=90)
+# ANNEAU 2 (une seule collection pour tous les segments, étiquettes à l'extérieur)
+sunburst.draw(ax, inner_radius=0.65, outer_radius=1.0, startangle=90, label_fontsize=13, min_label_angle=0)
 
-# ANNEAU 2
-wedges_externe, text_externe = ax.pie(valeurs_externe, radius=1.0, labels=labels_externe,
-                                      labeldistance=1.1, colors=couleurs_externe,
-                                      rotatelabels=False, startangle=90,
-                                      wedgeprops=dict(width=0.35, edgecolor='white'))
+# ANNEAU 1 (blocs de même taille)
+secteurs = sunburst.block_spans(startangle=90)
+debuts = np.array([debut for debut, _ in secteurs])
+fins = np.array([debut + largeur for debut, largeur in secteurs])
+draw_ring(ax, debuts, fins, 0.40, 0.65, ['white'] * len(secteurs))
 
 # GRANDS RAYONS NOIRS
-for wedge in wedges_interne:
-    theta_rad = np.deg2rad(wedge.theta2)
+for theta in fins:
+    theta_rad = np.deg2rad(theta)
     x1, y1 = 0.40 * np.cos(theta_rad), 0.40 * np.sin(theta_rad)
     x2, y2 = 1.00 * np.cos(theta_rad), 1.00 * np.sin(theta_rad)
     ax.plot([x1, x2], [y1, y2], color='black', linewidth=2)
@@ -180,13 +117,9 @@ for wedge in wedges_interne:
 # FINITIONS
 ax.add_patch(plt.Circle((0, 0), 0.40, fill=False, edgecolor='black', linewidth=2))
 
-for i, wedge in enumerate(wedges_interne):
-    angle_centre = (wedge.theta1 + wedge.theta2) / 2
-    draw_curved_text(labels_interne[i], radius=0.53, center_angle=angle_centre,
-                     ax=ax, fontsize=13, facteur_espacement=0.12)
-
-for t in text_externe:
-    t.set_fontsize(13)
+# Texte courbe : un seul artiste pour tout l'anneau
+angles_centre = (debuts + fins) / 2
+curved_labels(ax, labels_interne, radius=0.53, center_angles=angles_centre, fontsize=13, spacing=0.12)
 
 centre_circle = plt.Circle((0, 0), 0.39, fc='white')
 fig.gca().add_artist(centre_circle)
@@ -194,6 +127,6 @@ fig.gca().add_artist(centre_circle)
 plt.text(0, 0, f"TOTAL CHILDREN\nN = {int(GRAND_TOTAL)}", ha='center', va='center', fontsize=14, fontweight='bold')
 plt.title("Clinical Characteristics Overview", fontsize=16, pad=20)
 plt.tight_layout()
-plt.savefig(r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\Plot\Figure_2.svg",
+save_figure(get_path('figure_2'),
             format='svg', bbox_inches='tight')
-plt.show()
\ No newline at end of file
+show_figure()
\ No newline at end of file
@@ -0,0 +1,352 @@
+"""
+review_pipeline.py — Re-runs only what changed: extraction, reference matching, kappa analyses, subgroup reports, figures.
+
+Every script of the project is declared below as a stage with its inputs
+(workbooks, PDF folder) and outputs (CSV, figures). A stage also depends on
+its own code: the script and the local modules it imports.
+
+The SHA-256 of every input, code file and output is stored in a state file
+after each successful run. A stage is run again only when:
+  - it has never run successfully,
+  - one of its inputs or code files changed,
+  - one of its outputs is missing or was modified since,
+  - or a stage producing one of its inputs changed it (an upstream stage
+    rewriting identical outputs does not trigger the next ones).
+A stage fails when its script exits with a non-zero code or leaves one of its
+declared outputs missing; the stages depending on it are then skipped.
+Stages are grouped in waves (a stage runs after the stages producing its
+inputs); the stale stages of a wave run in parallel, each in its own process,
+headless (REVIEW_HEADLESS=1, Agg backend). The console output of each stage is
+kept in <state dir>/logs/<stage>.txt; it is the output of the report stages
+(kappa, subgroups) that write no file.
+
+Unchanged files are not hashed again: hashes are reused while the size and
+modification time of a file stay the same.
+
+Usage :
+    python review_pipeline.py               (run the stale stages)
+    python review_pipeline.py --dry-run     (only list them, with the reason)
+    python review_pipeline.py --only figure_sankey figure_years --jobs 4
+    python review_pipeline.py --force kappa_qa
+"""
+
+import argparse
+import ast
+import fnmatch
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from review_config import get_path
+
+# --- CONFIGURATION ---
+PDF_DIR = get_path('pdf_dir')
+REFS_BY_SOURCE = os.path.join(PDF_DIR, "output", "refs_by_source.csv")
+REFS_UNIQUE = os.path.join(PDF_DIR, "output", "refs_unique.csv")
+REFS_MATCHED = os.path.join(PDF_DIR, "output", "refs_matched.csv")
+INCLUSION_WORKBOOK = get_path('inclusion_workbook')
+COSMIN_WORKBOOK = get_path('cosmin_workbook')
+QA_WORKBOOK = get_path('qa_workbook')
+FIGURE_2 = get_path('figure_2')
+YEARS_PLOT = get_path('years_plot')
+FILE_TYPE_PLOT = get_path('file_type_plot')
+QUALITY_PLOT = get_path('quality_plot')
+SANKEY_PLOT = get_path('sankey_plot')
+DASHBOARD = get_path('dashboard')
+
+state_dir = ".review_pipeline"
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Stage:
+    """
+    A script run as `python <script> <args>`.
+    inputs  : file paths, folder paths, or (folder, glob pattern) tuples
+    outputs : files written by the script (the console log if empty)
+    """
+
+    def __init__(self, name, script, inputs=(), outputs=(), args=()):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.args = list(args)
+
+    def log_path(self):
+        return os.path.join(state_dir, "logs", f"{self.name}.txt")
+
+    def declared_outputs(self):
+        return self.outputs or [self.log_path()]
+
+    def input_paths(self):
+        return [i[0] if isinstance(i, tuple) else i for i in self.inputs]
+
+
+STAGES = [
+    Stage("extract", "prisma_extract_biblio_from_pdf_folder.py",
+          inputs=[(PDF_DIR, "*.pdf")], outputs=[REFS_BY_SOURCE, REFS_UNIQUE]),
+    Stage("match_included", "prisma_match_included_studies.py",
+          inputs=[REFS_UNIQUE, INCLUSION_WORKBOOK], outputs=[REFS_MATCHED]),
+
+    Stage("kappa_cosmin", "Kappa_computation_COSMIN.py", inputs=[COSMIN_WORKBOOK]),
+    Stage("kappa_cosmin_worst_score", "Kappa_computation_COSMIN_worst_score.py", inputs=[COSMIN_WORKBOOK]),
+    Stage("kappa_qa", "Kappa_computation_QA.py", inputs=[QA_WORKBOOK]),
+
+    Stage("subgroups_gmfcs", "review_GMFCS_common.py", inputs=[INCLUSION_WORKBOOK]),
+    Stage("subgroups_cp_type", "review_cp_type_common.py", inputs=[INCLUSION_WORKBOOK]),
+    Stage("subgroups_laterality", "review_laterality_common.py", inputs=[INCLUSION_WORKBOOK]),
+
+    Stage("figure_sunburst", "review_participant_specificity_cumulative_plot.py",
+          inputs=[INCLUSION_WORKBOOK], outputs=[FIGURE_2]),
+    Stage("figure_sankey", "review_task_participant_sankey_plot.py",
+          inputs=[INCLUSION_WORKBOOK], outputs=[SANKEY_PLOT]),
+    Stage("figure_years", "review_years_publi_plot.py", inputs=[INCLUSION_WORKBOOK], outputs=[YEARS_PLOT]),
+    Stage("figure_file_type", "review_file_type.py", inputs=[INCLUSION_WORKBOOK], outputs=[FILE_TYPE_PLOT]),
+    Stage("figure_quality", "review_quality_assessment_plot.py", inputs=[QA_WORKBOOK], outputs=[QUALITY_PLOT]),
+    Stage("dashboard", "review_dashboard.py",
+          inputs=[INCLUSION_WORKBOOK, QA_WORKBOOK], outputs=[DASHBOARD]),
+]
+
+
+# ==========================================
+# 1. CONTENT HASHES
+# ==========================================
+def local_imports(script, seen=None):
+    """The script and the project modules it imports, recursively."""
+    seen = set() if seen is None else seen
+    path = os.path.join(SCRIPT_DIR, script)
+    if path in seen or not os.path.exists(path):
+        return seen
+    seen.add(path)
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            local_imports(f"{name.split('.')[0]}.py", seen)
+    return seen
+
+
+class HashIndex:
+    """SHA-256 of files, reused while (size, mtime) do not change."""
+
+    def __init__(self, known=None):
+        self.known = dict(known or {})
+
+    def file_hash(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = [st.st_size, st.st_mtime_ns]
+        entry = self.known.get(path)
+        if entry and entry[:2] == key:
+            return entry[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        self.known[path] = key + [digest.hexdigest()]
+        return digest.hexdigest()
+
+    def path_hash(self, entry):
+        """Hash of a file, or of the matching files of a folder (names and contents)."""
+        path, pattern = entry if isinstance(entry, tuple) else (entry, None)
+        if not os.path.isdir(path):
+            return self.file_hash(path)
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(path)):
+            full = os.path.join(path, name)
+            if name.startswith(".") or not os.path.isfile(full):
+                continue
+            if pattern and not fnmatch.fnmatch(name.lower(), pattern.lower()):
+                continue
+            digest.update(f"{name}\0{self.file_hash(full)}\n".encode())
+        return digest.hexdigest()
+
+
+def fingerprint(stage, index):
+    """Hashes of everything the stage reads: inputs and code."""
+    hashes = {(e[0] if isinstance(e, tuple) else e): index.path_hash(e) for e in stage.inputs}
+    for path in sorted(local_imports(stage.script)):
+        hashes[os.path.relpath(path, SCRIPT_DIR)] = index.file_hash(path)
+    return hashes
+
+
+# ==========================================
+# 2. STATE AND PLANNING
+# ==========================================
+def state_path():
+    return os.path.join(state_dir, "state.json")
+
+
+def load_state():
+    try:
+        with open(state_path(), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"stages": {}, "hashes": {}}
+
+
+def save_state(state):
+    os.makedirs(state_dir, exist_ok=True)
+    tmp_path = f"{state_path()}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, state_path())
+
+
+def dependencies(stages):
+    """{stage name: names of the stages producing one of its inputs}."""
+    producers = {os.path.normcase(out): s.name for s in stages for out in s.declared_outputs()}
+    return {s.name: {producers[p] for p in map(os.path.normcase, s.input_paths()) if p in producers} - {s.name}
+            for s in stages}
+
+
+def waves(stages):
+    """Stages grouped by level: every stage comes after the stages it depends on."""
+    deps = dependencies(stages)
+    by_name = {s.name: s for s in stages}
+    done, result = set(), []
+    while len(done) < len(stages):
+        wave = [n for n in by_name if n not in done and deps[n] <= done]
+        if not wave:
+            raise ValueError(f"Cyclic dependencies between stages: {sorted(set(by_name) - done)}")
+        result.append([by_name[n] for n in wave])
+        done.update(wave)
+    return result
+
+
+def stale_reasons(stage, record, inputs, index):
+    """Why the stage must run again (empty list if it is up to date)."""
+    if not record:
+        return ["never run"]
+    reasons = [f"changed: {path}" for path, h in inputs.items() if record["inputs"].get(path) != h]
+    reasons += [f"removed: {path}" for path in record["inputs"] if path not in inputs]
+    for path in stage.declared_outputs():
+        h = index.file_hash(path)
+        if h is None:
+            reasons.append(f"missing output: {path}")
+        elif record["outputs"].get(path) != h:
+            reasons.append(f"modified output: {path}")
+    return reasons
+
+
+# ==========================================
+# 3. EXECUTION
+# ==========================================
+def run_stage(stage):
+    """Runs the script headless, console output in the stage log. Returns (return code, seconds)."""
+    os.makedirs(os.path.dirname(stage.log_path()), exist_ok=True)
+    env = dict(os.environ, REVIEW_HEADLESS="1", MPLBACKEND="Agg", PYTHONIOENCODING="utf-8")
+    start = time.perf_counter()
+    with open(stage.log_path(), "w", encoding="utf-8") as log:
+        code = subprocess.run([sys.executable, os.path.join(SCRIPT_DIR, stage.script), *stage.args],
+                              stdout=log, stderr=subprocess.STDOUT, env=env).returncode
+    return code, time.perf_counter() - start
+
+
+def run_pipeline(stages=None, jobs=None, force=(), dry_run=False):
+    """Runs the stale stages wave by wave. Returns {stage name: status}."""
+    stages = stages or STAGES
+    deps = dependencies(stages)
+    state = load_state()
+    index = HashIndex(state.get("hashes"))
+    status = {}
+
+    for wave in waves(stages):
+        todo = []
+        for stage in wave:
+            failed = [d for d in deps[stage.name] if status.get(d) in ("failed", "skipped")]
+            if failed:
+                status[stage.name] = "skipped"
+                print(f"⏭️  {stage.name:<26} skipped (failed upstream: {', '.join(failed)})")
+                continue
+            inputs = fingerprint(stage, index)
+            reasons = stale_reasons(stage, state["stages"].get(stage.name), inputs, index)
+            # Dry run: the outputs of the stale upstream stages are not known yet
+            reasons += [f"upstream: {d}" for d in deps[stage.name] if status.get(d) == "stale"]
+            if stage.name in force:
+                reasons.insert(0, "forced")
+            if not reasons:
+                status[stage.name] = "up to date"
+                print(f"✔  {stage.name:<26} up to date")
+                continue
+            print(f"▶  {stage.name:<26} {reasons[0]}" + (f" (+{len(reasons) - 1})" if len(reasons) > 1 else ""))
+            todo.append(stage)
+
+        if dry_run:
+            status.update({s.name: "stale" for s in todo})
+            continue
+
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+            results = list(pool.map(run_stage, todo))
+        for stage, (code, seconds) in zip(todo, results):
+            if code != 0:
+                status[stage.name] = "failed"
+                state["stages"].pop(stage.name, None)
+                print(f"❌ {stage.name:<26} failed in {seconds:.1f} s (see {stage.log_path()})")
+                continue
+            # A script that printed its error and exited 0 left its outputs missing
+            missing = [p for p in stage.declared_outputs() if index.file_hash(p) is None]
+            if missing:
+                status[stage.name] = "failed"
+                state["stages"].pop(stage.name, None)
+                print(f"❌ {stage.name:<26} no output {', '.join(missing)} (see {stage.log_path()})")
+                continue
+            status[stage.name] = "ran"
+            # Inputs hashed again after the run: a stage may have touched them
+            state["stages"][stage.name] = {
+                "inputs": fingerprint(stage, index),
+                "outputs": {p: index.file_hash(p) for p in stage.declared_outputs()},
+                "seconds": round(seconds, 3),
+                "finished": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            print(f"✅ {stage.name:<26} {seconds:.1f} s")
+        state["hashes"] = index.known
+        save_state(state)
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the review stages whose inputs changed.")
+    parser.add_argument("--only", nargs="+", help="Run only these stages (and nothing downstream)")
+    parser.add_argument("--force", nargs="*", default=[], help="Stages to run even if up to date (none = all)")
+    parser.add_argument("--jobs", type=int, default=None, help="Stages run in parallel")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the stale stages")
+    parser.add_argument("--list", action="store_true", help="List the stages and their dependencies")
+    args = parser.parse_args()
+
+    stages = STAGES
+    if args.only:
+        unknown = set(args.only) - {s.name for s in STAGES}
+        if unknown:
+            raise SystemExit(f"❌ Unknown stage(s): {', '.join(sorted(unknown))}")
+        stages = [s for s in STAGES if s.name in args.only]
+
+    if args.list:
+        deps = dependencies(stages)
+        for i, wave in enumerate(waves(stages), 1):
+            for s in wave:
+                after = f"  (after {', '.join(sorted(deps[s.name]))})" if deps[s.name] else ""
+                print(f"[{i}] {s.name:<26} {s.script}{after}")
+        return
+
+    # --force alone: every stage
+    force = {s.name for s in stages} if args.force == [] and "--force" in sys.argv else set(args.force)
+    status = run_pipeline(stages, args.jobs, force, args.dry_run)
+    if "failed" in status.values():
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+review_plot_utils.py — Shared output helpers of the review_* plotting scripts.
+
+Three environment variables change how the figures are produced (all set by
+review_render_all.py for its worker processes):
+  - REVIEW_HEADLESS=1       : figures are closed instead of shown (no blocking window)
+  - REVIEW_OUTPUT_DIR=dir   : outputs are written to `dir`, keeping their file name
+  - REVIEW_PROFILE=name     : output profile of save_figure (manuscript, web, slide)
+
+Every file written through output_path() is recorded in `written_files`.
+
+save_figure() is the single way the scripts write a figure. The profile fixes:
+  - the DPI of raster outputs and of the rasterized layers of vector outputs,
+  - which layers are rasterized: collections with many elements (sunburst
+    rings, dense scatters) and images; text, axes and legends stay vectors,
+  - svg.fonttype: 'path' writes each glyph once in <defs> and references it
+    (portable), 'none' keeps <text> elements (smallest, needs the fonts),
+  - a fixed svg.hashsalt and no date in the metadata, so the same figure gives
+    the same file (clean diffs, content-hash pipeline),
+  - for Plotly figures: embedded or CDN plotly.js, and the PNG export scale.
+"""
+
+import ntpath
+import os
+
+from review_profiling import stage
+
+HEADLESS_ENV = "REVIEW_HEADLESS"
+OUTPUT_DIR_ENV = "REVIEW_OUTPUT_DIR"
+PROFILE_ENV = "REVIEW_PROFILE"
+
+DEFAULT_PROFILE = "manuscript"
+# rasterize_min_elements: a rasterized layer covers its whole axes at `dpi`, it
+# only gets smaller than the vector paths for really dense collections
+PROFILES = {
+    'manuscript': {'dpi': 300, 'svg_fonttype': 'path', 'rasterize_min_elements': 2000,
+                   'plotlyjs': 'inline', 'image_scale': 3},
+    'web': {'dpi': 150, 'svg_fonttype': 'none', 'rasterize_min_elements': 500,
+            'plotlyjs': 'cdn', 'image_scale': 1.5},
+    'slide': {'dpi': 200, 'svg_fonttype': 'path', 'rasterize_min_elements': 1000,
+              'plotlyjs': 'inline', 'image_scale': 2},
+}
+SVG_HASHSALT = "review"
+
+written_files = []
+
+
+def is_headless():
+    return os.environ.get(HEADLESS_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def output_path(path):
+    """Where to write `path` (redirected to REVIEW_OUTPUT_DIR when set)."""
+    out_dir = os.environ.get(OUTPUT_DIR_ENV)
+    if out_dir:
+        # ntpath splits both '\\' and '/', the configured paths are Windows paths
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, ntpath.basename(path))
+    written_files.append(path)
+    return path
+
+
+def show_figure(fig=None):
+    """
+    plt.show() / fig.show(), or closing the figure in headless mode.
+    `fig` is a Plotly figure, a Matplotlib figure, or None for the current
+    Matplotlib figures.
+    """
+    is_plotly = fig is not None and hasattr(fig, "to_plotly_json")
+    if is_plotly:
+        if not is_headless():
+            fig.show()
+        return
+
+    import matplotlib.pyplot as plt
+    if is_headless():
+        plt.close(fig if fig is not None else "all")
+    else:
+        plt.show()
+
+
+def get_profile(name=None):
+    """Settings of profile `name` (default: REVIEW_PROFILE, then [plots] profile of review.ini)."""
+    if not name:
+        from review_config import setting
+        name = os.environ.get(PROFILE_ENV) or setting('plots', 'profile', DEFAULT_PROFILE)
+    if name not in PROFILES:
+        raise KeyError(f"Unknown output profile {name!r}, expected one of {list(PROFILES)}")
+    return PROFILES[name]
+
+
+def rasterize_dense_layers(fig, min_elements):
+    """
+    Rasterizes the images and the collections of at least `min_elements`
+    paths or points; returns the number of rasterized artists.
+    """
+    from matplotlib.collections import Collection
+    from matplotlib.image import AxesImage
+
+    n = 0
+    for ax in fig.axes:
+        for artist in ax.get_children():
+            dense = isinstance(artist, AxesImage) or (
+                isinstance(artist, Collection)
+                and max(len(artist.get_paths()), len(artist.get_offsets())) >= min_elements)
+            if dense and not artist.get_rasterized():
+                artist.set_rasterized(True)
+                n += 1
+    return n
+
+
+def save_figure(path, fig=None, profile=None, **kwargs):
+    """
+    Writes `fig` (Matplotlib figure, Plotly figure, or None for the current
+    Matplotlib figure) to output_path(path) with the output profile, creating
+    its folder if needed. Extra keyword arguments go to savefig / write_html /
+    write_image.
+    Returns the path written.
+    """
+    settings = get_profile(profile)
+    target = output_path(path)
+    # Configured paths may point to a folder that does not exist yet (Plot/...)
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    extension = os.path.splitext(target)[1].lower()
+    with stage(f"save {os.path.basename(target)}"):
+        _write_figure(fig, target, extension, settings, kwargs)
+    return target
+
+
+def _write_figure(fig, target, extension, settings, kwargs):
+    """savefig / write_html / write_image of save_figure, with the profile settings."""
+    if fig is not None and hasattr(fig, "to_plotly_json"):
+        if extension == ".html":
+            kwargs.setdefault("include_plotlyjs", "cdn" if settings['plotlyjs'] == "cdn" else True)
+            fig.write_html(target, **kwargs)
+        else:
+            kwargs.setdefault("scale", settings['image_scale'])
+            fig.write_image(target, **kwargs)
+        return
+
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    fig = fig if fig is not None else plt.gcf()
+    rasterize_dense_layers(fig, settings['rasterize_min_elements'])
+    kwargs.setdefault("dpi", settings['dpi'])
+    if extension == ".svg":
+        kwargs.setdefault("metadata", {'Date': None})
+    elif extension == ".pdf":
+        kwargs.setdefault("metadata", {'CreationDate': None})
+    with matplotlib.rc_context({'svg.fonttype': settings['svg_fonttype'], 'svg.hashsalt': SVG_HASHSALT}):
+        fig.savefig(target, **kwargs)
@@ -0,0 +1,69 @@
+"""
+review_presence_codec.py — Shared tri-state coding of the Global_overview indicator columns.
+
+Indicator columns (GMFCS levels, topography, CP subtype, tasks...) mix counts,
+'X', '???', 0 and empty cells. They are all decoded here with the same rules,
+in one vectorized pass over every requested column:
+
+    number > 0            -> PRESENT  (count = the number)
+    number == 0           -> ABSENT   (count = 0)
+    'X', 'YES', 'TRUE'    -> PRESENT  (count unknown: NaN)
+    '???', empty, NaN     -> UNKNOWN
+    anything else         -> UNKNOWN
+
+Codes are int8 (PRESENT = 1, ABSENT = 0, UNKNOWN = -1); counts are float32.
+"""
+
+import numpy as np
+import pandas as pd
+
+PRESENT = 1
+ABSENT = 0
+UNKNOWN = -1
+
+PRESENT_TOKENS = ["X", "YES", "TRUE"]
+
+STATUS_LABELS = {PRESENT: "PRESENT", ABSENT: "ABSENT", UNKNOWN: "UNKNOWN"}
+
+
+def encode_presence(df, columns):
+    """
+    Decodes `columns` of `df` in one pass.
+    Returns (codes, counts), both shaped (rows x columns):
+      - codes  : int8 PRESENT / ABSENT / UNKNOWN
+      - counts : float32 numeric value of the cell, NaN if it is not a number
+    """
+    values = df[list(columns)].to_numpy(dtype=object)
+    flat = pd.Series(values.ravel(), dtype=object)
+
+    # Text and numeric readings of every cell
+    empty = flat.isna().to_numpy()
+    text = flat.astype(str).str.strip()
+    numeric = pd.to_numeric(text.where(~empty), errors="coerce").to_numpy(dtype=float)
+    is_token = text.str.upper().isin(PRESENT_TOKENS).to_numpy() & ~empty
+
+    codes = np.full(flat.shape, UNKNOWN, dtype=np.int8)
+    codes[numeric > 0] = PRESENT
+    codes[numeric == 0] = ABSENT
+    codes[is_token] = PRESENT
+
+    shape = values.shape
+    return codes.reshape(shape), numeric.astype(np.float32).reshape(shape)
+
+
+def is_present(df, columns):
+    """Boolean (rows x columns) array: True where the cell is PRESENT."""
+    codes, _ = encode_presence(df, columns)
+    return codes == PRESENT
+
+
+def numeric_counts(df, columns):
+    """(rows x columns) counts, 0 where the cell is not a number."""
+    _, counts = encode_presence(df, columns)
+    return np.nan_to_num(counts, nan=0.0)
+
+
+def status_labels(codes):
+    """'PRESENT' / 'ABSENT' / 'UNKNOWN' labels for an array of codes."""
+    labels = np.array([STATUS_LABELS[UNKNOWN], STATUS_LABELS[ABSENT], STATUS_LABELS[PRESENT]], dtype=object)
+    return labels[np.asarray(codes) + 1]
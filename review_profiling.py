@@ -0,0 +1,288 @@
+"""
+review_profiling.py — Opt-in profiling of the named stages of the review scripts.
+
+Nothing is measured unless REVIEW_PROFILING is set (or `review.py --profiling`):
+    REVIEW_PROFILING=1                wall time, CPU time and peak traced memory of every stage
+    REVIEW_PROFILING=cprofile         + one cProfile dump (.prof, snakeviz / pstats) per top-level stage
+    REVIEW_PROFILING=stacks           + sampled call stacks in collapsed format (flamegraph.pl, speedscope)
+    REVIEW_PROFILING=cprofile,stacks  both
+
+A stage is a named block of the main thread:
+
+    with stage("read_excel"):
+        df = pd.read_excel(...)
+
+Nested stages are reported under their parent ("load_global_overview/read_excel").
+A stage entered several times (one GROBID call per PDF) is aggregated: number
+of calls, total wall and CPU time, largest memory peak. When profiling is off,
+stage() returns a shared no-op context manager. When it is on, tracemalloc
+slows down the allocations (often 1.5-2x): compare the stages with each
+other, not with an unprofiled run.
+
+At exit the run report is written to REVIEW_PROFILING_DIR, else
+REVIEW_OUTPUT_DIR (next to the figures), else ./review_profiles :
+    <script>_<date>_<pid>.json          stages + run information
+    <script>_<date>_<pid>_<stage>.prof  (cprofile)
+    <script>_<date>_<pid>_stacks.txt    (stacks)
+and the stage table is printed on stderr.
+
+Usage :
+    REVIEW_PROFILING=1 python Kappa_computation_QA.py
+    python review.py --profiling cprofile,stacks plots sankey
+    python review_profiling.py review_profiles/Kappa_computation_QA_20260101-120000_4242.json
+"""
+
+import atexit
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# --- CONFIGURATION ---
+PROFILING_ENV = "REVIEW_PROFILING"
+PROFILING_DIR_ENV = "REVIEW_PROFILING_DIR"
+DEFAULT_DIRNAME = "review_profiles"
+MODES = ("cprofile", "stacks")
+SAMPLE_INTERVAL = 0.005  # seconds between two stack samples
+
+_NO_STAGE = contextlib.nullcontext()
+_profiler = None
+
+
+def enabled_modes():
+    """None if profiling is off, else the set of extra modes (possibly empty)."""
+    value = os.environ.get(PROFILING_ENV, "").strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return None
+    modes = {m.strip() for m in value.split(",") if m.strip()} - {"1", "true", "yes", "on"}
+    unknown = modes - set(MODES)
+    if unknown:
+        raise ValueError(f"Unknown {PROFILING_ENV} mode(s) {sorted(unknown)}, expected 1 or {list(MODES)}")
+    return modes
+
+
+def report_dir():
+    return (os.environ.get(PROFILING_DIR_ENV) or os.environ.get("REVIEW_OUTPUT_DIR")
+            or os.path.join(os.getcwd(), DEFAULT_DIRNAME))
+
+
+# ==========================================
+# 1. STACK SAMPLER
+# ==========================================
+class StackSampler:
+    """
+    Samples the stack of one thread every `interval` seconds and counts the
+    collapsed stacks ("stage;function (file:line);...").
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self.prefix = ()  # names of the open stages
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="review-stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                with self._lock:
+                    self.counts[";".join(self.prefix + tuple(reversed(names)))] += 1
+
+    def collapsed(self):
+        with self._lock:
+            items = sorted(self.counts.items())
+        return [f"{stack} {count}" for stack, count in items]
+
+
+# ==========================================
+# 2. PROFILER
+# ==========================================
+class Profiler:
+    """Stage measurements of one process (see the module docstring)."""
+
+    def __init__(self, modes=()):
+        self.modes = set(modes)
+        self.pid = os.getpid()
+        self.thread_id = threading.get_ident()
+        self.run_name = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+        self.started = time.strftime("%Y%m%d-%H%M%S")
+        self.t0, self.c0 = time.perf_counter(), time.process_time()
+        self.stages = {}  # path -> {'calls', 'wall_s', 'cpu_s', 'peak_mb'}
+        self.profiles = {}  # top-level path -> [cProfile.Profile]
+        self._open = []  # frames of the open stages
+        self._written_calls = 0
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.sampler = None
+        if "stacks" in self.modes:
+            self.sampler = StackSampler(self.thread_id)
+            self.sampler.start()
+        atexit.register(self.write_report)
+
+    @property
+    def prefix(self):
+        return f"{self.run_name}_{self.started}_{os.getpid()}"
+
+    @contextlib.contextmanager
+    def _stage(self, name):
+        parent = self._open[-1] if self._open else None
+        if parent is not None:
+            parent['peak'] = max(parent['peak'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+        path = f"{parent['path']}/{name}" if parent else name
+        frame = {'path': path, 'peak': 0, 'profile': None}
+        if "cprofile" in self.modes and parent is None:
+            frame['profile'] = cProfile.Profile()
+        self._open.append(frame)
+        if self.sampler:
+            self.sampler.prefix = tuple(path.split("/"))
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        if frame['profile'] is not None:
+            try:
+                frame['profile'].enable()
+            except ValueError:  # another profiler is already active
+                frame['profile'] = None
+        try:
+            yield
+        finally:
+            if frame['profile'] is not None:
+                frame['profile'].disable()
+                self.profiles.setdefault(path, []).append(frame['profile'])
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            self._open.pop()
+            if parent is not None:
+                parent['peak'] = max(parent['peak'], peak)
+            tracemalloc.reset_peak()
+            if self.sampler:
+                self.sampler.prefix = tuple(parent['path'].split("/")) if parent else ()
+
+            record = self.stages.setdefault(path, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'peak_mb': 0.0})
+            record['calls'] += 1
+            record['wall_s'] += wall
+            record['cpu_s'] += cpu
+            record['peak_mb'] = max(record['peak_mb'], peak / 2 ** 20)
+
+    def stage(self, name):
+        # Stages are only recorded on the thread that created the profiler
+        if threading.get_ident() != self.thread_id:
+            return _NO_STAGE
+        return self._stage(name)
+
+    def report(self):
+        return {
+            'run': self.run_name,
+            'argv': sys.argv,
+            'pid': os.getpid(),
+            'started': self.started,
+            'total_wall_s': time.perf_counter() - self.t0,
+            'total_cpu_s': time.process_time() - self.c0,
+            'modes': sorted(self.modes),
+            'stages': [{'stage': path, **values} for path, values in self.stages.items()],
+        }
+
+    def write_report(self, directory=None):
+        """Writes the report files, unless nothing changed since the last write. Returns the JSON path."""
+        n_calls = sum(r['calls'] for r in self.stages.values())
+        if n_calls == self._written_calls or os.getpid() != self.pid:
+            return None
+        self._written_calls = n_calls
+        directory = directory or report_dir()
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.prefix)
+
+        report = self.report()
+        for path, profiles in self.profiles.items():
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(f"{base}_{path.replace('/', '_').replace(' ', '_')}.prof")
+        if self.sampler:
+            with open(f"{base}_stacks.txt", "w", encoding="utf-8") as f:
+                f.write("\n".join(self.sampler.collapsed()) + "\n")
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        print(format_report(report), file=sys.stderr)
+        print(f"📊 Profil : {base}.json", file=sys.stderr)
+        return f"{base}.json"
+
+
+def format_report(report):
+    """Stage table of a report, in the order the stages were first closed."""
+    width = max([len(row['stage']) for row in report['stages']] + [30])
+    lines = [f"{'STAGE':<{width}} {'CALLS':>6} {'WALL (s)':>9} {'CPU (s)':>9} {'PEAK (MB)':>10}"]
+    for row in report['stages']:
+        lines.append(f"{row['stage']:<{width}} {row['calls']:>6} {row['wall_s']:>9.3f} {row['cpu_s']:>9.3f} "
+                     f"{row['peak_mb']:>10.1f}")
+    lines.append(f"{'(whole run)':<{width}} {'':>6} {report['total_wall_s']:>9.3f} {report['total_cpu_s']:>9.3f}")
+    return "\n".join(lines)
+
+
+# ==========================================
+# 3. API OF THE SCRIPTS
+# ==========================================
+def get_profiler():
+    """The process profiler, or None when REVIEW_PROFILING is not set."""
+    global _profiler
+    # A forked worker starts its own profiler instead of the copy of its parent's
+    if _profiler is None or (_profiler and _profiler.pid != os.getpid()):
+        modes = enabled_modes()
+        _profiler = Profiler(modes) if modes is not None else False
+    return _profiler or None
+
+
+def stage(name):
+    """Context manager measuring the block as stage `name` (no-op when profiling is off)."""
+    profiler = get_profiler()
+    return profiler.stage(name) if profiler else _NO_STAGE
+
+
+def profiled(name=None):
+    """Decorator version of stage(); the stage name defaults to the function name."""
+    def decorator(func):
+        import functools
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def write_report():
+    """Writes the report now (worker processes that may exit without atexit)."""
+    profiler = get_profiler()
+    return profiler.write_report() if profiler else None
+
+
+if __name__ == "__main__":
+    for report_path in sys.argv[1:]:
+        with open(report_path, encoding="utf-8") as f:
+            print(f"# {report_path}")
+            print(format_report(json.load(f)))
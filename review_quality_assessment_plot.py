@@ -1,12 +1,23 @@
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import ListedColormap, BoundaryNorm
 import textwrap
 import os
 
+from review_config import get_path
+from review_profiling import stage
+from review_plot_utils import save_figure, show_figure
+
 # --- CONFIGURATION ---
-file_path = r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\Quality_assessment_kappa.xlsx"
+file_path = get_path('qa_workbook')
 sheet_name = "Quality_assessment_results"
-save_path = r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\Quality_assessment_plot.png"
+save_path = get_path('quality_plot')
+heatmap_save_path = get_path('quality_heatmap')
+
+# "bars" : stacked counts per item / "heatmap" : score of every article for every item
+plot_mode = "bars"
+max_article_labels = 80  # above this, the article names are not written on the heatmap
 
 # Color mapping
 color_map = {
@@ -14,16 +25,18 @@ color_map = {
     1: 'orange',  # Partial
     2: 'green'  # Adequate
 }
+missing_color = 'lightgrey'
 
 
 def create_horizontal_quality_chart():
     if not os.path.exists(file_path):
         print(f"Error: File not found at path: {file_path}")
-        return
+        raise SystemExit(1)
 
     try:
         print("Loading data...")
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        with stage("read_excel"):
+            df = pd.read_excel(file_path, sheet_name=sheet_name)
 
         # Select numeric columns only
         df_scores = df.select_dtypes(include=['number'])
@@ -77,13 +90,92 @@ def create_horizontal_quality_chart():
         # Layout adjustment
         # 'left=0.3' reserves 30% of the image for the long question text
         plt.subplots_adjust(left=0.17, right=0.83, top=0.9)
-        plt.savefig(save_path)
-        plt.show()
+        save_figure(save_path)
+        show_figure()
         print("Chart generated successfully.")
 
     except Exception as e:
         print(f"An error occurred: {e}")
+        raise SystemExit(1)
+
+
+def cluster_order(scores):
+    """
+    Order of the articles (rows) putting similar score profiles next to each
+    other: rows sorted along the first principal component of the centered
+    scores (missing scores = item mean), ties broken by the total score.
+    Cost grows linearly with the number of articles.
+    """
+    filled = np.where(np.isnan(scores), np.nanmean(scores, axis=0), scores)
+    filled = np.nan_to_num(filled)  # items without any score
+    centered = filled - filled.mean(axis=0)
+    if len(scores) < 3 or not centered.any():
+        return np.argsort(-filled.sum(axis=1), kind='stable')
+    u, _, vt = np.linalg.svd(centered, full_matrices=False)
+    component = u[:, 0] * np.sign(vt[0].sum() or 1)  # high scores first
+    return np.lexsort((-filled.sum(axis=1), -component))
+
+
+def create_quality_heatmap():
+    if not os.path.exists(file_path):
+        print(f"Error: File not found at path: {file_path}")
+        raise SystemExit(1)
+
+    try:
+        print("Loading data...")
+        with stage("read_excel"):
+            df = pd.read_excel(file_path, sheet_name=sheet_name)
+        df_scores = df.select_dtypes(include=['number'])
+        names = df.drop(columns=df_scores.columns)
+        articles = names.iloc[:, 0].astype(str).tolist() if names.shape[1] else [str(i + 1) for i in range(len(df))]
+
+        # Scores outside 0/1/2 are shown as missing
+        scores = df_scores.to_numpy(dtype=float)
+        scores[~np.isin(scores, list(color_map))] = np.nan
+        order = cluster_order(scores)
+        grid = np.where(np.isnan(scores), -1, scores)[order]
+
+        print("Generating heatmap...")
+        n_articles, n_items = grid.shape
+        show_names = n_articles <= max_article_labels
+        # Height follows the articles only while their names are written
+        height = min(4 + 0.18 * n_articles, 18) if show_names else 10
+        fig, ax = plt.subplots(figsize=(10, height))
+
+        cmap = ListedColormap([missing_color, color_map[0], color_map[1], color_map[2]])
+        norm = BoundaryNorm([-1.5, -0.5, 0.5, 1.5, 2.5], cmap.N)
+        # One image whatever the number of articles (no artist per cell)
+        ax.imshow(grid, cmap=cmap, norm=norm, aspect='auto', interpolation='nearest', rasterized=True)
+
+        ax.set_xticks(range(n_items))
+        ax.set_xticklabels([textwrap.fill(str(label), 23) for label in df_scores.columns],
+                           fontsize=7, rotation=90)
+        ax.xaxis.tick_top()
+        if show_names:
+            ax.set_yticks(range(n_articles))
+            ax.set_yticklabels([articles[i] for i in order], fontsize=7)
+        else:
+            ax.set_yticks([])
+            ax.set_ylabel(f"{n_articles} articles (clustered by score profile)", fontsize=10)
+
+        handles = [plt.Rectangle((0, 0), 1, 1, color=c, ec='black') for c in
+                   (color_map[0], color_map[1], color_map[2], missing_color)]
+        ax.legend(handles, ["0 - Inadequate", "1 - Partial", "2 - Adequate", "Missing"],
+                  title="Score", bbox_to_anchor=(1.0, 1.0), loc='upper left')
+        ax.set_title('Quality scores per article and item', fontsize=14, pad=15)
+
+        plt.tight_layout()
+        save_figure(heatmap_save_path)
+        show_figure()
+        print("Heatmap generated successfully.")
+
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
-    create_horizontal_quality_chart()
\ No newline at end of file
+    if plot_mode == "heatmap":
+        create_quality_heatmap()
+    else:
+        create_horizontal_quality_chart()
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+review_render_all.py — Regenerates every review figure in one command, without any window.
+
+Each plotting script is run as __main__ in its own worker process (fresh
+Matplotlib / seaborn state, figures rendered in parallel) with:
+  - the non-interactive Agg backend,
+  - REVIEW_HEADLESS=1 so plt.show() / fig.show() do not block,
+  - REVIEW_OUTPUT_DIR=<--out> if given (otherwise the paths configured in the scripts),
+  - REVIEW_PROFILE=<--profile> if given (output profile of review_plot_utils.save_figure).
+The console output of each script is captured and only printed with --verbose
+or when the script fails; a summary gives the time and files of each figure.
+A figure fails when its script raises, exits with a non-zero code, or writes
+no file.
+
+Usage :
+    python review_render_all.py
+    python review_render_all.py --out figures --jobs 4
+    python review_render_all.py --only sankey years
+    python review_render_all.py --profile web --out figures_web
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import runpy
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from review_plot_utils import PROFILES, DEFAULT_PROFILE
+
+# --- CONFIGURATION ---
+FIGURES = {
+    'sunburst': "review_participant_specificity_cumulative_plot.py",
+    'sankey': "review_task_participant_sankey_plot.py",
+    'years': "review_years_publi_plot.py",
+    'quality': "review_quality_assessment_plot.py",
+    'file_type': "review_file_type.py",
+}
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def render_figure(name, script, output_dir=None, profile=None):
+    """
+    Runs one plotting script headless (in a worker process).
+    Returns (name, seconds, written files, captured output, error or None).
+    """
+    os.environ["MPLBACKEND"] = "Agg"
+    os.environ["REVIEW_HEADLESS"] = "1"
+    if output_dir:
+        os.environ["REVIEW_OUTPUT_DIR"] = os.path.abspath(output_dir)
+    if profile:
+        os.environ["REVIEW_PROFILE"] = profile
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import review_plot_utils
+    import review_profiling
+
+    buffer = io.StringIO()
+    error = None
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+        try:
+            with review_profiling.stage(name):
+                runpy.run_path(os.path.join(SCRIPT_DIR, script), run_name="__main__")
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                error = f"SystemExit({e.code})"
+        except Exception:
+            error = traceback.format_exc()
+    elapsed = time.perf_counter() - start
+    # Forked workers exit without running atexit: profile report written here
+    review_profiling.write_report()
+    written = [p for p in review_plot_utils.written_files if os.path.exists(p)]
+    if error is None and not written:
+        # The scripts print some of their errors themselves: no file = failure
+        error = "no file written"
+    return name, elapsed, written, buffer.getvalue(), error
+
+
+def render_all(names=None, output_dir=None, jobs=None, verbose=False, profile=None):
+    """Renders the selected figures in parallel. Returns the result tuples, in FIGURES order."""
+    names = list(names or FIGURES)
+    unknown = [n for n in names if n not in FIGURES]
+    if unknown:
+        raise KeyError(f"Unknown figure(s) {unknown}, expected {list(FIGURES)}")
+
+    results = {}
+    start = time.perf_counter()
+    # One fresh process per figure: the scripts keep global state (pyplot, seaborn theme)
+    with ProcessPoolExecutor(max_workers=jobs or min(len(names), os.cpu_count() or 1),
+                             max_tasks_per_child=1) as pool:
+        futures = [pool.submit(render_figure, n, FIGURES[n], output_dir, profile) for n in names]
+        for future in as_completed(futures):
+            name, elapsed, written, output, error = future.result()
+            results[name] = (name, elapsed, written, output, error)
+            status = "❌" if error else "✅"
+            print(f"{status} {name:<10} {elapsed:6.2f} s  {', '.join(written) or '(aucun fichier)'}")
+            if verbose or error:
+                print("   " + output.strip().replace("\n", "\n   "))
+            if error:
+                print("   " + error.strip().replace("\n", "\n   "))
+    print(f"\nTotal : {time.perf_counter() - start:.2f} s pour {len(names)} figure(s)")
+    return [results[n] for n in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renders every review figure headless and in parallel.")
+    parser.add_argument("--only", nargs="+", choices=list(FIGURES), help="Subset of figures")
+    parser.add_argument("--out", default=None, help="Output folder (default: paths configured in the scripts)")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: one per figure)")
+    parser.add_argument("--profile", choices=list(PROFILES), default=None,
+                        help=f"Output profile (default: {DEFAULT_PROFILE})")
+    parser.add_argument("--verbose", action="store_true", help="Print the output of every script")
+    args = parser.parse_args()
+
+    results = render_all(args.only, args.out, args.jobs, args.verbose, args.profile)
+    if any(error for *_, error in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
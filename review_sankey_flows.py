@@ -0,0 +1,214 @@
+"""
+review_sankey_flows.py — Sankey flows for any chain of stages (task -> subtype -> topography -> GMFCS...).
+
+Each stage is a group of indicator columns of Global_overview. An article is
+a member of every node of a stage it has PRESENT; when nothing is PRESENT, or
+when the first column of the group holds '???' (sheet convention for "not
+reported"), it goes to the stage's Unknown node if the stage has one.
+
+Between two consecutive stages A and B, all link weights come from one
+matrix product over the membership matrices:
+
+    links[i, j] = sum_a  w[a] * A[a, i] * B[a, j]      i.e.  A.T @ (w * B)
+
+with w = 1 (articles) or w = N_CP (participants). Only the articles having a
+node in every stage are counted, so an article without any task does not
+flow into the GMFCS stage, as in the original task -> GMFCS Sankey.
+
+Usage :
+    python review_sankey_flows.py --stages task subtype topography GMFCS --weight participants
+"""
+
+import argparse
+
+import numpy as np
+
+from review_contingency_cube import DIMENSIONS, PARTICIPANT_COLUMN, WEIGHTS
+from review_dataset import load_global_overview, file_path, sheet_name
+from review_presence_codec import is_present, numeric_counts
+from review_profiling import profiled
+
+# --- CONFIGURATION ---
+UNKNOWN_MARKER = '???'
+
+# Stages without an Unknown node (an article without task has no flow)
+STAGES_WITHOUT_UNKNOWN = ['task']
+
+# Default node colors per stage (RGBA, links take the target color at LINK_ALPHA)
+STAGE_COLORS = {
+    'task': "rgba(70, 130, 180, 0.8)",
+    'subtype': "rgba(210, 85, 0, 0.8)",
+    'topography': "rgba(200, 160, 0, 0.8)",
+    'GMFCS': "rgba(200, 40, 40, 0.8)",
+}
+UNKNOWN_COLOR = "rgba(149, 165, 166, 0.8)"
+DEFAULT_COLOR = "rgba(160, 160, 160, 0.8)"
+LINK_ALPHA = 0.3
+
+
+class Stage:
+    def __init__(self, name, columns, unknown_label=None):
+        self.name = name
+        self.columns = list(columns)
+        self.unknown_label = unknown_label
+
+    @property
+    def labels(self):
+        return self.columns + ([self.unknown_label] if self.unknown_label else [])
+
+
+def default_stage(name):
+    unknown = None if name in STAGES_WITHOUT_UNKNOWN else f"{name} Unknown"
+    return Stage(name, DIMENSIONS[name], unknown)
+
+
+def stage_membership(df, stage):
+    """(articles x nodes) 0/1 matrix of a stage."""
+    present = np.zeros((len(df), len(stage.columns)), dtype=bool)
+    found = [c for c in stage.columns if c in df.columns]
+    if found:
+        present[:, [stage.columns.index(c) for c in found]] = is_present(df, found)
+    if not stage.unknown_label:
+        return present.astype(np.float64)
+
+    first = stage.columns[0]
+    marked = np.zeros(len(df), dtype=bool)
+    if first in df.columns:
+        marked = (df[first].astype(str).str.strip() == UNKNOWN_MARKER).to_numpy()
+    unknown = marked | ~present.any(axis=1)
+    present[unknown] = False
+    return np.column_stack([present, unknown]).astype(np.float64)
+
+
+def article_weights(df, weight):
+    if weight not in WEIGHTS:
+        raise ValueError(f"weight must be one of {WEIGHTS}, got {weight!r}")
+    if weight == 'articles':
+        return np.ones(len(df))
+    if PARTICIPANT_COLUMN not in df.columns:
+        raise KeyError(f"Column '{PARTICIPANT_COLUMN}' needed for participant weighting")
+    return numeric_counts(df, [PARTICIPANT_COLUMN])[:, 0].astype(np.float64)
+
+
+class SankeyFlows:
+    """
+    Node and link arrays ready for go.Sankey:
+      labels, stage_of_node (index of the stage of every node),
+      sources, targets, values (non-zero links only)
+    """
+
+    def __init__(self, stages, labels, stage_of_node, sources, targets, values):
+        self.stages = stages
+        self.labels = labels
+        self.stage_of_node = stage_of_node
+        self.sources = sources
+        self.targets = targets
+        self.values = values
+
+    def node_positions(self, margin=0.01):
+        """Stages evenly spread on x, nodes evenly spread on y within their stage."""
+        n_stages = len(self.stages)
+        x, y = [], []
+        for s, stage in enumerate(self.stages):
+            n = len(stage.labels)
+            x += [margin + s / max(n_stages - 1, 1) * (1 - 2 * margin)] * n
+            y += [margin + i / max(n - 1, 1) * (1 - 2 * margin) for i in range(n)]
+        return x, y
+
+    def default_colors(self):
+        colors = []
+        for stage in self.stages:
+            color = STAGE_COLORS.get(stage.name, DEFAULT_COLOR)
+            colors += [color] * len(stage.columns)
+            if stage.unknown_label:
+                colors.append(UNKNOWN_COLOR)
+        return colors
+
+
+@profiled("build_flows")
+def build_flows(df, stages, weight='articles'):
+    """
+    Flows between consecutive stages. `stages` are Stage objects or names of
+    DIMENSIONS.
+    """
+    stages = [default_stage(s) if isinstance(s, str) else s for s in stages]
+    if len(stages) < 2:
+        raise ValueError("At least two stages are needed")
+
+    matrices = [stage_membership(df, stage) for stage in stages]
+    w = article_weights(df, weight)
+    # Articles with a node in every stage
+    active = np.logical_and.reduce([m.any(axis=1) for m in matrices])
+    w = np.where(active, w, 0.0)
+
+    offsets = np.cumsum([0] + [m.shape[1] for m in matrices])
+    sources, targets, values = [], [], []
+    for s in range(len(stages) - 1):
+        links = matrices[s].T @ (w[:, None] * matrices[s + 1])
+        i, j = np.nonzero(links)
+        sources.append(i + offsets[s])
+        targets.append(j + offsets[s + 1])
+        values.append(links[i, j])
+
+    labels = [label for stage in stages for label in stage.labels]
+    stage_of_node = np.repeat(np.arange(len(stages)), [m.shape[1] for m in matrices])
+    return SankeyFlows(stages, labels, stage_of_node, np.concatenate(sources).tolist(),
+                       np.concatenate(targets).tolist(), np.concatenate(values).tolist())
+
+
+def link_color(node_color, alpha=LINK_ALPHA):
+    """'rgba(r, g, b, a)' -> same color with the link opacity."""
+    parts = node_color.split(',')
+    parts[-1] = f" {alpha})"
+    return ",".join(parts)
+
+
+def sankey_trace(flows, node_colors=None, x=None, y=None):
+    """go.Sankey trace of the flows (links colored like their target node)."""
+    import plotly.graph_objects as go
+
+    colors = node_colors or flows.default_colors()
+    if x is None or y is None:
+        x, y = flows.node_positions()
+    return go.Sankey(
+        arrangement="snap",
+        node=dict(
+            pad=15, thickness=20,
+            line=dict(color="black", width=0.5),
+            label=flows.labels,
+            color=colors,
+            x=x, y=y
+        ),
+        link=dict(
+            source=flows.sources, target=flows.targets, value=flows.values,
+            color=[link_color(colors[t]) for t in flows.targets]
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-stage Sankey of the included studies.")
+    parser.add_argument("--file", default=file_path)
+    parser.add_argument("--stages", nargs="+", default=['task', 'subtype', 'topography', 'GMFCS'],
+                        choices=list(DIMENSIONS))
+    parser.add_argument("--weight", default="articles", choices=WEIGHTS)
+    parser.add_argument("--out", default="Sankey_flows.html")
+    args = parser.parse_args()
+
+    import plotly.graph_objects as go
+    from review_plot_utils import save_figure
+
+    columns = [c for name in args.stages for c in DIMENSIONS[name]] + [PARTICIPANT_COLUMN]
+    df = load_global_overview(args.file, columns=columns, sheet=sheet_name)
+    flows = build_flows(df, args.stages, weight=args.weight)
+    print(f">>> {len(flows.labels)} noeuds, {len(flows.values)} liens ({args.weight}).")
+
+    fig = go.Figure(data=[sankey_trace(flows)])
+    fig.update_layout(title=" -> ".join(args.stages) + f" ({args.weight})", font_size=12,
+                      width=1300, height=850)
+    save_figure(args.out, fig)
+    print(f"✅ Écrit : {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+review_schema.py — Declarative schema of the Global_overview sheet, checked in one vectorized pass.
+
+Every known column has a kind:
+  - 'id'       : integer >= 1, never empty, unique (ArtNb)
+  - 'text'     : any text (ref, title, Study_type)
+  - 'year'     : integer in [YEAR_MIN, YEAR_MAX], empty allowed
+  - 'count'    : number in [0, max], '???' or empty (N_CP, Boy_with_CP...)
+  - 'presence' : number >= 0, 'X' / 'YES' / 'TRUE', '???' or empty
+                 (indicator columns, decoded by review_presence_codec)
+and may be required (never empty).
+
+validate() decodes all the checked cells at once (to_numeric and token
+lookup over the distinct cell values only, then mapped back to every cell),
+and compares them with per-column bounds broadcast over the rows. It is run by load_global_overview right
+after loading, so a bad sheet is rejected before any rendering or kappa
+computation, with every problem listed:
+
+    SchemaError: Global_overview does not match the schema:
+      - missing column 'GMFCS-IV' (closest: 'GMFCS IV')
+      - N_CP: 2 invalid value(s), e.g. row 14 = '-3', row 51 = 'n/a'
+
+Rows are Excel row numbers (header = row 1).
+
+Usage :
+    python review_schema.py                  (checks the whole sheet)
+    python review_schema.py --file other.xlsx
+"""
+
+import argparse
+import datetime
+import difflib
+
+import numpy as np
+import pandas as pd
+
+from review_dataset import (match_columns, TASK_COLUMNS, GMFCS_COLUMNS, TOPOGRAPHY_COLUMNS, SUBTYPE_COLUMNS,
+                            SEX_COLUMNS)
+from review_presence_codec import PRESENT_TOKENS
+
+# --- CONFIGURATION ---
+UNKNOWN_TOKENS = ["???"]
+YEAR_MIN = 1950
+YEAR_MAX = datetime.date.today().year + 1
+N_CP_MAX = 100000
+MAX_EXAMPLES = 3
+
+
+class SchemaError(ValueError):
+    """The sheet does not match the schema; `problems` lists every issue."""
+
+    def __init__(self, problems, sheet="Global_overview"):
+        self.problems = list(problems)
+        super().__init__(f"{sheet} does not match the schema:\n" + "\n".join(f"  - {p}" for p in self.problems))
+
+
+class Column:
+    KINDS = ('id', 'text', 'year', 'count', 'presence')
+
+    def __init__(self, kind, required=False, minimum=None, maximum=None):
+        if kind not in self.KINDS:
+            raise ValueError(f"kind must be one of {self.KINDS}, got {kind!r}")
+        self.kind = kind
+        self.required = required or kind == 'id'
+        self.minimum = minimum if minimum is not None else (1 if kind == 'id' else 0)
+        self.maximum = maximum if maximum is not None else np.inf
+
+
+SCHEMA = {
+    'ArtNb': Column('id'),
+    'ref': Column('text', required=True),
+    'title': Column('text'),
+    'year': Column('year', minimum=YEAR_MIN, maximum=YEAR_MAX),
+    'Study_type': Column('text'),
+    'N_CP': Column('count', maximum=N_CP_MAX),
+    **{c: Column('count', maximum=N_CP_MAX) for c in SEX_COLUMNS},
+    **{c: Column('presence') for c in TOPOGRAPHY_COLUMNS + SUBTYPE_COLUMNS + GMFCS_COLUMNS + TASK_COLUMNS},
+}
+
+
+# ==========================================
+# 1. VALIDATION
+# ==========================================
+def missing_columns(expected, available):
+    """'missing column' messages, with the closest sheet column when there is one."""
+    problems = []
+    available = list(available)
+    for name in expected:
+        # Same tolerance as the loader (case and surrounding spaces)
+        if match_columns([name], available):
+            continue
+        close = difflib.get_close_matches(str(name), [str(c) for c in available], n=1, cutoff=0.6)
+        problems.append(f"missing column {name!r}" + (f" (closest: {close[0]!r})" if close else ""))
+    return problems
+
+
+def schema_columns(columns, schema=SCHEMA):
+    """{sheet column: schema key} of the columns known to the schema, matched like the loader (case and spaces)."""
+    by_key = {str(k).strip().lower(): k for k in schema}
+    found = {}
+    for col in columns:
+        key = col if col in schema else by_key.get(str(col).strip().lower())
+        if key is not None:
+            found[col] = key
+    return found
+
+
+def cell_examples(values, rows, index):
+    shown = ", ".join(f"row {index[r] + 2} = {values[r]!r}" for r in rows[:MAX_EXAMPLES])
+    return shown + (", ..." if len(rows) > MAX_EXAMPLES else "")
+
+
+def invalid_cells(df, columns, schema=SCHEMA):
+    """
+    Boolean (rows x columns) masks (invalid, empty_required) of the schema
+    columns of `df`, computed in one pass over all their cells.
+    """
+    keys = schema_columns(columns, schema)
+    specs = [schema[keys[c]] for c in columns]
+    values = df[list(columns)].to_numpy(dtype=object)
+
+    # The cells repeat a handful of values (0, 'X', '???', small counts):
+    # only the distinct values are decoded, then mapped back to the cells
+    codes, uniques = pd.factorize(values.ravel(), use_na_sentinel=True)
+    text = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    numeric_u = pd.to_numeric(text, errors="coerce").to_numpy(dtype=float)
+    upper = text.str.upper()
+    # Last slot = empty cell (code -1)
+    blank = np.append((text == "").to_numpy(), True)
+    numeric_u = np.append(numeric_u, np.nan)
+    present_u = np.append(upper.isin(PRESENT_TOKENS).to_numpy(), False)
+    unknown_u = np.append(upper.isin(UNKNOWN_TOKENS).to_numpy(), False)
+
+    codes = codes.reshape(values.shape)
+    empty, numeric = blank[codes], numeric_u[codes]
+    is_present_token, is_unknown_token = present_u[codes], unknown_u[codes]
+
+    # Per-column rules, broadcast over the rows
+    kinds = np.array([s.kind for s in specs])
+    minimum = np.array([s.minimum for s in specs], dtype=float)
+    maximum = np.array([s.maximum for s in specs], dtype=float)
+    required = np.array([s.required for s in specs])
+    integer = np.isin(kinds, ['id', 'year'])
+    any_text = kinds == 'text'
+    tokens_ok = np.isin(kinds, ['count', 'presence'])
+
+    with np.errstate(invalid="ignore"):
+        number_ok = (numeric >= minimum) & (numeric <= maximum) & (~integer | (numeric == np.round(numeric)))
+    value_ok = (any_text | number_ok | (tokens_ok & is_unknown_token)
+                | ((kinds == 'presence') & is_present_token))
+    invalid = ~empty & ~value_ok
+    empty_required = empty & required
+    return invalid, empty_required
+
+
+def validate(df, columns=None, schema=SCHEMA, sheet="Global_overview"):
+    """
+    Checks `df` against the schema: the `columns` expected by the caller
+    (default: the required schema columns) must exist, and every schema column
+    present must hold valid values. Raises SchemaError listing all problems;
+    returns df.
+    """
+    expected = list(columns) if columns is not None else [c for c, s in schema.items() if s.required]
+    problems = missing_columns(expected, df.columns)
+
+    keys = schema_columns(df.columns, schema)
+    checked = list(keys)
+    if checked and len(df):
+        invalid, empty_required = invalid_cells(df, checked, schema)
+        raw = df[checked].to_numpy(dtype=object)
+        for j in np.flatnonzero(invalid.any(axis=0) | empty_required.any(axis=0)):
+            col = checked[j]
+            rows = np.flatnonzero(invalid[:, j])
+            if len(rows):
+                problems.append(f"{col}: {len(rows)} invalid value(s), e.g. "
+                                f"{cell_examples(raw[:, j], rows, df.index)}")
+            rows = np.flatnonzero(empty_required[:, j])
+            if len(rows):
+                problems.append(f"{col}: {len(rows)} empty cell(s) in a required column, e.g. "
+                                + ", ".join(f"row {df.index[r] + 2}" for r in rows[:MAX_EXAMPLES]))
+
+    for col in [c for c in checked if schema[keys[c]].kind == 'id']:
+        duplicated = df[col].dropna().duplicated(keep=False)
+        if duplicated.any():
+            values = sorted(set(df[col].dropna()[duplicated]))
+            problems.append(f"{col}: duplicated value(s) {values[:MAX_EXAMPLES]}")
+
+    if problems:
+        raise SchemaError(problems, sheet)
+    return df
+
+
+def main():
+    from review_dataset import load_global_overview, file_path, sheet_name
+
+    parser = argparse.ArgumentParser(description="Checks the Global_overview sheet against the schema.")
+    parser.add_argument("--file", default=file_path)
+    parser.add_argument("--sheet", default=sheet_name)
+    args = parser.parse_args()
+
+    try:
+        df = load_global_overview(args.file, columns=list(SCHEMA), sheet=args.sheet)
+    except ValueError as e:  # SchemaError (the class of review_schema, not of __main__)
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    print(f"✅ {args.sheet} : {len(df)} articles, {len(SCHEMA)} columns conform to the schema")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+review_sunburst.py — Sunburst engine for any hierarchy of Global_overview categories (SEX -> GMFCS -> task...).
+
+A hierarchy is a list of levels; every level is a group of columns:
+  - 'counts'   : participant counts per category (Boy_with_CP, GMFCS-I...)
+  - 'presence' : indicator columns (tasks); an article's participants are
+                 split equally between the categories it has PRESENT
+Each level gives, for every article, the share of its participants in each
+category plus an 'Unknown' remainder (participants not reported). The base of
+an article is N_CP, or the sum of its counts when that sum is larger, so the
+shares of a level always add up to 1 and the Unknown remainder is never
+negative.
+
+All the rings are computed at once, vectorized over the articles:
+
+    values[i, j, k] = sum_a  base[a] * S1[a, i] * S2[a, j] * S3[a, k]
+
+and the inner rings are sums over the trailing axes. Every ring is then drawn
+as one PolyCollection (wedge outlines built with numpy), whatever the number
+of segments.
+
+Usage :
+    python review_sunburst.py --levels SEX GMFCS task --out sunburst.svg
+"""
+
+import argparse
+
+import numpy as np
+
+from review_dataset import (load_global_overview, file_path, sheet_name, TASK_COLUMNS, GMFCS_COLUMNS,
+                            SUBTYPE_COLUMNS, TOPOGRAPHY_COLUMNS)
+from review_presence_codec import is_present, numeric_counts
+from review_profiling import profiled
+
+# --- CONFIGURATION ---
+TOTAL_COLUMN = 'N_CP'
+UNKNOWN = 'Unknown'
+UNKNOWN_COLOR = (0.86, 0.86, 0.86)
+
+
+class Level:
+    """
+    columns : {label: sheet column}
+    kind    : 'counts' or 'presence'
+    colors  : {label: color}, 'Unknown' included (missing labels get the default palette)
+    """
+
+    def __init__(self, name, columns, kind='counts', colors=None):
+        if kind not in ('counts', 'presence'):
+            raise ValueError(f"kind must be 'counts' or 'presence', got {kind!r}")
+        self.name = name
+        self.columns = dict(columns)
+        self.kind = kind
+        self.colors = dict(colors or {})
+
+    @property
+    def labels(self):
+        return list(self.columns) + [UNKNOWN]
+
+    def color_list(self):
+        import matplotlib.pyplot as plt
+        palette = plt.get_cmap('tab20').colors
+        colors = [self.colors.get(label, palette[i % len(palette)]) for i, label in enumerate(self.columns)]
+        return colors + [self.colors.get(UNKNOWN, UNKNOWN_COLOR)]
+
+
+LEVELS = {
+    'SEX': Level('SEX', {'Boys': 'Boy_with_CP', 'Girls': 'Girl_with_CP'}),
+    'TOPOGRAPHY': Level('TOPOGRAPHY', {'Hemiplegia': 'Hemiplegic', 'Diplegia': 'Diplegic',
+                                       'Quadriplegia': 'Quadriplegic'}),
+    'CP SUBTYPE': Level('CP SUBTYPE', {c: c for c in SUBTYPE_COLUMNS}),
+    'GMFCS': Level('GMFCS', {c.replace('GMFCS-', ''): c for c in GMFCS_COLUMNS}),
+    'task': Level('task', {c: c for c in TASK_COLUMNS}, kind='presence'),
+}
+
+
+# ==========================================
+# 1. AGGREGATES
+# ==========================================
+def level_matrix(df, level):
+    """(articles x categories) counts or PRESENT indicators (0 for absent columns)."""
+    matrix = np.zeros((len(df), len(level.columns)))
+    labels = list(level.columns)
+    found = [(labels.index(label), col) for label, col in level.columns.items() if col in df.columns]
+    if found:
+        idx, cols = zip(*found)
+        values = numeric_counts(df, cols) if level.kind == 'counts' else is_present(df, cols)
+        matrix[:, list(idx)] = values
+    return matrix
+
+
+def level_shares(matrix, level, base):
+    """(articles x (categories + Unknown)) shares of each article's participants."""
+    if level.kind == 'counts':
+        known = np.divide(matrix, base[:, None], out=np.zeros_like(matrix), where=base[:, None] > 0)
+    else:
+        n_present = matrix.sum(axis=1, keepdims=True)
+        known = np.divide(matrix, n_present, out=np.zeros_like(matrix), where=n_present > 0)
+    unknown = np.clip(1 - known.sum(axis=1), 0, 1)
+    return np.column_stack([known, unknown])
+
+
+@profiled("hierarchy_values")
+def hierarchy_values(df, levels, total_column=TOTAL_COLUMN):
+    """
+    Participants per node, one array per depth: depth d has shape
+    (n_1 + 1, ..., n_d + 1) (the +1 is the Unknown category of each level).
+    """
+    matrices = [level_matrix(df, level) for level in levels]
+    n_total = numeric_counts(df, [total_column])[:, 0] if total_column in df.columns else np.zeros(len(df))
+    counted = [m.sum(axis=1) for m, level in zip(matrices, levels) if level.kind == 'counts']
+    base = np.maximum.reduce([n_total.astype(float)] + counted)
+    shares = [level_shares(m, level, base) for m, level in zip(matrices, levels)]
+
+    letters = "bcdefghijklmnopqrstuvwxyz"[:len(levels)]
+    spec = "a," + ",".join(f"a{l}" for l in letters) + "->" + letters
+    deepest = np.einsum(spec, base, *shares, optimize=True)
+    return [deepest.sum(axis=tuple(range(d + 1, len(levels)))) for d in range(len(levels))]
+
+
+# ==========================================
+# 2. GEOMETRY
+# ==========================================
+def ring_angles(values, start, span):
+    """theta1, theta2 (degrees) of the flattened segments of one ring."""
+    flat = values.ravel().astype(float)
+    total = flat.sum()
+    fractions = flat / total if total > 0 else np.zeros_like(flat)
+    edges = start + span * np.concatenate([[0], np.cumsum(fractions)])
+    return edges[:-1], edges[1:]
+
+
+def wedge_vertices(theta1, theta2, r_in, r_out, n_points=48):
+    """(segments x 2 n_points x 2) outlines of annular wedges, in one numpy pass."""
+    t = np.linspace(0, 1, n_points)
+    angles = np.deg2rad(theta1[:, None] + (theta2 - theta1)[:, None] * t[None, :])
+    outer = np.stack([r_out * np.cos(angles), r_out * np.sin(angles)], axis=-1)
+    inner = np.stack([r_in * np.cos(angles[:, ::-1]), r_in * np.sin(angles[:, ::-1])], axis=-1)
+    return np.concatenate([outer, inner], axis=1)
+
+
+def draw_ring(ax, theta1, theta2, r_in, r_out, colors, edgecolor='white', linewidth=1.0):
+    """All the segments of a ring as one PolyCollection."""
+    from matplotlib.collections import PolyCollection
+
+    keep = theta2 > theta1
+    ring = PolyCollection(wedge_vertices(theta1[keep], theta2[keep], r_in, r_out),
+                          facecolors=np.asarray(colors, dtype=object)[keep].tolist(),
+                          edgecolors=edgecolor, linewidths=linewidth)
+    ax.add_collection(ring)
+    return ring
+
+
+def draw_segment_labels(ax, texts, theta1, theta2, radius, min_angle=0.0, outside=False, **text_kwargs):
+    """
+    One label per segment wider than `min_angle` degrees: centered in the
+    segment, or outside the ring aligned like the labels of ax.pie.
+    """
+    middle = np.deg2rad((theta1 + theta2) / 2)
+    x, y = radius * np.cos(middle), radius * np.sin(middle)
+    artists = []
+    for text, xi, yi, width in zip(texts, x, y, theta2 - theta1):
+        if not text or width <= min_angle or width <= 0:
+            continue
+        ha = ('left' if xi > 0 else 'right') if outside else 'center'
+        artists.append(ax.text(xi, yi, text, ha=ha, va='center', **text_kwargs))
+    return artists
+
+
+# ==========================================
+# 3. SUNBURST
+# ==========================================
+class Sunburst:
+    """
+    Rings of one or several hierarchies ("blocks"), each block on its own
+    angular sector. blocks : list of (block title, [Level, ...]).
+    """
+
+    def __init__(self, df, blocks, total_column=TOTAL_COLUMN):
+        self.blocks = [(title, list(levels)) for title, levels in blocks]
+        self.values = [hierarchy_values(df, levels, total_column) for _, levels in self.blocks]
+        n_total = numeric_counts(df, [total_column])[:, 0] if total_column in df.columns else np.zeros(len(df))
+        self.total = float(n_total.sum())
+
+    def depth(self):
+        return max(len(levels) for _, levels in self.blocks)
+
+    def block_spans(self, startangle=90, equal_blocks=True):
+        """(start, span) of every block: equal sectors, or proportional to their participants."""
+        weights = np.ones(len(self.blocks)) if equal_blocks else np.array([v[0].sum() for v in self.values])
+        spans = 360 * weights / weights.sum()
+        starts = startangle + np.concatenate([[0], np.cumsum(spans)[:-1]])
+        return list(zip(starts, spans))
+
+    def ring_segments(self, depth, startangle=90, equal_blocks=True):
+        """
+        All segments of ring `depth` (0 = innermost level) over the blocks:
+        dict with theta1, theta2, values, labels, colors (flattened arrays).
+        """
+        theta1, theta2, values, labels, colors = [], [], [], [], []
+        for (title, levels), block_values, (start, span) in zip(self.blocks, self.values,
+                                                                self.block_spans(startangle, equal_blocks)):
+            if depth >= len(levels):
+                continue
+            ring = block_values[depth]
+            t1, t2 = ring_angles(ring, start, span)
+            level = levels[depth]
+            n_parents = ring.size // len(level.labels)
+            theta1.append(t1)
+            theta2.append(t2)
+            values.append(ring.ravel())
+            labels += level.labels * n_parents
+            colors += level.color_list() * n_parents
+        return {
+            'theta1': np.concatenate(theta1), 'theta2': np.concatenate(theta2),
+            'values': np.concatenate(values), 'labels': labels, 'colors': colors,
+        }
+
+    @profiled("sunburst_draw")
+    def draw(self, ax, inner_radius=0.4, outer_radius=1.0, startangle=90, equal_blocks=True,
+             label_fontsize=10, min_label_angle=3.0):
+        """
+        Draws every ring between inner_radius and outer_radius. The outermost
+        ring is labelled outside ("label\\n(count)"), inner rings inside their
+        segments. Returns the ring segments, innermost first.
+        """
+        depth = self.depth()
+        edges = np.linspace(inner_radius, outer_radius, depth + 1)
+        rings = []
+        for d in range(depth):
+            seg = self.ring_segments(d, startangle, equal_blocks)
+            draw_ring(ax, seg['theta1'], seg['theta2'], edges[d], edges[d + 1], seg['colors'])
+            texts = [f"{label}\n({value:.0f})" for label, value in zip(seg['labels'], seg['values'])]
+            if d == depth - 1:
+                draw_segment_labels(ax, texts, seg['theta1'], seg['theta2'], outer_radius * 1.1,
+                                    min_label_angle, outside=True, fontsize=label_fontsize)
+            else:
+                draw_segment_labels(ax, texts, seg['theta1'], seg['theta2'], (edges[d] + edges[d + 1]) / 2,
+                                    min_label_angle, fontsize=label_fontsize * 0.8)
+            rings.append(seg)
+        lim = outer_radius * 1.25  # as ax.pie
+        ax.set_xlim(-lim, lim)
+        ax.set_ylim(-lim, lim)
+        ax.set_aspect('equal')
+        ax.axis('off')
+        return rings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sunburst of the participants over a hierarchy of categories.")
+    parser.add_argument("--file", default=file_path)
+    parser.add_argument("--levels", nargs="+", default=['SEX', 'GMFCS', 'task'], choices=list(LEVELS))
+    parser.add_argument("--out", default="sunburst.svg")
+    args = parser.parse_args()
+
+    import matplotlib.pyplot as plt
+    from review_plot_utils import save_figure, show_figure
+
+    levels = [LEVELS[name] for name in args.levels]
+    columns = [c for level in levels for c in level.columns.values()] + [TOTAL_COLUMN]
+    df = load_global_overview(args.file, columns=columns, sheet=sheet_name)
+
+    sunburst = Sunburst(df, [(" -> ".join(args.levels), levels)])
+    fig, ax = plt.subplots(figsize=(12, 12))
+    sunburst.draw(ax)
+    ax.text(0, 0, f"TOTAL CHILDREN\nN = {int(sunburst.total)}", ha='center', va='center',
+            fontsize=14, fontweight='bold')
+    ax.set_title(" -> ".join(args.levels), fontsize=16, pad=20)
+    save_figure(args.out, bbox_inches='tight')
+    print(f"✅ Écrit : {args.out}")
+    show_figure()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,27 +3,31 @@ import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import os
 
+from review_dataset import load_global_overview
+from review_config import get_path
+from review_plot_utils import save_figure, show_figure
+
 # --- CONFIGURATION ---
-file_path = r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\Full_text_inclusion_v1.xlsx"
+file_path = get_path('inclusion_workbook')
 sheet_name = "Global_overview"
-save_path = r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\Reports_per_years_plot.png"
+save_path = get_path('years_plot')
 
 
 def plot_publication_trend():
     if not os.path.exists(file_path):
         print(f"Erreur : Le fichier est introuvable à l'adresse : {file_path}")
-        return
+        raise SystemExit(1)
 
     try:
         print("Chargement des données...")
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        df = load_global_overview(file_path, columns=['year'], sheet=sheet_name)
 
         # Normalisation des colonnes
         df.columns = [c.lower().strip() for c in df.columns]
 
         if 'year' not in df.columns:
             print("Erreur : Colonne 'year' introuvable.")
-            return
+            raise SystemExit(1)
 
         # Nettoyage des années
         years = pd.to_numeric(df['year'], errors='coerce').dropna().astype(int)
@@ -74,13 +78,14 @@ def plot_publication_trend():
 
         # Ajustement des marges
         plt.tight_layout()
-        plt.savefig(save_path)
+        save_figure(save_path)
 
-        plt.show()
+        show_figure()
         print("Graphique généré avec succès.")
 
     except Exception as e:
         print(f"Une erreur est survenue : {e}")
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":